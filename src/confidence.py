@@ -1,7 +1,11 @@
 """Confidence scoring for draft quality and auto-send decisions."""
 import re
+import sqlite3
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
 
@@ -13,6 +17,10 @@ class RiskLevel(Enum):
     CRITICAL = "critical"
 
 
+# Severity rank of each risk level, LOW=0 ... CRITICAL=3
+RISK_RANKS = {level: rank for rank, level in enumerate(RiskLevel)}
+
+
 @dataclass
 class ScoreResult:
     """Result of confidence scoring."""
@@ -39,6 +47,12 @@ class ConfidenceScorer:
         'content_safety': 0.25
     }
     
+    # Score used for factors skipped on drafts that cannot auto-send
+    GATED_FACTOR_SCORE = 0.5
+    
+    # Number of recent score results kept per scorer
+    SCORE_CACHE_SIZE = 1024
+    
     def __init__(
         self,
         auto_send_threshold: float = None,
@@ -55,6 +69,11 @@ class ConfidenceScorer:
         self.auto_send_threshold = auto_send_threshold or self.AUTO_SEND_THRESHOLD
         self.rag_pipeline = rag_pipeline
         self.db = db
+        # Resolve optional collaborator hooks once instead of probing them
+        # with hasattr on every score
+        self._get_sender_history = getattr(db, 'get_sender_history', None) if db else None
+        self._rag_query = getattr(rag_pipeline, 'query', None) if rag_pipeline else None
+        self._score_cache: Dict[tuple, ScoreResult] = OrderedDict()
     
     def score(self, incoming_email: Dict, draft: Dict) -> ScoreResult:
         """Calculate confidence score for a draft.
@@ -66,23 +85,168 @@ class ConfidenceScorer:
         Returns:
             ScoreResult with score, risk level, factors, and reasoning
         """
-        reasoning = []
+        return self.score_batch([(incoming_email, draft)])[0]
+    
+    def score_batch(
+        self,
+        pairs: List[Tuple[Dict, Dict]],
+        max_workers: int = 8
+    ) -> List[ScoreResult]:
+        """Calculate confidence scores for several drafts at once.
         
-        # Score each factor
-        sender_score, sender_reason = self._score_sender_familiarity(incoming_email)
-        reasoning.append(sender_reason)
+        Cached results are reused, the risk level of every remaining draft
+        is classified up front, and RAG context for the low-risk drafts is
+        fetched concurrently instead of one query per draft.
         
-        length_score, length_reason = self._score_response_length(draft)
-        reasoning.append(length_reason)
+        Args:
+            pairs: (incoming_email, draft) tuples
+            max_workers: Maximum number of concurrent RAG queries
+            
+        Returns:
+            ScoreResults in the same order as pairs
+        """
+        results: List[Optional[ScoreResult]] = [None] * len(pairs)
+        
+        # Drafts are re-scored on every edit and refresh; reuse recent results.
+        # Sender history lives in the db and can change between refreshes, so
+        # its factor is part of the key; emails carrying prefetched RAG
+        # context are always scored fresh.
+        misses = []
+        sender_factors: Dict[int, Tuple[float, str]] = {}
+        for i, (incoming_email, draft) in enumerate(pairs):
+            if incoming_email.get('_rag_context') is not None:
+                misses.append((i, None))
+                continue
+            if self._get_sender_history:
+                sender_factors[i] = self._score_sender_familiarity(incoming_email)
+            cache_key = (
+                incoming_email.get('from', ''),
+                incoming_email.get('subject', ''),
+                incoming_email.get('text', ''),
+                draft.get('text', ''),
+                sender_factors.get(i),
+            )
+            cached = self._score_cache.get(cache_key)
+            if cached is not None:
+                self._score_cache.move_to_end(cache_key)
+                results[i] = _copy_result(cached)
+            else:
+                misses.append((i, cache_key))
+        
+        if not misses:
+            return results
+        
+        # Only low-risk drafts use RAG context (see _compute_score)
+        contexts: Dict[int, List] = {}
+        if self._rag_query:
+            needs_context = [
+                i for i, _ in misses
+                if pairs[i][0].get('_rag_context') is None
+                and self.get_risk_level(pairs[i][1].get('text', '')) == RiskLevel.LOW
+            ]
+            fetched = self._fetch_contexts([pairs[i][0] for i in needs_context], max_workers)
+            # A failed lookup scores as "no context" rather than retrying
+            contexts = {i: context or [] for i, context in zip(needs_context, fetched)}
+        
+        for i, cache_key in misses:
+            incoming_email, draft = pairs[i]
+            result = self._compute_score(
+                incoming_email, draft,
+                context=contexts.get(i),
+                sender_factor=sender_factors.get(i)
+            )
+            results[i] = result
+            if cache_key is None:
+                continue
+            self._score_cache[cache_key] = _copy_result(result)
+            if len(self._score_cache) > self.SCORE_CACHE_SIZE:
+                self._score_cache.popitem(last=False)
+        return results
+    
+    def prefetch_context(self, emails: List[Dict], max_workers: int = 8) -> List[Dict]:
+        """Fetch RAG context for several emails concurrently.
+        
+        The results are attached to each email as '_rag_context', which
+        score() uses instead of querying the RAG pipeline one email at a time.
+        
+        Args:
+            emails: Incoming email dicts (updated in place)
+            max_workers: Maximum number of concurrent RAG queries
+            
+        Returns:
+            The same list of emails
+        """
+        if not emails or not self._rag_query:
+            return emails
+        
+        contexts = self._fetch_contexts(emails, max_workers)
+        for email, context in zip(emails, contexts):
+            if context is not None:
+                email['_rag_context'] = context
+        return emails
+    
+    def _fetch_contexts(self, emails: List[Dict], max_workers: int = 8) -> List[Optional[List]]:
+        """Query RAG context for each email, concurrently when there are several.
+        
+        Returns None in place of any lookup that failed.
+        """
+        def fetch(email: Dict):
+            try:
+                return self._rag_query(self._context_query(email), top_k=3)
+            except Exception:
+                return None
         
-        tone_score, tone_reason = self._score_tone_match(incoming_email, draft)
-        reasoning.append(tone_reason)
+        if len(emails) <= 1:
+            return [fetch(email) for email in emails]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fetch, emails))
+    
+    @staticmethod
+    def _context_query(email: Dict) -> str:
+        """Text used to query RAG context for an email."""
+        return email.get('text', '') or email.get('subject', '')
+    
+    def clear_cache(self):
+        """Discard cached score results."""
+        self._score_cache.clear()
+    
+    def _compute_score(
+        self,
+        incoming_email: Dict,
+        draft: Dict,
+        context: Optional[List] = None,
+        sender_factor: Optional[Tuple[float, str]] = None
+    ) -> ScoreResult:
+        """Calculate confidence score for a draft without consulting the cache.
         
-        context_score, context_reason = self._score_context_relevance(incoming_email, draft)
-        reasoning.append(context_reason)
+        Args:
+            incoming_email: Original email dict
+            draft: Generated draft dict
+            context: RAG context already fetched for this email, if any
+            sender_factor: Sender familiarity already scored for this email, if any
+        """
+        if context is None:
+            context = incoming_email.get('_rag_context')
         
+        # Content safety first: anything above LOW risk can never be
+        # auto-sent, so the expensive factors are not worth computing
         safety_score, risk_level, safety_reason = self._score_content_safety(draft)
-        reasoning.append(safety_reason)
+        
+        # Score each factor
+        if sender_factor is None:
+            sender_factor = self._score_sender_familiarity(incoming_email)
+        sender_score, sender_reason = sender_factor
+        length_score, length_reason = self._score_response_length(draft)
+        
+        if risk_level == RiskLevel.LOW:
+            tone_score, tone_reason = self._score_tone_match(incoming_email, draft)
+            context_score, context_reason = self._score_context_relevance(
+                incoming_email, draft, precomputed_context=context
+            )
+        else:
+            tone_score = context_score = self.GATED_FACTOR_SCORE
+            tone_reason = "Tone match skipped - risk gating active"
+            context_reason = "Context relevance skipped - risk gating active"
         
         # Calculate weighted total score
         factors = {
@@ -108,7 +272,7 @@ class ConfidenceScorer:
             score=total_score,
             risk_level=risk_level,
             factors=factors,
-            reasoning=[r for r in reasoning if r],
+            reasoning=[sender_reason, length_reason, tone_reason, context_reason, safety_reason],
             auto_send=auto_send
         )
     
@@ -136,26 +300,23 @@ class ConfidenceScorer:
         """
         sender = email.get('from', '').lower()
         
-        # Check if we have database access and sender history
-        if self.db:
+        # Check sender history if the database provides it
+        if self._get_sender_history:
             try:
-                # Check sender in database
-                if hasattr(self.db, 'get_sender_history'):
-                    history = self.db.get_sender_history(sender)
-                    if history and len(history) > 5:
-                        return 1.0, "Sender has extensive email history"
-                    elif history and len(history) > 0:
-                        return 0.7, "Sender has some email history"
-            except Exception:
-                pass
+                history = self._get_sender_history(sender)
+            except sqlite3.Error:
+                history = None
+            if history and len(history) > 5:
+                return 1.0, "Sender has extensive email history"
+            elif history and len(history) > 0:
+                return 0.7, "Sender has some email history"
         
         # Default: moderate familiarity based on email domain
-        if '@' in sender:
-            domain = sender.split('@')[1] if '@' in sender else ''
-            # Known domains get higher score
-            common_domains = ['gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com']
-            if any(common in domain for common in common_domains):
-                return 0.6, "Sender uses common email provider"
+        # (strip the closing bracket of "Name <addr>" style senders)
+        domain = sender.partition('@')[2].rstrip('> ')
+        # Known domains get higher score
+        if domain in COMMON_DOMAINS:
+            return 0.6, "Sender uses common email provider"
         
         return 0.4, "Unknown sender - default familiarity score"
     
@@ -200,22 +361,10 @@ class ConfidenceScorer:
         if not incoming_text or not draft_text:
             return 0.5, "No text to compare for tone matching"
         
-        # Simple heuristic: check for question marks in incoming
-        # If incoming has questions, draft should be more substantive
-        has_questions = '?' in incoming_text
-        
-        # Check for exclamation marks - indicates enthusiastic tone
-        has_exclamation = '!' in draft_text
-        
         # Check for formal language
-        formal_words = ['please', 'thank you', 'regards', 'sincerely', 'best']
-        informal_words = ['hey', 'cool', 'awesome', 'thanks', 'cheers']
-        
-        incoming_lower = incoming_text.lower()
-        draft_lower = draft_text.lower()
-        
-        formal_count = sum(1 for word in formal_words if word in incoming_lower)
-        informal_count = sum(1 for word in informal_words if word in incoming_lower)
+        incoming_words = _tokenize(incoming_text)
+        formal_count = len(incoming_words & FORMAL_WORDS)
+        informal_count = len(incoming_words & INFORMAL_WORDS)
         
         if formal_count > informal_count:
             return 0.8, "Formal tone matched"
@@ -224,33 +373,48 @@ class ConfidenceScorer:
         else:
             return 0.7, "Neutral tone - default match"
     
-    def _score_context_relevance(self, incoming_email: Dict, draft: Dict) -> Tuple[float, str]:
+    def _score_context_relevance(
+        self,
+        incoming_email: Dict,
+        draft: Dict,
+        precomputed_context: Optional[List] = None
+    ) -> Tuple[float, str]:
         """Score based on context relevance from RAG.
         
         Higher score when draft references relevant past context.
+        
+        Args:
+            incoming_email: Original email dict
+            draft: Generated draft dict
+            precomputed_context: RAG results fetched ahead of time (see
+                prefetch_context); skips the RAG query when given
         """
-        # Check if RAG pipeline is available
-        if self.rag_pipeline:
+        # Check if RAG context is available
+        context = precomputed_context
+        if context is None and self._rag_query:
             try:
-                incoming_text = incoming_email.get('text', '') or incoming_email.get('subject', '')
-                draft_text = draft.get('text', '')
-                
-                # Query RAG for relevant context
-                if hasattr(self.rag_pipeline, 'query'):
-                    context = self.rag_pipeline.query(incoming_text, top_k=3)
-                    if context and len(context) > 0:
-                        # Check if draft references context keywords
-                        context_text = ' '.join(str(c) for c in context)
-                        # Simple keyword overlap check
-                        draft_words = set(draft_text.lower().split())
-                        context_words = set(context_text.lower().split())
-                        overlap = len(draft_words & context_words)
-                        if overlap > 5:
-                            return 0.9, "Draft references relevant context"
-                        elif overlap > 0:
-                            return 0.7, "Some context relevance detected"
+                context = self._rag_query(self._context_query(incoming_email), top_k=3)
             except Exception:
-                pass
+                # RAG backends raise their own error types; a failed lookup
+                # just means no context
+                context = None
+        
+        if context and len(context) > 0:
+            # Simple keyword overlap check. Probe the (small) draft
+            # word set with each context's words instead of building
+            # a set of the whole context, and stop once the result
+            # can no longer change.
+            draft_words = _tokenize(draft.get('text', ''))
+            shared_words = set()
+            for c in context:
+                shared_words.update(draft_words.intersection(_WORD_RE.findall(str(c).lower())))
+                if len(shared_words) > 5:
+                    break
+            overlap = len(shared_words)
+            if overlap > 5:
+                return 0.9, "Draft references relevant context"
+            elif overlap > 0:
+                return 0.7, "Some context relevance detected"
         
         # Default: moderate context relevance
         return 0.6, "No RAG context available - default score"
@@ -269,14 +433,7 @@ class ConfidenceScorer:
         risk_level = self.get_risk_level(text)
         
         # Map risk level to safety score
-        risk_to_score = {
-            RiskLevel.LOW: 1.0,
-            RiskLevel.MEDIUM: 0.7,
-            RiskLevel.HIGH: 0.4,
-            RiskLevel.CRITICAL: 0.0
-        }
-        
-        score = risk_to_score.get(risk_level, 0.5)
+        score = RISK_SCORES[RISK_RANKS[risk_level]]
         
         reason = f"Content safety: {risk_level.value} risk"
         
@@ -293,40 +450,39 @@ class ConfidenceScorer:
         """
         if not text:
             return RiskLevel.LOW
-        
-        text_lower = text.lower()
-        
-        # Check for critical risk patterns
-        critical_matches = []
-        for pattern in FINANCIAL_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                critical_matches.append('financial')
-        for pattern in SENSITIVE_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                critical_matches.append('sensitive')
-        
-        if critical_matches:
-            return RiskLevel.CRITICAL
-        
-        # Check for high risk patterns
-        high_matches = []
-        for pattern in LEGAL_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                high_matches.append('legal')
-        
-        if high_matches:
-            return RiskLevel.HIGH
-        
-        # Check for medium risk (urgent patterns)
-        urgent_matches = []
-        for pattern in URGENT_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                urgent_matches.append('urgent')
-        
-        if urgent_matches:
-            return RiskLevel.MEDIUM
-        
-        return RiskLevel.LOW
+        return self._risk_for_text(text)
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _risk_for_text(text: str) -> RiskLevel:
+        """Classify non-empty text; results are cached by text."""
+        # One pass over the text; stop as soon as a critical match is seen
+        risk_level = RiskLevel.LOW
+        for match in RISK_RE.finditer(text):
+            category_level = CATEGORY_RISK_LEVELS[match.lastgroup]
+            if category_level == RiskLevel.CRITICAL:
+                return category_level
+            if RISK_RANKS[category_level] > RISK_RANKS[risk_level]:
+                risk_level = category_level
+        
+        return risk_level
+
+
+# Tone markers, matched against whole words of the incoming email
+FORMAL_WORDS = frozenset({'please', 'thank', 'regards', 'sincerely', 'best'})
+INFORMAL_WORDS = frozenset({'hey', 'cool', 'awesome', 'thanks', 'cheers'})
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _copy_result(result: ScoreResult) -> ScoreResult:
+    """Copy a ScoreResult so cached entries are never shared with callers."""
+    return replace(result, factors=dict(result.factors), reasoning=list(result.reasoning))
+
+
+def _tokenize(text: str) -> set:
+    """Split text into a set of lowercase words."""
+    return set(_WORD_RE.findall(text.lower()))
 
 
 # Safety patterns
@@ -378,6 +534,48 @@ URGENT_PATTERNS = [
 ]
 
 
+# Well-known email providers, matched exactly against the sender's domain
+COMMON_DOMAINS = frozenset({'gmail.com', 'yahoo.com', 'outlook.com', 'hotmail.com'})
+
+
+def _compile_patterns(patterns: List[str]) -> re.Pattern:
+    """Combine a pattern list into a single case-insensitive alternation."""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+# Each category is scanned with one precompiled regex instead of a loop
+FINANCIAL_RE = _compile_patterns(FINANCIAL_PATTERNS)
+LEGAL_RE = _compile_patterns(LEGAL_PATTERNS)
+SENSITIVE_RE = _compile_patterns(SENSITIVE_PATTERNS)
+URGENT_RE = _compile_patterns(URGENT_PATTERNS)
+
+# Risk level implied by a match in each category
+CATEGORY_RISK_LEVELS = {
+    'financial': RiskLevel.CRITICAL,
+    'sensitive': RiskLevel.CRITICAL,
+    'legal': RiskLevel.HIGH,
+    'urgent': RiskLevel.MEDIUM,
+}
+
+# Content safety score for each risk level, indexed by RISK_RANKS
+RISK_SCORES = (1.0, 0.7, 0.4, 0.0)
+
+# All categories in a single alternation, one named group per category.
+# Critical categories come first so they win ties at the same position.
+RISK_RE = re.compile(
+    "|".join(
+        f"(?P<{category}>{pattern.pattern})"
+        for category, pattern in (
+            ('financial', FINANCIAL_RE),
+            ('sensitive', SENSITIVE_RE),
+            ('legal', LEGAL_RE),
+            ('urgent', URGENT_RE),
+        )
+    ),
+    re.IGNORECASE
+)
+
+
 def analyze_content_risk(text: str) -> Dict[str, List[str]]:
     """Analyze text for risk patterns.
     
@@ -390,22 +588,13 @@ def analyze_content_risk(text: str) -> Dict[str, List[str]]:
     if not text:
         return {'financial': [], 'legal': [], 'sensitive': [], 'urgent': []}
     
-    text_lower = text.lower()
-    
-    def find_matches(patterns: List[str]) -> List[str]:
-        matches = []
-        for pattern in patterns:
-            found = re.findall(pattern, text_lower, re.IGNORECASE)
-            if found:
-                matches.extend(found if isinstance(found[0], str) else [pattern])
-        return matches
-    
-    return {
-        'financial': find_matches(FINANCIAL_PATTERNS),
-        'legal': find_matches(LEGAL_PATTERNS),
-        'sensitive': find_matches(SENSITIVE_PATTERNS),
-        'urgent': find_matches(URGENT_PATTERNS)
-    }
+    # Bucket matches from a single scan by the category group that matched.
+    # RISK_RE is case-insensitive, so only the (short) matches are lowercased
+    # rather than a copy of the whole text.
+    matches = {'financial': [], 'legal': [], 'sensitive': [], 'urgent': []}
+    for match in RISK_RE.finditer(text):
+        matches[match.lastgroup].append(match.group(0).lower())
+    return matches
 
 
 def get_auto_send_eligibility(score: float, risk_level: RiskLevel) -> Tuple[bool, str]:
@@ -419,12 +608,8 @@ def get_auto_send_eligibility(score: float, risk_level: RiskLevel) -> Tuple[bool
         Tuple of (eligible, reason)
     """
     # Check risk level first - only LOW risk can auto-send
-    if risk_level == RiskLevel.CRITICAL:
-        return False, "Critical risk content - manual review required"
-    if risk_level == RiskLevel.HIGH:
-        return False, "High risk content - manual review required"
-    if risk_level == RiskLevel.MEDIUM:
-        return False, "Medium risk content - manual review required"
+    if RISK_RANKS[risk_level] > RISK_RANKS[RiskLevel.LOW]:
+        return False, f"{risk_level.value.capitalize()} risk content - manual review required"
     
     # Check score threshold
     threshold = ConfidenceScorer.AUTO_SEND_THRESHOLD
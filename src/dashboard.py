@@ -1,6 +1,7 @@
 """Gradio dashboard for email draft review."""
 import gradio as gr
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Sequence
 import time
 import threading
 
@@ -21,7 +22,7 @@ class Dashboard:
         self.default_port = 7860
         self.selected_draft_id = None
     
-    def get_pending_drafts(self) -> List[Dict]:
+    def get_pending_drafts(self) -> Sequence[Mapping]:
         """Get pending drafts from database."""
         if self.db is None:
             return get_demo_drafts()
@@ -56,7 +57,7 @@ class Dashboard:
         # TODO: Implement with response generator when ready
         return f"Generated draft for email {email_id} with tone: {tone}"
     
-    def get_draft_by_id(self, draft_id: int) -> Optional[Dict]:
+    def get_draft_by_id(self, draft_id: int) -> Optional[Mapping]:
         """Get a specific draft by ID."""
         drafts = self.get_pending_drafts()
         for draft in drafts:
@@ -64,18 +65,18 @@ class Dashboard:
                 return draft
         return None
     
-    def format_drafts_for_table(self, drafts: List[Dict]) -> List[List[str]]:
+    def format_drafts_for_table(self, drafts: Sequence[Mapping]) -> List[List[str]]:
         """Format drafts for display in table."""
-        table_data = []
-        for draft in drafts:
-            table_data.append([
+        return [
+            [
                 str(draft.get("id", "")),
                 draft.get("subject", ""),
                 draft.get("from", ""),
                 draft.get("preview", ""),
                 draft.get("tone", ""),
-            ])
-        return table_data
+            ]
+            for draft in drafts
+        ]
     
     def build_interface(self) -> gr.Blocks:
         """Build the Gradio interface."""
@@ -90,13 +91,14 @@ class Dashboard:
             with gr.Row():
                 with gr.Column(scale=2):
                     gr.Markdown("## Pending Drafts")
-                    # Draft table
-                    drafts = self.get_pending_drafts()
-                    table_data = self.format_drafts_for_table(drafts)
+                    # Draft table, filled in when the page loads and on
+                    # every refresh. The drafts behind the rows are kept in
+                    # per-session state so selection always matches the table.
+                    drafts_state = gr.State([])
                     
                     drafts_table = gr.Dataframe(
                         headers=["ID", "Subject", "From", "Preview", "Tone"],
-                        value=table_data,
+                        value=[],
                         interactive=False,
                         max_height=300,
                         wrap=True,
@@ -129,9 +131,9 @@ class Dashboard:
             # Event handlers
             def on_refresh():
                 drafts = self.get_pending_drafts()
-                return self.format_drafts_for_table(drafts), ""
+                return self.format_drafts_for_table(drafts), drafts, ""
             
-            def on_table_select(evt: gr.SelectData):
+            def on_table_select(drafts, evt: gr.SelectData):
                 """Handle table row selection."""
                 if evt.index and len(evt.index) > 0:
                     row_idx = evt.index[0]
@@ -162,13 +164,19 @@ class Dashboard:
                 return self.delete_draft(int(draft_id))
             
             # Bind events
+            demo.load(
+                on_refresh,
+                outputs=[drafts_table, drafts_state, status_msg]
+            )
+            
             refresh_btn.click(
                 on_refresh,
-                outputs=[drafts_table, status_msg]
+                outputs=[drafts_table, drafts_state, status_msg]
             )
             
             drafts_table.select(
                 on_table_select,
+                inputs=[drafts_state],
                 outputs=[selected_id, selected_subject, selected_from, selected_tone, draft_text]
             )
             
@@ -233,9 +241,17 @@ DEMO_DRAFTS = [
 ]
 
 
-def get_demo_drafts() -> List[Dict]:
-    """Get demo drafts for testing."""
-    return DEMO_DRAFTS.copy()
+# Read-only views of the demo drafts, shared by every caller
+_DEMO_VIEWS = tuple(MappingProxyType(draft) for draft in DEMO_DRAFTS)
+
+
+def get_demo_drafts() -> Sequence[Mapping]:
+    """Get demo drafts for testing.
+    
+    Returns a shared tuple of read-only mappings; copy a draft with
+    ``dict(draft)`` before modifying it.
+    """
+    return _DEMO_VIEWS
 
 
 # Standard tone options
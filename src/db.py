@@ -1,7 +1,11 @@
 """Database layer for Jeeves Email Assistant using SQLite."""
+import queue
 import sqlite3
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+import threading
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterator, Union
 from contextlib import contextmanager
 
 
@@ -31,10 +35,134 @@ CREATE TABLE IF NOT EXISTS drafts (
 
 CREATE INDEX IF NOT EXISTS idx_emails_thread_id ON emails(thread_id);
 CREATE INDEX IF NOT EXISTS idx_emails_sender ON emails(sender);
+CREATE INDEX IF NOT EXISTS idx_emails_received ON emails(received_at DESC);
 CREATE INDEX IF NOT EXISTS idx_drafts_email_id ON drafts(email_id);
-CREATE INDEX IF NOT EXISTS idx_drafts_status ON drafts(status);
+-- Serves status filters and their ORDER BY created_at without a sort;
+-- supersedes the old single-column idx_drafts_status
+CREATE INDEX IF NOT EXISTS idx_drafts_status_created ON drafts(status, created_at DESC);
+DROP INDEX IF EXISTS idx_drafts_status;
 """
 
+# Hot-path statements. Keeping the SQL text identical across calls lets
+# each connection's statement cache reuse the compiled statement.
+INSERT_EMAIL_SQL = """INSERT INTO emails (sender, subject, body_text, thread_id, received_at)
+   VALUES (?, ?, ?, ?, ?)"""
+INSERT_DRAFT_SQL = """INSERT INTO drafts (email_id, generated_text, tone, status, confidence)
+   VALUES (?, ?, ?, ?, ?)"""
+
+# INSERT ... RETURNING (SQLite 3.35+) hands back the new id from the
+# statement itself; older libraries fall back to cursor.lastrowid
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+INSERT_EMAIL_RETURNING_SQL = INSERT_EMAIL_SQL + " RETURNING id"
+INSERT_DRAFT_RETURNING_SQL = INSERT_DRAFT_SQL + " RETURNING id"
+
+SELECT_EMAIL_SQL = "SELECT * FROM emails WHERE id = ?"
+SELECT_EMAIL_BY_THREAD_SQL = "SELECT * FROM emails WHERE thread_id = ?"
+LIST_EMAILS_SQL = "SELECT * FROM emails ORDER BY received_at DESC LIMIT ? OFFSET ?"
+UPDATE_DRAFT_STATUS_SQL = "UPDATE drafts SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+UPDATE_DRAFT_TEXT_SQL = "UPDATE drafts SET generated_text = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+
+# List queries rendered to a JSON array inside SQLite (JSON1), for callers
+# that only serialize the rows. Columns match the dict-returning methods.
+LIST_EMAILS_JSON_SQL = """SELECT json_group_array(json_object(
+       'id', id, 'thread_id', thread_id, 'sender', sender, 'subject', subject,
+       'body_text', body_text, 'received_at', received_at, 'created_at', created_at)) AS json
+   FROM (SELECT * FROM emails ORDER BY received_at DESC LIMIT ? OFFSET ?)"""
+PENDING_DRAFTS_JSON_SQL = """SELECT json_group_array(json_object(
+       'id', id, 'email_id', email_id, 'generated_text', generated_text, 'tone', tone,
+       'status', status, 'confidence', confidence, 'created_at', created_at,
+       'updated_at', updated_at, 'sender', sender, 'subject', subject,
+       'body_text', body_text)) AS json
+   FROM (SELECT d.*, e.sender, e.subject, e.body_text
+         FROM drafts d
+         JOIN emails e ON d.email_id = e.id
+         WHERE d.status = 'pending'
+         ORDER BY d.created_at DESC)"""
+
+# All counts for get_stats in one statement, using conditional aggregation
+# over drafts instead of a GROUP BY
+STATS_SQL = """SELECT
+       (SELECT COUNT(*) FROM emails) AS emails,
+       COUNT(*) AS drafts,
+       COALESCE(SUM(status = 'pending'), 0) AS pending,
+       COALESCE(SUM(status = 'approved'), 0) AS approved,
+       COALESCE(SUM(status = 'sent'), 0) AS sent,
+       COALESCE(SUM(status = 'rejected'), 0) AS rejected
+   FROM drafts"""
+
+# Compiled statements kept per connection (sqlite3 defaults to 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Per-connection settings for file-backed databases. WAL lets readers run
+# alongside a writer; with WAL, synchronous=NORMAL is still crash-safe and
+# avoids an fsync on every commit. Reads dominate (dashboard refreshes), so
+# pages are memory-mapped and a larger page cache keeps hot pages resident.
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=30000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64MB
+    "PRAGMA mmap_size=268435456",  # 256MB
+)
+
+
+@lru_cache(maxsize=64)
+def _row_class(columns: tuple) -> type:
+    """Namedtuple class for a result set's column names, built once per shape."""
+    return namedtuple("Row", columns, rename=True)
+
+
+@lru_cache(maxsize=128)
+def _update_sql(table: str, columns: tuple, touch: bool = False) -> str:
+    """UPDATE statement for a table and column set, built once per combination.
+    
+    Callers pass the columns in sorted order so each combination maps to
+    one SQL string and thus one cached prepared statement. With touch,
+    updated_at is set to SQLite's CURRENT_TIMESTAMP.
+    """
+    fields = ", ".join(f"{column} = ?" for column in columns)
+    if touch:
+        fields += ", updated_at = CURRENT_TIMESTAMP"
+    return f"UPDATE {table} SET {fields} WHERE id = ?"
+
+
+def _make_dict_row_factory():
+    """Create a row factory that returns each row as a dict.
+    
+    The column names are extracted once per result set: the factory keeps
+    the last cursor.description it saw (a strong reference, so identity
+    checks stay valid) together with its names. Each connection gets its
+    own factory.
+    """
+    last_description = None
+    columns = ()
+    
+    def dict_row_factory(cursor: sqlite3.Cursor, row: tuple) -> Dict[str, Any]:
+        nonlocal last_description, columns
+        description = cursor.description
+        if description is not last_description:
+            columns = tuple(col[0] for col in description)
+            last_description = description
+        return dict(zip(columns, row))
+    
+    return dict_row_factory
+
+
+def _fetch_rows(cursor: sqlite3.Cursor, as_tuples: bool = False) -> List[Any]:
+    """Fetch all rows from an executed cursor.
+    
+    Rows are dicts by default. With as_tuples, rows are namedtuples sharing
+    one class per column layout, which skips building a dict (and its keys)
+    for every row; call ``row._asdict()`` where a dict is needed.
+    """
+    if not as_tuples:
+        return cursor.fetchall()
+    row_class = _row_class(tuple(col[0] for col in cursor.description))
+    # Plain tuples straight from sqlite, skipping the dict row factory
+    cursor.row_factory = None
+    return list(map(row_class._make, cursor.fetchall()))
+
+
 # Draft status constants
 class DraftStatus:
     PENDING = "pending"
@@ -48,38 +176,194 @@ class DraftStatus:
 class Database:
     """SQLite database manager for Jeeves Email Assistant."""
     
-    def __init__(self, db_path: str = "data/jeeves.db"):
+    # Seconds between background maintenance runs (see start_maintenance)
+    MAINTENANCE_INTERVAL = 15 * 60
+    
+    def __init__(self, db_path: str = "data/jeeves.db", pool_size: int = 4):
         """Initialize database connection.
         
         Args:
             db_path: Path to SQLite database file.
+            pool_size: Number of idle read-only connections kept open for
+                file-backed databases (one read-write connection is kept
+                in addition).
         """
         self.db_path = db_path
         self._connection = None
+        # Long-lived connections reused across calls instead of opening the
+        # database file on every operation. Extra connections are opened
+        # when a pool is empty and closed when returned to a full pool.
+        self._write_pool: queue.Queue = queue.Queue(maxsize=1)
+        self._read_pool: queue.Queue = queue.Queue(maxsize=pool_size)
+        self._maintenance_stop: Optional[threading.Event] = None
         self._init_db()
     
     def _init_db(self):
         """Initialize database schema."""
         with self.get_connection() as conn:
             conn.executescript(SCHEMA)
-            conn.commit()
+            if self.db_path != ":memory:":
+                # Journal mode is stored in the database file, so this
+                # only needs to happen once
+                conn.execute("PRAGMA journal_mode=WAL")
+    
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Apply per-connection settings to a new connection."""
+        conn.row_factory = _make_dict_row_factory()
+        if self.db_path != ":memory:":
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+    
+    def checkpoint(self):
+        """Copy committed WAL pages back into the database file.
+        
+        Runs a passive checkpoint, which never blocks readers or writers.
+        Call periodically on long-running processes to keep the WAL small.
+        """
+        if self.db_path == ":memory:":
+            return
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open and configure a new connection to a file-backed database."""
+        if read_only:
+            uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+            conn = sqlite3.connect(
+                uri, uri=True, check_same_thread=False,
+                isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+            )
+            self._configure_connection(conn)
+            # Never let a reader take a write lock, even via PRAGMAs
+            conn.execute("PRAGMA query_only=1")
+            return conn
+        
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False,
+            isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+        )
+        self._configure_connection(conn)
+        return conn
     
     @contextmanager
-    def get_connection(self):
-        """Context manager for database connections."""
-        if self.db_path == ":memory:" and self._connection:
+    def get_connection(self, read_only: bool = False):
+        """Context manager for database connections.
+        
+        Args:
+            read_only: Borrow a read-only connection, which can run
+                alongside the writer under WAL. Ignored for in-memory
+                databases.
+        """
+        if self.db_path == ":memory:":
+            if not self._connection:
+                self._connection = sqlite3.connect(
+                    self.db_path, check_same_thread=False,
+                    isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE
+                )
+                self._configure_connection(self._connection)
             # Reuse in-memory connection
             yield self._connection
-        else:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            if self.db_path == ":memory:":
-                self._connection = conn
+            return
+        
+        pool = self._read_pool if read_only else self._write_pool
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect(read_only)
+        try:
+            yield conn
+        except BaseException:
+            # Never hand a connection with a half-finished transaction to
+            # the next caller
+            conn.rollback()
+            raise
+        finally:
+            try:
+                pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    @contextmanager
+    def transaction(self):
+        """Context manager for a write transaction.
+        
+        Connections run in autocommit mode, so reads never open a
+        transaction. Writes go through here: BEGIN IMMEDIATE takes the
+        write lock up front (instead of upgrading a read lock mid-way),
+        and the block is committed on success or rolled back on error.
+        """
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
             try:
                 yield conn
-            finally:
-                if self.db_path != ":memory:":
-                    conn.close()
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+    
+    def maintenance(self):
+        """Refresh query planner statistics and bound the WAL size.
+        
+        Runs PRAGMA optimize, which re-analyzes only the indexes whose
+        statistics look stale, followed by a passive WAL checkpoint.
+        """
+        if self.db_path == ":memory:":
+            return
+        with self.get_connection() as conn:
+            conn.execute("PRAGMA optimize")
+        self.checkpoint()
+    
+    def start_maintenance(self, interval: float = None):
+        """Run maintenance() periodically on a background daemon thread.
+        
+        Args:
+            interval: Seconds between runs (default: MAINTENANCE_INTERVAL).
+        """
+        if self._maintenance_stop is not None:
+            return
+        interval = interval or self.MAINTENANCE_INTERVAL
+        stop = self._maintenance_stop = threading.Event()
+        
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.maintenance()
+                except sqlite3.Error:
+                    # Busy or locked; try again next interval
+                    pass
+        
+        threading.Thread(target=run, name="jeeves-db-maintenance", daemon=True).start()
+    
+    def stop_maintenance(self):
+        """Stop the background maintenance thread, if running."""
+        if self._maintenance_stop is not None:
+            self._maintenance_stop.set()
+            self._maintenance_stop = None
+    
+    def close(self):
+        """Close all pooled connections.
+        
+        Stops background maintenance and runs PRAGMA optimize first, so
+        the next process starts with fresh planner statistics. A
+        file-backed database can still be used afterwards; connections
+        are reopened on demand. An in-memory database is discarded.
+        """
+        self.stop_maintenance()
+        if self.db_path != ":memory:":
+            try:
+                with self.get_connection() as conn:
+                    conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+        for pool in (self._write_pool, self._read_pool):
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
+        if self._connection:
+            self._connection.close()
+            self._connection = None
     
     # ==================== Email Operations ====================
     
@@ -103,15 +387,22 @@ class Database:
         Returns:
             New email ID.
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """INSERT INTO emails (sender, subject, body_text, thread_id, received_at)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (sender, subject, body_text, thread_id, received_at)
-            )
-            conn.commit()
-            return cursor.lastrowid
+        return self._insert_one(
+            INSERT_EMAIL_SQL,
+            INSERT_EMAIL_RETURNING_SQL,
+            (sender, subject, body_text, thread_id, received_at)
+        )
+    
+    def create_emails_bulk(self, rows: List[tuple]) -> List[int]:
+        """Create several email records in a single transaction.
+        
+        Args:
+            rows: Tuples of (sender, subject, body_text, thread_id, received_at).
+            
+        Returns:
+            New email IDs, in the same order as rows.
+        """
+        return self._insert_many(INSERT_EMAIL_SQL, rows)
     
     def get_email(self, email_id: int) -> Optional[Dict[str, Any]]:
         """Get an email by ID.
@@ -122,11 +413,10 @@ class Database:
         Returns:
             Email record as dictionary or None.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM emails WHERE id = ?", (email_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            cursor.execute(SELECT_EMAIL_SQL, (email_id,))
+            return cursor.fetchone()
     
     def get_email_by_thread_id(self, thread_id: str) -> Optional[Dict[str, Any]]:
         """Get an email by thread ID.
@@ -137,29 +427,62 @@ class Database:
         Returns:
             Email record as dictionary or None.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM emails WHERE thread_id = ?", (thread_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            cursor.execute(SELECT_EMAIL_BY_THREAD_SQL, (thread_id,))
+            return cursor.fetchone()
     
-    def list_emails(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+    def list_emails(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        as_tuples: bool = False
+    ) -> List[Union[Dict[str, Any], tuple]]:
         """List all emails.
         
         Args:
             limit: Maximum number of emails to return.
             offset: Number of emails to skip.
+            as_tuples: Return namedtuples instead of dicts.
             
         Returns:
             List of email records.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "SELECT * FROM emails ORDER BY received_at DESC LIMIT ? OFFSET ?",
-                (limit, offset)
-            )
-            return [dict(row) for row in cursor.fetchall()]
+            cursor.execute(LIST_EMAILS_SQL, (limit, offset))
+            return _fetch_rows(cursor, as_tuples)
+    
+    def iter_emails(self, batch_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Iterate over all emails, newest first, one page at a time.
+        
+        Pages are fetched by keyset (received_at, id) rather than OFFSET,
+        so each page costs the same however deep it is, and no connection
+        is held while the caller processes a page.
+        
+        Args:
+            batch_size: Number of emails fetched per query.
+            
+        Yields:
+            Email records, in list_emails order.
+        """
+        return self._iter_keyset("emails", "received_at", batch_size)
+    
+    def list_emails_json(self, limit: int = 100, offset: int = 0) -> str:
+        """List emails as a JSON array string built by SQLite.
+        
+        Same rows as list_emails, for callers that would only serialize
+        them again.
+        
+        Args:
+            limit: Maximum number of emails to return.
+            offset: Number of emails to skip.
+            
+        Returns:
+            JSON array of email objects.
+        """
+        with self.get_connection(read_only=True) as conn:
+            return conn.execute(LIST_EMAILS_JSON_SQL, (limit, offset)).fetchone()["json"]
     
     def update_email(self, email_id: int, **kwargs) -> bool:
         """Update an email record.
@@ -173,18 +496,7 @@ class Database:
         """
         if not kwargs:
             return False
-        
-        fields = ", ".join(f"{k} = ?" for k in kwargs.keys())
-        values = list(kwargs.values()) + [email_id]
-        
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"UPDATE emails SET {fields} WHERE id = ?",
-                values
-                )
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._update_fields("emails", email_id, kwargs)
     
     def delete_email(self, email_id: int) -> bool:
         """Delete an email and its drafts.
@@ -195,10 +507,9 @@ class Database:
         Returns:
             True if deleted, False if not found.
         """
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM emails WHERE id = ?", (email_id,))
-            conn.commit()
             return cursor.rowcount > 0
     
     # ==================== Draft Operations ====================
@@ -223,15 +534,22 @@ class Database:
         Returns:
             New draft ID.
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """INSERT INTO drafts (email_id, generated_text, tone, status, confidence)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (email_id, generated_text, tone, status, confidence)
-            )
-            conn.commit()
-            return cursor.lastrowid
+        return self._insert_one(
+            INSERT_DRAFT_SQL,
+            INSERT_DRAFT_RETURNING_SQL,
+            (email_id, generated_text, tone, status, confidence)
+        )
+    
+    def create_drafts_bulk(self, rows: List[tuple]) -> List[int]:
+        """Create several drafts in a single transaction.
+        
+        Args:
+            rows: Tuples of (email_id, generated_text, tone, status, confidence).
+            
+        Returns:
+            New draft IDs, in the same order as rows.
+        """
+        return self._insert_many(INSERT_DRAFT_SQL, rows)
     
     def get_draft(self, draft_id: int) -> Optional[Dict[str, Any]]:
         """Get a draft by ID.
@@ -242,63 +560,74 @@ class Database:
         Returns:
             Draft record as dictionary or None.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM drafts WHERE id = ?", (draft_id,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+            return cursor.fetchone()
     
-    def get_drafts_by_email(self, email_id: int) -> List[Dict[str, Any]]:
+    def get_drafts_by_email(
+        self,
+        email_id: int,
+        as_tuples: bool = False
+    ) -> List[Union[Dict[str, Any], tuple]]:
         """Get all drafts for an email.
         
         Args:
             email_id: Email record ID.
+            as_tuples: Return namedtuples instead of dicts.
             
         Returns:
             List of draft records.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM drafts WHERE email_id = ? ORDER BY created_at DESC",
                 (email_id,)
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_rows(cursor, as_tuples)
     
-    def get_drafts_by_status(self, status: str) -> List[Dict[str, Any]]:
+    def get_drafts_by_status(
+        self,
+        status: str,
+        as_tuples: bool = False
+    ) -> List[Union[Dict[str, Any], tuple]]:
         """Get all drafts with a specific status.
         
         Args:
             status: Draft status (pending, approved, sent, rejected).
+            as_tuples: Return namedtuples instead of dicts.
             
         Returns:
             List of draft records.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 "SELECT * FROM drafts WHERE status = ? ORDER BY created_at DESC",
                 (status,)
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_rows(cursor, as_tuples)
     
     def list_drafts(
         self,
         limit: int = 100,
         offset: int = 0,
-        status: str = None
-    ) -> List[Dict[str, Any]]:
+        status: str = None,
+        as_tuples: bool = False
+    ) -> List[Union[Dict[str, Any], tuple]]:
         """List all drafts.
         
         Args:
             limit: Maximum number of drafts to return.
             offset: Number of drafts to skip.
             status: Filter by status.
+            as_tuples: Return namedtuples instead of dicts.
             
         Returns:
             List of draft records.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             if status:
                 cursor.execute(
@@ -311,7 +640,27 @@ class Database:
                     "SELECT * FROM drafts ORDER BY created_at DESC LIMIT ? OFFSET ?",
                     (limit, offset)
                 )
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_rows(cursor, as_tuples)
+    
+    def iter_drafts(
+        self,
+        status: str = None,
+        batch_size: int = 100
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over all drafts, newest first, one page at a time.
+        
+        Uses keyset pagination like iter_emails.
+        
+        Args:
+            status: Filter by status.
+            batch_size: Number of drafts fetched per query.
+            
+        Yields:
+            Draft records, in list_drafts order.
+        """
+        if status:
+            return self._iter_keyset("drafts", "created_at", batch_size, "status = ?", (status,))
+        return self._iter_keyset("drafts", "created_at", batch_size)
     
     def update_draft(
         self,
@@ -330,20 +679,10 @@ class Database:
         if not kwargs:
             return False
         
-        # Add updated_at timestamp
-        kwargs['updated_at'] = datetime.now().isoformat()
-        
-        fields = ", ".join(f"{k} = ?" for k in kwargs.keys())
-        values = list(kwargs.values()) + [draft_id]
-        
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"UPDATE drafts SET {fields} WHERE id = ?",
-                values
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        # Stamp updated_at in SQL, unless the caller sets it explicitly
+        return self._update_fields(
+            "drafts", draft_id, kwargs, touch='updated_at' not in kwargs
+        )
     
     def update_draft_status(
         self,
@@ -361,7 +700,26 @@ class Database:
         """
         if status not in DraftStatus.ALL:
             raise ValueError(f"Invalid status: {status}. Must be one of {DraftStatus.ALL}")
-        return self.update_draft(draft_id, status=status)
+        
+        return self._execute_update(
+            UPDATE_DRAFT_STATUS_SQL,
+            (status, draft_id)
+        )
+    
+    def update_draft_text(self, draft_id: int, generated_text: str) -> bool:
+        """Replace a draft's text.
+        
+        Args:
+            draft_id: Draft record ID.
+            generated_text: New draft email text.
+            
+        Returns:
+            True if updated, False if not found.
+        """
+        return self._execute_update(
+            UPDATE_DRAFT_TEXT_SQL,
+            (generated_text, draft_id)
+        )
     
     def delete_draft(self, draft_id: int) -> bool:
         """Delete a draft.
@@ -372,19 +730,21 @@ class Database:
         Returns:
             True if deleted, False if not found.
         """
-        with self.get_connection() as conn:
+        with self.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM drafts WHERE id = ?", (draft_id,))
-            conn.commit()
             return cursor.rowcount > 0
     
-    def get_pending_drafts(self) -> List[Dict[str, Any]]:
+    def get_pending_drafts(self, as_tuples: bool = False) -> List[Union[Dict[str, Any], tuple]]:
         """Get all pending drafts.
         
+        Args:
+            as_tuples: Return namedtuples instead of dicts.
+            
         Returns:
             List of pending draft records with email info.
         """
-        with self.get_connection() as conn:
+        with self.get_connection(read_only=True) as conn:
             cursor = conn.cursor()
             cursor.execute(
                 """SELECT d.*, e.sender, e.subject, e.body_text
@@ -393,41 +753,127 @@ class Database:
                    WHERE d.status = 'pending'
                    ORDER BY d.created_at DESC"""
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_rows(cursor, as_tuples)
+    
+    def get_pending_drafts_json(self) -> str:
+        """Get pending drafts as a JSON array string built by SQLite.
+        
+        Same rows as get_pending_drafts, for callers that would only
+        serialize them again.
+        
+        Returns:
+            JSON array of pending draft objects with email info.
+        """
+        with self.get_connection(read_only=True) as conn:
+            return conn.execute(PENDING_DRAFTS_JSON_SQL).fetchone()["json"]
     
     # ==================== Utility Methods ====================
     
+    def _iter_keyset(
+        self,
+        table: str,
+        column: str,
+        batch_size: int,
+        where: str = None,
+        params: tuple = ()
+    ) -> Iterator[Dict[str, Any]]:
+        """Page through a table ordered by (column DESC, id DESC).
+        
+        Each page continues after the last (column, id) seen. Rows with a
+        NULL column sort last under DESC and cannot be compared in a row
+        value, so they are paged separately by id.
+        """
+        extra = f" AND {where}" if where else ""
+        select = f"SELECT * FROM {table} WHERE "
+        order = f" ORDER BY {column} DESC, id DESC LIMIT ?"
+        
+        last = None
+        while True:
+            if last is None:
+                sql = select + f"{column} IS NOT NULL" + extra + order
+                args = (*params, batch_size)
+            else:
+                sql = select + f"({column}, id) < (?, ?)" + extra + order
+                args = (*last, *params, batch_size)
+            with self.get_connection(read_only=True) as conn:
+                rows = _fetch_rows(conn.execute(sql, args))
+            yield from rows
+            if len(rows) < batch_size:
+                break
+            last = (rows[-1][column], rows[-1]["id"])
+        
+        last_id = None
+        while True:
+            if last_id is None:
+                sql = select + f"{column} IS NULL" + extra + " ORDER BY id DESC LIMIT ?"
+                args = (*params, batch_size)
+            else:
+                sql = select + f"{column} IS NULL AND id < ?" + extra + " ORDER BY id DESC LIMIT ?"
+                args = (last_id, *params, batch_size)
+            with self.get_connection(read_only=True) as conn:
+                rows = _fetch_rows(conn.execute(sql, args))
+            yield from rows
+            if len(rows) < batch_size:
+                break
+            last_id = rows[-1]["id"]
+    
+    def _insert_one(self, sql: str, returning_sql: str, params: tuple) -> int:
+        """Insert one row and return its id.
+        
+        Uses the RETURNING form of the statement when SQLite supports it.
+        """
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            if SQLITE_HAS_RETURNING:
+                # Exhaust the cursor so the statement is finished before COMMIT
+                new_id = cursor.execute(returning_sql, params).fetchall()[0]["id"]
+            else:
+                new_id = cursor.execute(sql, params).lastrowid
+            return new_id
+    
+    def _update_fields(
+        self,
+        table: str,
+        row_id: int,
+        fields: Dict[str, Any],
+        touch: bool = False
+    ) -> bool:
+        """Update the given columns of one row (and updated_at if touch)."""
+        columns = tuple(sorted(fields))
+        values = [fields[column] for column in columns]
+        values.append(row_id)
+        return self._execute_update(_update_sql(table, columns, touch), values)
+    
+    def _execute_update(self, sql: str, params) -> bool:
+        """Run an UPDATE and report whether a row matched."""
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return cursor.rowcount > 0
+    
+    def _insert_many(self, sql: str, rows: List[tuple]) -> List[int]:
+        """Run an INSERT for every row with one commit.
+        
+        Rows inserted in one transaction get consecutive IDs, so the new
+        IDs are derived from the last one.
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        with self.transaction() as conn:
+            conn.executemany(sql, rows)
+            last_id = conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
+        return list(range(last_id - len(rows) + 1, last_id + 1))
+    
     def get_stats(self) -> Dict[str, int]:
         """Get database statistics.
         
         Returns:
             Dictionary with counts of emails, drafts by status.
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Total emails
-            cursor.execute("SELECT COUNT(*) FROM emails")
-            email_count = cursor.fetchone()[0]
-            
-            # Total drafts
-            cursor.execute("SELECT COUNT(*) FROM drafts")
-            draft_count = cursor.fetchone()[0]
-            
-            # Drafts by status
-            cursor.execute(
-                "SELECT status, COUNT(*) FROM drafts GROUP BY status"
-            )
-            status_counts = {row[0]: row[1] for row in cursor.fetchall()}
-            
-            return {
-                "emails": email_count,
-                "drafts": draft_count,
-                "pending": status_counts.get("pending", 0),
-                "approved": status_counts.get("approved", 0),
-                "sent": status_counts.get("sent", 0),
-                "rejected": status_counts.get("rejected", 0),
-            }
+        with self.get_connection(read_only=True) as conn:
+            # Columns are aliased to the stats keys, so the row is the result
+            return conn.execute(STATS_SQL).fetchone()
 
 
 # Convenience function for quick database access
@@ -1,12 +1,73 @@
 """Gmail client for Jeeves email operations."""
 import os
 import json
-from typing import List, Dict, Optional
+import binascii
+import threading
+from typing import List, Dict, Optional, Tuple
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
 
+# Authorized Gmail services shared by clients on the same thread, keyed by
+# (creds_path, token_path). Per thread because a service wraps a single
+# httplib2.Http, which is not thread-safe.
+_SERVICE_CACHE = threading.local()
+
+# Maps the base64url alphabet onto standard base64
+_URLSAFE_TO_STD = bytes.maketrans(b'-_', b'+/')
+
+
+def _thread_services() -> Dict[Tuple[str, str], object]:
+    """Get the calling thread's service cache."""
+    services = getattr(_SERVICE_CACHE, 'services', None)
+    if services is None:
+        services = _SERVICE_CACHE.services = {}
+    return services
+
+
+def _decode_body(data: str) -> str:
+    """Decode Gmail base64url body data to text.
+    
+    Translates to the standard alphabet and decodes with binascii
+    directly, restoring any padding Gmail left off. Invalid UTF-8 is
+    replaced rather than failing the whole message.
+    """
+    raw = data.encode('ascii').translate(_URLSAFE_TO_STD)
+    raw += b'=' * (-len(raw) % 4)
+    return binascii.a2b_base64(raw).decode('utf-8', 'replace')
+
+
+# Index of each body MIME type in the (text, html) pair
+_BODY_SLOTS = {'text/plain': 0, 'text/html': 1}
+
+
+def _find_body_data(parts: List[Dict]) -> List[str]:
+    """Find the first text/plain and text/html body data in a MIME tree.
+    
+    Walks the parts depth-first in document order with an explicit stack
+    and stops as soon as both bodies are found.
+    
+    Args:
+        parts: Gmail API message payload parts
+        
+    Returns:
+        [text_data, html_data], still base64url-encoded ('' if missing)
+    """
+    found = ['', '']
+    stack = list(reversed(parts))
+    while stack:
+        part = stack.pop()
+        slot = _BODY_SLOTS.get(part.get('mimeType'))
+        if slot is not None and not found[slot]:
+            found[slot] = part.get('body', {}).get('data', '')
+            if found[0] and found[1]:
+                break
+        if part.get('parts'):
+            stack.extend(reversed(part['parts']))
+    return found
+
+
 class GmailClient:
     """Gmail API wrapper for Jeeves email operations."""
     
@@ -16,6 +77,24 @@ class GmailClient:
         'https://www.googleapis.com/auth/gmail.send'
     ]
     
+    # Gmail accepts up to 100 calls per batch but recommends at most 50
+    # to avoid rate limiting
+    BATCH_SIZE = 50
+    
+    # Partial-response mask for full messages: only the headers, snippet
+    # and body data that _parse_message reads, skipping attachment payloads
+    # and other metadata. Nested parts are listed a few levels deep.
+    MESSAGE_FIELDS = (
+        'id,threadId,snippet,'
+        'payload(headers(name,value),'
+        'parts(mimeType,body/data,'
+        'parts(mimeType,body/data,'
+        'parts(mimeType,body/data,parts))))'
+    )
+    
+    # Headers requested when only a listing view is needed
+    METADATA_HEADERS = ['Subject', 'From', 'To', 'Date']
+    
     def __init__(self, creds_path: str = None, token_path: str = "data/gmail_token.json"):
         """Initialize Gmail client.
         
@@ -29,7 +108,28 @@ class GmailClient:
         self._authenticate()
     
     def _authenticate(self):
-        """Authenticate using OAuth 2.0."""
+        """Authenticate using OAuth 2.0.
+        
+        The token file is read and the Gmail service built once per
+        (creds_path, token_path) per thread; later clients created on the
+        same thread reuse it.
+        """
+        key = (self.creds_path, self.token_path)
+        services = _thread_services()
+        service = services.get(key)
+        if service is None:
+            service, creds = self._build_service()
+            # Only share services that are actually authorized
+            if creds is not None:
+                services[key] = service
+        self.service = service
+    
+    def _build_service(self):
+        """Load or obtain credentials and build the Gmail service.
+        
+        Returns:
+            Tuple of (service, credentials or None)
+        """
         from google.auth.transport.requests import Request
         creds = None
         
@@ -49,13 +149,24 @@ class GmailClient:
                 with open(self.token_path, 'w') as f:
                     f.write(creds.to_json())
         
-        self.service = build('gmail', 'v1', credentials=creds)
+        # Use the discovery document bundled with google-api-python-client
+        # instead of fetching it over HTTPS
+        return build('gmail', 'v1', credentials=creds, static_discovery=True), creds
     
-    def list_emails(self, limit: int = 100) -> List[Dict]:
+    def list_emails(
+        self,
+        limit: int = 100,
+        headers_only: bool = False,
+        include_html: bool = True
+    ) -> List[Dict]:
         """Fetch recent emails.
         
         Args:
             limit: Maximum number of emails to fetch
+            headers_only: Fetch only the listing headers and snippet; body_text
+                and body_html are left empty
+            include_html: Decode the HTML body even when a plain-text body
+                exists (see _parse_message)
             
         Returns:
             List of email dicts with: id, thread_id, subject, from, date, snippet
@@ -67,59 +178,93 @@ class GmailClient:
         messages = results.get('messages', [])
         emails = []
         
-        for msg in messages:
-            email = self.get_email(msg['id'])
-            if email:
-                emails.append(email)
+        # Fetch full messages in batched HTTP requests rather than one
+        # round trip per message
+        for start in range(0, len(messages), self.BATCH_SIZE):
+            chunk = messages[start:start + self.BATCH_SIZE]
+            responses = {}
+            errors = []
+            
+            def collect(request_id, response, exception):
+                if exception is not None:
+                    errors.append(exception)
+                else:
+                    responses[request_id] = response
+            
+            batch = self.service.new_batch_http_request(callback=collect)
+            for i, msg in enumerate(chunk):
+                batch.add(self._message_request(msg['id'], headers_only), request_id=str(i))
+            batch.execute()
+            if errors:
+                raise errors[0]
+            
+            for i in range(len(chunk)):
+                msg = responses.get(str(i))
+                if msg:
+                    emails.append(self._parse_message(msg, include_html))
         
         return emails
     
-    def get_email(self, message_id: str) -> Dict:
+    def get_email(self, message_id: str, include_html: bool = True) -> Dict:
         """Fetch a specific email by message ID.
         
         Args:
             message_id: Gmail message ID
+            include_html: Decode the HTML body even when a plain-text body
+                exists (see _parse_message)
             
         Returns:
             Email dict with: id, thread_id, subject, from, to, date, body_text, body_html
         """
-        import base64
-        
-        msg = self.service.users().messages().get(
-            userId='me', id=message_id, format='full'
-        ).execute()
+        msg = self._message_request(message_id).execute()
+        return self._parse_message(msg, include_html)
+    
+    def _message_request(self, message_id: str, headers_only: bool = False):
+        """Build a messages.get request asking only for the fields we use."""
+        messages = self.service.users().messages()
+        if headers_only:
+            return messages.get(
+                userId='me', id=message_id, format='metadata',
+                metadataHeaders=self.METADATA_HEADERS
+            )
+        return messages.get(
+            userId='me', id=message_id, format='full', fields=self.MESSAGE_FIELDS
+        )
+    
+    @staticmethod
+    def _parse_message(msg: Dict, include_html: bool = True) -> Dict:
+        """Convert a Gmail API message resource into an email dict.
         
-        headers = msg.get('payload', {}).get('headers', [])
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-        from_addr = next((h['value'] for h in headers if h['name'] == 'From'), '')
-        to_addr = next((h['value'] for h in headers if h['name'] == 'To'), '')
-        date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+        Args:
+            msg: Message resource fetched with format='full' or 'metadata'
+            include_html: When False and the message has a plain-text body,
+                skip decoding the (usually much larger) HTML body and leave
+                body_html empty. HTML-only messages still get body_html.
+            
+        Returns:
+            Email dict with: id, thread_id, subject, from, to, date, body_text, body_html
+        """
+        # Header names are case-insensitive (RFC 5322); index them once.
+        # Iterate in reverse so the first occurrence of a repeated header wins.
+        headers = {
+            h['name'].lower(): h['value']
+            for h in reversed(msg.get('payload', {}).get('headers', []))
+        }
+        subject = headers.get('subject', '')
+        from_addr = headers.get('from', '')
+        to_addr = headers.get('to', '')
+        date = headers.get('date', '')
         
-        # Extract body
-        body_text = ''
-        body_html = ''
+        # Extract body (decoded once, after the walk)
         parts = msg.get('payload', {}).get('parts', [])
-        
-        def get_body(parts):
-            text = ''
-            html = ''
-            for part in parts:
-                if part.get('mimeType') == 'text/plain':
-                    text = part.get('body', {}).get('data', '')
-                elif part.get('mimeType') == 'text/html':
-                    html = part.get('body', {}).get('data', '')
-                if part.get('parts'):
-                    t, h = get_body(part['parts'])
-                    text = text or t
-                    html = html or h
-            return text, html
-        
-        body_text, body_html = get_body(parts)
+        body_text, body_html = _find_body_data(parts)
         
         if body_text:
-            body_text = base64.urlsafe_b64decode(body_text).decode('utf-8')
-        if body_html:
-            body_html = base64.urlsafe_b64decode(body_html).decode('utf-8')
+            body_text = _decode_body(body_text)
+        if body_html and not include_html and body_text:
+            body_html = ''
+        elif body_html:
+            body_html = _decode_body(body_html)
         
         return {
             'id': msg['id'],
@@ -1,44 +1,116 @@
 """Email ingestion from Gmail Takeout .mbox files."""
 import argparse
+import codecs
 import csv
 import os
 from datetime import datetime
 from email import policy
 from email.parser import BytesParser
-from mailbox import mbox
-from typing import List, Dict, Optional
+from email.utils import parseaddr
+from html.parser import HTMLParser
+from typing import Iterator, List, Dict, Optional
 import re
 
 
+# Patterns used per email, compiled once
+_EMAIL_ADDR_RE = re.compile(r'<([^>]+)>')
+_QUOTED_LINE_RE = re.compile(r'^>.*\n?', re.MULTILINE)
+_SIGNATURE_RE = re.compile(r'\n--\s*\n.*', re.DOTALL)
+_BLANK_LINES_RE = re.compile(r'\n\n\n+')
+
+# Lowercase markers of auto-generated mail. Optional hyphens are spelled
+# out as both variants so each marker is a plain substring test.
+AUTO_MARKERS = (
+    "auto-generated", "autogenerated", "auto-reply", "autoreply",
+    "out of office", "ooo", "delivery failed", "undelivered",
+    "mailer-daemon", "mailerdaemon", "noreply", "no-reply",
+    "don't reply", "notification",
+)
+
+
+def iter_mbox(mbox_path: str) -> Iterator:
+    """Yield messages from an mbox file in a single streaming pass.
+
+    Splits on "From " separator lines the same way mailbox.mbox does, but
+    without building an index of the whole file first, so only one message
+    is held in memory at a time.
+
+    Args:
+        mbox_path: Path to the .mbox file.
+
+    Yields:
+        email.message.Message for each message in the file.
+    """
+    parser = BytesParser()
+    with open(mbox_path, 'rb') as f:
+        lines = None
+        for line in f:
+            if line.startswith(b'From '):
+                if lines is not None:
+                    yield _parse_mbox_message(parser, lines)
+                lines = []
+            elif lines is not None:
+                lines.append(line)
+        if lines is not None:
+            yield _parse_mbox_message(parser, lines)
+
+
+def _parse_mbox_message(parser: BytesParser, lines: List[bytes]):
+    """Parse one message body, dropping the blank line before the next separator."""
+    if lines and lines[-1] in (b'\n', b'\r\n'):
+        lines.pop()
+    return parser.parsebytes(b''.join(lines))
+
+# Body text kept per MIME part; longer bodies add nothing to training data
+MAX_BODY_CHARS = 50_000
+_DECODE_CHUNK = 64 * 1024
+_BODY_TYPES = ('text/plain', 'text/html')
+
+# Training CSV layout; rows are written as tuples in this order
+CSV_FIELDS = ('thread_id', 'from', 'subject', 'body_text', 'sent_by_you', 'timestamp')
+CSV_BATCH_ROWS = 1000
+CSV_BUFFER_BYTES = 1 << 20
+
+
 def parse_mbox(mbox_path: str, output_csv: str = "data/training_emails.csv", user_email: str = None, sent_only: bool = False) -> int:
     """Parse .mbox file and extract email data."""
     count = 0
     os.makedirs(os.path.dirname(output_csv) or '.', exist_ok=True)
     
-    with open(output_csv, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=['thread_id', 'from', 'subject', 'body_text', 'sent_by_you', 'timestamp'])
-        writer.writeheader()
+    with open(output_csv, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_BYTES) as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        rows = []
         
         try:
-            for msg in mbox(mbox_path):
+            for msg in iter_mbox(mbox_path):
+                # Header-only checks first; body extraction walks and decodes
+                # the MIME tree, so only do it for mail that can be kept
+                sent = is_sent_email(msg, user_email)
+                if sent_only and not sent:
+                    continue
                 subject = extract_subject(msg)
+                if _has_auto_marker(subject):
+                    continue
                 body = extract_body(msg)
                 if not filter_useful_email(body, subject):
                     continue
-                if sent_only and not is_sent_email(msg, user_email):
-                    continue
-                row = {
-                    'thread_id': extract_thread_id(msg) or f"thread_{count}",
-                    'from': msg.get('From', ''),
-                    'subject': subject,
-                    'body_text': clean_body(body),
-                    'sent_by_you': 'True' if is_sent_email(msg, user_email) else 'False',
-                    'timestamp': get_timestamp(msg) or ''
-                }
-                writer.writerow(row)
+                rows.append((
+                    extract_thread_id(msg) or f"thread_{count}",
+                    msg.get('From', ''),
+                    subject,
+                    clean_body(body),
+                    'True' if sent else 'False',
+                    get_timestamp(msg) or '',
+                ))
                 count += 1
+                if len(rows) >= CSV_BATCH_ROWS:
+                    writer.writerows(rows)
+                    rows.clear()
         except Exception as e:
             print(f"Error parsing mbox: {e}")
+        finally:
+            writer.writerows(rows)
     
     return count
 
@@ -47,8 +119,14 @@ def extract_email_address(header_value: str) -> str:
     """Extract email address from From header."""
     if not header_value:
         return ''
+    # Quoted display names and comments can hold '<', '>' or '@' of their
+    # own; only those headers need the full RFC 5322 parser
+    if '"' in header_value or '(' in header_value:
+        address = parseaddr(header_value)[1]
+        if address:
+            return address
     # Match <email@example.com> pattern first
-    match = re.search(r'<([^>]+)>', header_value)
+    match = _EMAIL_ADDR_RE.search(header_value)
     if match:
         return match.group(1).strip()
     # Otherwise return whole thing (it's just an email)
@@ -59,11 +137,14 @@ def clean_body(body: str) -> str:
     """Clean email body text."""
     if not body:
         return ''
-    lines = body.split('\n')
-    cleaned_lines = [l for l in lines if not l.startswith('>')]
-    body = '\n'.join(cleaned_lines)
-    body = re.sub(r'\n--\s*\n.*', '', body, flags=re.DOTALL)
-    body = re.sub(r'\n\n\n+', '\n\n', body)
+    # Drop quoted lines with their line breaks; a quoted final line has no
+    # break of its own, so drop the one before it instead
+    quoted_last_line = body.rpartition('\n')[2].startswith('>')
+    body = _QUOTED_LINE_RE.sub('', body)
+    if quoted_last_line and body.endswith('\n'):
+        body = body[:-1]
+    body = _SIGNATURE_RE.sub('', body)
+    body = _BLANK_LINES_RE.sub('\n\n', body)
     return body.strip()
 
 
@@ -119,61 +200,103 @@ def extract_subject(email_message) -> str:
     return subject.strip()
 
 
+class _TextExtractor(HTMLParser):
+    """Collect text content from HTML, skipping script and style elements."""
+
+    _SKIP_TAGS = frozenset(('script', 'style'))
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pieces: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.pieces.append(data)
+
+
+def html_to_text(html_body: str) -> str:
+    """Strip tags from an HTML body in one linear pass.
+
+    Unlike a tag-stripping regex, this handles '>' inside attribute values
+    and comments, and drops script and style contents.
+    """
+    parser = _TextExtractor()
+    parser.feed(html_body)
+    parser.close()
+    return ''.join(parser.pieces)
+
+
+def _decode_payload(payload: bytes, charset: str, limit: int = MAX_BODY_CHARS) -> str:
+    """Decode a part payload in chunks, stopping once limit characters are read."""
+    decoder = codecs.getincrementaldecoder(charset)(errors='ignore')
+    view = memoryview(payload)
+    pieces = []
+    size = 0
+    for start in range(0, len(view), _DECODE_CHUNK):
+        text = decoder.decode(view[start:start + _DECODE_CHUNK])
+        pieces.append(text)
+        size += len(text)
+        if size >= limit:
+            return ''.join(pieces)[:limit]
+    pieces.append(decoder.decode(b'', final=True))
+    return ''.join(pieces)
+
+
 def extract_body(email_message) -> str:
     """Extract body text from email."""
-    body = ''
-    html_body = ''
+    body_chunks = []
+    html_chunks = []
+    body_size = 0
     
-    def get_parts(parts):
-        nonlocal body, html_body
-        for part in parts:
-            mt = part.get_content_type()
-            payload = part.get_payload(decode=True)
-            if payload:
-                charset = part.get_content_charset() or 'utf-8'
-                text = payload.decode(charset, errors='ignore')
-                if mt == 'text/plain':
-                    body += text
-                elif mt == 'text/html':
-                    html_body += text
-            if part.is_multipart():
-                get_parts(part.get_payload())
+    # walk() visits the message and every nested part depth-first without
+    # recursion; containers and attachments are skipped before decoding
+    for part in email_message.walk():
+        mt = part.get_content_type()
+        if mt == 'text/plain':
+            if body_size >= MAX_BODY_CHARS:
+                break
+        elif mt != 'text/html' or body_chunks:
+            # HTML is only used when there is no plain-text body
+            continue
+        payload = part.get_payload(decode=True)
+        if not payload:
+            continue
+        charset = part.get_content_charset() or 'utf-8'
+        text = _decode_payload(payload, charset)
+        if mt == 'text/plain':
+            body_chunks.append(text)
+            body_size += len(text)
+        else:
+            html_chunks.append(text)
     
-    payload = email_message.get_payload()
-    if email_message.is_multipart():
-        get_parts(payload)
-    else:
-        payload = email_message.get_payload(decode=True)
-        if payload:
-            ct = email_message.get_content_type()
-            charset = email_message.get_content_charset() or 'utf-8'
-            text = payload.decode(charset, errors='ignore')
-            if ct == 'text/plain':
-                body = text
-            elif ct == 'text/html':
-                html_body = text
-    
-    if body:
-        return body
-    if html_body:
-        return re.sub(r'<[^>]+>', '', html_body)
+    if body_chunks:
+        return ''.join(body_chunks)[:MAX_BODY_CHARS]
+    if html_chunks:
+        return html_to_text(''.join(html_chunks))
     return ''
 
 
+def _has_auto_marker(text: str) -> bool:
+    """Check whether text contains any auto-generated mail marker."""
+    text = text.lower()
+    return any(marker in text for marker in AUTO_MARKERS)
+
+
 def filter_useful_email(body: str, subject: str) -> bool:
     """Filter out auto-generated emails."""
-    auto_patterns = [
-        r'auto-?generated', r'auto-?reply', r'out of office', r'ooo',
-        r'delivery failed', r'undelivered', r'mailer-?daemon',
-        r'noreply', r'no-?reply', r'don\'t reply', r'notification',
-    ]
-    text = (subject + ' ' + body).lower()
-    for pattern in auto_patterns:
-        if re.search(pattern, text):
-            return False
-    if len(body.strip()) < 50:
+    # len() is free; only bodies long enough to pass pay for the strip copy
+    if len(body) < 50 or len(body.strip()) < 50:
         return False
-    return True
+    return not (_has_auto_marker(subject) or _has_auto_marker(body))
 
 
 def main():
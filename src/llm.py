@@ -1,8 +1,10 @@
 """Local LLM wrapper using Ollama."""
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from typing import Iterator, List, Dict, Optional
 
 
 class LLM:
@@ -10,6 +12,7 @@ class LLM:
     
     DEFAULT_MODEL = "mistral:7b-instruct"
     DEFAULT_BASE_URL = "http://localhost:11434"
+    POOL_SIZE = 4
     
     def __init__(
         self,
@@ -23,12 +26,17 @@ class LLM:
         self.base_url = base_url or os.environ.get('OLLAMA_BASE_URL', self.DEFAULT_BASE_URL)
         self.temperature = temperature
         self.max_tokens = max_tokens
+        # Keep-alive session so repeated calls reuse the Ollama connection
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
     
     def _make_request(self, endpoint: str, payload: dict) -> dict:
         """Make request to Ollama API."""
         url = f"{self.base_url}/api/{endpoint}"
         try:
-            response = requests.post(url, json=payload, timeout=120)
+            response = self._session.post(url, json=payload, timeout=120)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.ConnectionError:
@@ -36,8 +44,30 @@ class LLM:
         except Exception as e:
             raise RuntimeError(f"Ollama API error: {e}")
     
-    def generate(self, prompt: str, system_prompt: str = None) -> str:
-        """Generate text from prompt."""
+    def _make_request_stream(self, endpoint: str, payload: dict) -> Iterator[dict]:
+        """Make a streaming request to Ollama API, yielding each JSON chunk."""
+        url = f"{self.base_url}/api/{endpoint}"
+        try:
+            with self._session.post(url, json={**payload, "stream": True}, timeout=120, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if 'error' in chunk:
+                        raise RuntimeError(chunk['error'])
+                    yield chunk
+                    if chunk.get('done'):
+                        break
+        except requests.exceptions.ConnectionError:
+            raise RuntimeError("Ollama is not running. Start with: ollama serve")
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Ollama API error: {e}")
+    
+    def _generate_payload(self, prompt: str, system_prompt: str = None) -> dict:
+        """Build the request payload for the generate endpoint."""
         payload = {
             "model": self.model,
             "prompt": prompt,
@@ -46,9 +76,41 @@ class LLM:
         }
         if system_prompt:
             payload["system"] = system_prompt
+        return payload
+    
+    def generate_iter(self, prompt: str, system_prompt: str = None) -> Iterator[str]:
+        """Generate text from prompt, yielding fragments as Ollama produces them.
+        
+        Lets callers render partial output or stop early instead of waiting
+        for the full token budget. Closing the generator closes the stream.
+        """
+        payload = self._generate_payload(prompt, system_prompt)
+        for chunk in self._make_request_stream("generate", payload):
+            text = chunk.get('response')
+            if text:
+                yield text
+    
+    def generate(self, prompt: str, system_prompt: str = None) -> str:
+        """Generate text from prompt."""
+        return ''.join(self.generate_iter(prompt, system_prompt)).strip()
+    
+    def generate_batch(
+        self,
+        prompts: List[str],
+        system_prompt: str = None,
+        max_workers: int = None
+    ) -> List[str]:
+        """Generate text for several prompts concurrently.
         
-        result = self._make_request("generate", payload)
-        return result.get('response', '').strip()
+        Ollama still queues the work, but requests are in flight together
+        instead of paying a round trip between each one. Results are
+        returned in prompt order.
+        """
+        if len(prompts) <= 1:
+            return [self.generate(prompt, system_prompt) for prompt in prompts]
+        workers = min(max_workers or self.POOL_SIZE, len(prompts))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda prompt: self.generate(prompt, system_prompt), prompts))
     
     def generate_with_context(
         self,
@@ -102,7 +164,7 @@ Answer:"""
         """Check if Ollama is running and model is available."""
         try:
             # Try to list models
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 models = response.json().get('models', [])
                 model_names = [m.get('name', '').split(':')[0] for m in models]
@@ -114,7 +176,7 @@ Answer:"""
     def list_models(self) -> List[str]:
         """List available models."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=10)
             if response.status_code == 200:
                 models = response.json().get('models', [])
                 return [m.get('name', '') for m in models]
@@ -1,8 +1,12 @@
 """Structured logging for Jeeves."""
 import os
 import json
+import atexit
 import logging
-from datetime import datetime
+import sys
+import threading
+import time
+import weakref
 from pathlib import Path
 from typing import Any, Dict, Optional
 from dataclasses import dataclass, asdict
@@ -18,6 +22,84 @@ class LogLevel(Enum):
     CRITICAL = "critical"
 
 
+# Numeric severity of each level, so filtering is a single int comparison.
+# LogLevel values stay strings because they are written into log entries.
+LEVEL_RANKS = {
+    LogLevel.DEBUG: 10,
+    LogLevel.INFO: 20,
+    LogLevel.WARNING: 30,
+    LogLevel.ERROR: 40,
+    LogLevel.CRITICAL: 50,
+}
+_INFO_RANK = LEVEL_RANKS[LogLevel.INFO]
+_WARNING_RANK = LEVEL_RANKS[LogLevel.WARNING]
+
+
+# (epoch second, formatted "YYYY-MM-DDTHH:MM:SS") for the last timestamp;
+# replaced as a whole so concurrent readers always see a matching pair
+_timestamp_cache = (None, '')
+
+
+def utc_timestamp() -> str:
+    """Get the current UTC time as ISO 8601 with milliseconds and a Z suffix.
+    
+    The date and time-of-day part is formatted once per second and reused,
+    so most calls only format the millisecond tail.
+    """
+    global _timestamp_cache
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_seconds, prefix = _timestamp_cache
+    if cached_seconds != seconds:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))
+        _timestamp_cache = (seconds, prefix)
+    return f"{prefix}.{nanos // 1_000_000:03d}Z"
+
+
+# Shared encoder; json.dumps with non-default options builds a new one per call
+_json_encoder = json.JSONEncoder(ensure_ascii=False)
+
+# Open loggers whose buffered output is flushed in the background
+_open_loggers: "weakref.WeakSet[JeevesLogger]" = weakref.WeakSet()
+_flusher_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+
+
+def _flush_open_loggers():
+    """Flush every open logger's buffered output.
+    
+    A failing logger is reported and skipped, so one bad file (e.g. a full
+    disk) neither stops the others from flushing nor kills the flusher thread.
+    """
+    for logger in list(_open_loggers):
+        try:
+            logger.flush()
+        except Exception as e:
+            print(f"Failed to flush log {logger._log_path}: {e}", file=sys.stderr)
+
+
+def _flush_loop(interval: float):
+    """Background loop flushing open loggers every interval seconds."""
+    while True:
+        time.sleep(interval)
+        _flush_open_loggers()
+
+
+def _register_for_flush(logger: "JeevesLogger"):
+    """Track a logger for periodic flushing, starting the flusher on first use."""
+    global _flusher
+    _open_loggers.add(logger)
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(
+                target=_flush_loop,
+                args=(JeevesLogger.FLUSH_INTERVAL,),
+                name="jeeves-log-flusher",
+                daemon=True
+            )
+            _flusher.start()
+            atexit.register(_flush_open_loggers)
+
+
 @dataclass
 class LogEntry:
     """Structured log entry."""
@@ -37,6 +119,10 @@ class JeevesLogger:
     
     DEFAULT_LOG_DIR = "logs"
     DEFAULT_LOG_FILE = "jeeves.jsonl"
+    FLUSH_INTERVAL = 1.0
+    WRITE_BUFFER_SIZE = 65536
+    # Levels written straight through so they survive a crash
+    FLUSH_LEVELS = frozenset(("error", "critical"))
     
     def __init__(
         self,
@@ -63,17 +149,32 @@ class JeevesLogger:
         
         self._log_path = os.path.join(self.log_dir, self.log_file)
         
-        # Open file in append mode
-        self._file = open(self._log_path, 'a', encoding='utf-8')
+        # Open file in append mode; lines are buffered and flushed in the
+        # background every FLUSH_INTERVAL seconds, on close and at exit
+        self._lock = threading.Lock()
+        self._file = open(self._log_path, 'a', encoding='utf-8', buffering=self.WRITE_BUFFER_SIZE)
+        _register_for_flush(self)
     
     def _get_timestamp(self) -> str:
         """Get current timestamp in ISO 8601 format."""
-        return datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+        return utc_timestamp()
+    
+    @property
+    def level(self) -> LogLevel:
+        """Minimum level written to the log."""
+        return self._level
+    
+    @level.setter
+    def level(self, level: LogLevel):
+        self._level = level
+        self._level_rank = LEVEL_RANKS[level]
     
-    def _should_log(self, level: LogLevel) -> bool:
-        """Check if the given level should be logged."""
-        level_order = [LogLevel.DEBUG, LogLevel.INFO, LogLevel.WARNING, LogLevel.ERROR, LogLevel.CRITICAL]
-        return level_order.index(level) >= level_order.index(self.level)
+    def enabled_for(self, level: LogLevel) -> bool:
+        """Check whether entries at level would be written.
+        
+        Lets callers skip building expensive log data that would be dropped.
+        """
+        return LEVEL_RANKS[level] >= self._level_rank
     
     def _create_entry(
         self,
@@ -102,19 +203,19 @@ class JeevesLogger:
     
     def info(self, message: str, action: str, data: Dict = None, **kwargs):
         """Log info level."""
-        if self._should_log(LogLevel.INFO):
+        if self.enabled_for(LogLevel.INFO):
             entry = self._create_entry(LogLevel.INFO, message, action, data, **kwargs)
             self._write(entry)
     
     def warning(self, message: str, action: str, data: Dict = None, **kwargs):
         """Log warning level."""
-        if self._should_log(LogLevel.WARNING):
+        if self.enabled_for(LogLevel.WARNING):
             entry = self._create_entry(LogLevel.WARNING, message, action, data, **kwargs)
             self._write(entry)
     
     def error(self, message: str, action: str, error: Exception = None, data: Dict = None, **kwargs):
         """Log error level."""
-        if self._should_log(LogLevel.ERROR):
+        if self.enabled_for(LogLevel.ERROR):
             if error:
                 error_str = f"{type(error).__name__}: {str(error)}"
             else:
@@ -124,12 +225,14 @@ class JeevesLogger:
     
     def debug(self, message: str, action: str, data: Dict = None, **kwargs):
         """Log debug level."""
-        if self._should_log(LogLevel.DEBUG):
+        if self.enabled_for(LogLevel.DEBUG):
             entry = self._create_entry(LogLevel.DEBUG, message, action, data, **kwargs)
             self._write(entry)
     
     def log_draft_created(self, draft_id: int, email_id: int, tone: str, confidence: float):
         """Log draft creation."""
+        if _INFO_RANK < self._level_rank:
+            return
         self.info(
             message="Draft created",
             action="draft_created",
@@ -143,6 +246,8 @@ class JeevesLogger:
     
     def log_draft_sent(self, draft_id: int, subject: str, recipient: str):
         """Log draft sent."""
+        if _INFO_RANK < self._level_rank:
+            return
         self.info(
             message="Draft sent",
             action="draft_sent",
@@ -155,6 +260,8 @@ class JeevesLogger:
     
     def log_draft_edited(self, draft_id: int, edits_count: int):
         """Log draft edited."""
+        if _INFO_RANK < self._level_rank:
+            return
         self.info(
             message="Draft edited",
             action="draft_edited",
@@ -166,6 +273,8 @@ class JeevesLogger:
     
     def log_draft_rejected(self, draft_id: int, reason: str = None):
         """Log draft rejected."""
+        if _WARNING_RANK < self._level_rank:
+            return
         self.warning(
             message="Draft rejected",
             action="draft_rejected",
@@ -177,6 +286,8 @@ class JeevesLogger:
     
     def log_email_processed(self, email_id: str, processing_time_ms: float):
         """Log email processing."""
+        if _INFO_RANK < self._level_rank:
+            return
         self.info(
             message="Email processed",
             action="email_processed",
@@ -200,18 +311,35 @@ class JeevesLogger:
     def _write(self, entry: LogEntry):
         """Write log entry to file."""
         try:
-            json_line = json.dumps(asdict(entry), ensure_ascii=False)
-            self._file.write(json_line + '\n')
-            self._file.flush()
+            # vars() serializes the entry's fields in place, without the
+            # deep copy asdict() makes; asdict() is only needed when data
+            # holds dataclasses, which it converts and vars() does not
+            try:
+                json_line = _json_encoder.encode(vars(entry))
+            except TypeError:
+                json_line = _json_encoder.encode(asdict(entry))
+            with self._lock:
+                self._file.write(json_line + '\n')
+                if entry.level in self.FLUSH_LEVELS:
+                    self._file.flush()
         except Exception as e:
             # Fallback to stderr if file write fails
-            import sys
             print(f"Failed to write log: {e}", file=sys.stderr)
     
+    def flush(self):
+        """Flush buffered log lines to disk."""
+        if getattr(self, '_file', None) is None:
+            return
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+    
     def close(self):
         """Close the log file."""
         if hasattr(self, '_file') and self._file:
-            self._file.close()
+            with self._lock:
+                self._file.close()
+            _open_loggers.discard(self)
     
     def __del__(self):
         """Cleanup on deletion."""
@@ -1,13 +1,45 @@
 """Metrics collection for Jeeves."""
+import atexit
 import json
+import numbers
+import queue
 import time
 import threading
+import weakref
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Deque, Dict, List, Optional
 from dataclasses import dataclass, field, asdict
-from collections import defaultdict
+from collections import defaultdict, deque
 from pathlib import Path
 import os
+import sys
+
+from src.logger import utc_timestamp
+
+# Shared encoder; json.dumps with non-default options builds a new one per call
+_json_encoder = json.JSONEncoder(ensure_ascii=False)
+
+# Queue marker telling the drain thread to exit
+_STOP = object()
+
+# Open collectors whose queued points are stored at interpreter exit
+_open_collectors: "weakref.WeakSet[MetricsCollector]" = weakref.WeakSet()
+
+
+def _flush_open_collectors():
+    """Store every open collector's queued points before the interpreter exits.
+    
+    The drain thread is a daemon, so without this anything still queued at
+    exit would be lost.
+    """
+    for collector in list(_open_collectors):
+        try:
+            collector._sync()
+        except Exception as e:
+            print(f"Failed to flush metrics: {e}", file=sys.stderr)
+
+
+atexit.register(_flush_open_collectors)
 
 
 @dataclass
@@ -30,10 +62,36 @@ class MetricSummary:
     period_seconds: int
 
 
+class RunningStats:
+    """All-time count, sum, min and max of a metric, updated per point."""
+    
+    __slots__ = ('count', 'sum', 'min', 'max')
+    
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+    
+    def add(self, value: float):
+        """Fold one value into the running totals."""
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+
 class MetricsCollector:
     """Collect and aggregate metrics."""
     
     METRICS_FILE = "logs/metrics.jsonl"
+    # Points kept per metric name; older points are dropped but still
+    # counted in the running stats
+    MAX_POINTS = 100_000
+    # Most queued points applied per lock acquisition
+    DRAIN_BATCH = 1024
     
     def __init__(self, persist: bool = True):
         """Initialize metrics collector.
@@ -41,10 +99,25 @@ class MetricsCollector:
         Args:
             persist: Whether to persist metrics to file
         """
-        self._metrics: Dict[str, List[MetricPoint]] = defaultdict(list)
+        self._metrics: Dict[str, Deque[MetricPoint]] = defaultdict(lambda: deque(maxlen=self.MAX_POINTS))
+        self._running: Dict[str, RunningStats] = defaultdict(RunningStats)
         self._lock = threading.Lock()
         self._persist = persist
         self._start_time = time.time()
+        # Metrics file handle, opened on first write and kept open
+        self._file = None
+        self._file_path = None
+        # Producers only enqueue; one drain thread stores and persists points.
+        # The thread holds a weak reference so it never keeps us alive.
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._drainer = threading.Thread(
+            target=_drain_metrics,
+            args=(weakref.ref(self), self._queue),
+            name="jeeves-metrics-drain",
+            daemon=True
+        )
+        self._drainer.start()
+        _open_collectors.add(self)
         
         # Create log directory if it doesn't exist
         if self._persist:
@@ -52,7 +125,7 @@ class MetricsCollector:
     
     def _get_timestamp(self) -> str:
         """Get current timestamp in ISO 8601 format."""
-        return datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+        return utc_timestamp()
     
     def _get_metric_key(self, name: str, tags: Dict[str, str] = None) -> str:
         """Get a unique key for a metric with tags."""
@@ -61,89 +134,158 @@ class MetricsCollector:
         tag_str = ",".join(f"{k}={v}" for k, v in sorted(tags.items()))
         return f"{name}#{tag_str}"
     
+    def _record(self, name: str, value: float, tags: Dict[str, str] = None):
+        """Queue a metric point for the drain thread.
+        
+        Raises:
+            TypeError: If value is not a number
+        """
+        # Checked here, in the caller's thread: a bad value reaching the
+        # drain thread would abort the running stats for its whole batch
+        if not isinstance(value, numbers.Real):
+            raise TypeError(f"Metric {name!r} value must be a number, got {type(value).__name__}")
+        point = MetricPoint(
+            timestamp=self._get_timestamp(),
+            value=value,
+            tags=tags or {}
+        )
+        self._queue.put((name, point))
+    
+    def _apply(self, batch: list) -> bool:
+        """Store a batch of queued points and release any waiting readers.
+        
+        Returns:
+            True if the batch contained the stop marker
+        """
+        stop = False
+        waiters = []
+        lines = []
+        try:
+            with self._lock:
+                for item in batch:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        name, point = item
+                        self._metrics[name].append(point)
+                        self._running[name].add(point.value)
+                        if self._persist:
+                            line = self._encode_point(name, point)
+                            if line is not None:
+                                lines.append(line)
+                if lines:
+                    self._write_lines(lines)
+        finally:
+            for waiter in waiters:
+                waiter.set()
+        return stop
+    
+    @staticmethod
+    def _encode_point(name: str, point: MetricPoint) -> Optional[str]:
+        """Serialize a point as one metrics file line, or None if it cannot be."""
+        try:
+            return _json_encoder.encode({
+                "timestamp": point.timestamp,
+                "name": name,
+                "value": point.value,
+                "tags": point.tags
+            }) + '\n'
+        except Exception as e:
+            print(f"Failed to persist metric: {e}", file=sys.stderr)
+            return None
+    
+    def _sync(self):
+        """Wait until every point recorded so far has been stored."""
+        if not self._drainer.is_alive():
+            # Drain thread has been stopped by close(); apply pending points here
+            self._apply(_take_batch(self._queue, None))
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.1):
+            if not self._drainer.is_alive():
+                self._apply(_take_batch(self._queue, None))
+                break
+    
     def increment(self, name: str, value: float = 1.0, tags: Dict[str, str] = None):
         """Increment a counter metric."""
-        with self._lock:
-            point = MetricPoint(
-                timestamp=self._get_timestamp(),
-                value=value,
-                tags=tags or {}
-            )
-            self._metrics[name].append(point)
-            if self._persist:
-                self._persist_to_file(name, point)
+        self._record(name, value, tags)
     
     def gauge(self, name: str, value: float, tags: Dict[str, str] = None):
         """Set a gauge metric."""
-        with self._lock:
-            point = MetricPoint(
-                timestamp=self._get_timestamp(),
-                value=value,
-                tags=tags or {}
-            )
-            self._metrics[name].append(point)
-            if self._persist:
-                self._persist_to_file(name, point)
+        self._record(name, value, tags)
     
     def timing(self, name: str, duration_ms: float, tags: Dict[str, str] = None):
         """Record a timing metric."""
-        with self._lock:
-            point = MetricPoint(
-                timestamp=self._get_timestamp(),
-                value=duration_ms,
-                tags=tags or {}
-            )
-            self._metrics[name].append(point)
-            if self._persist:
-                self._persist_to_file(name, point)
+        self._record(name, duration_ms, tags)
     
     def get_summary(self, name: str, period_seconds: int = 3600) -> MetricSummary:
         """Get summary of metric over time period."""
+        self._sync()
         with self._lock:
-            points = self._metrics.get(name, [])
+            points = self._metrics.get(name)
             if not points:
-                return MetricSummary(
-                    name=name,
-                    count=0,
-                    sum=0.0,
-                    min=0.0,
-                    max=0.0,
-                    avg=0.0,
-                    period_seconds=period_seconds
-                )
+                return self._empty_summary(name, period_seconds)
             
-            # Filter by time period
             cutoff = datetime.utcnow() - timedelta(seconds=period_seconds)
             cutoff_str = cutoff.isoformat(timespec='milliseconds') + 'Z'
             
-            filtered_points = [p for p in points if p.timestamp >= cutoff_str]
-            
-            if not filtered_points:
+            # Every point recorded is retained and inside the window, so the
+            # running stats are the answer
+            running = self._running[name]
+            if running.count == len(points) and points[0].timestamp >= cutoff_str:
                 return MetricSummary(
                     name=name,
-                    count=0,
-                    sum=0.0,
-                    min=0.0,
-                    max=0.0,
-                    avg=0.0,
+                    count=running.count,
+                    sum=running.sum,
+                    min=running.min,
+                    max=running.max,
+                    avg=running.sum / running.count,
                     period_seconds=period_seconds
                 )
             
-            values = [p.value for p in filtered_points]
+            # Points are in time order, so walk back from the newest only as
+            # far as the window reaches
+            values = []
+            for point in reversed(points):
+                if point.timestamp < cutoff_str:
+                    break
+                values.append(point.value)
+            
+            if not values:
+                return self._empty_summary(name, period_seconds)
+            
+            total = sum(values)
             return MetricSummary(
                 name=name,
                 count=len(values),
-                sum=sum(values),
+                sum=total,
                 min=min(values),
                 max=max(values),
-                avg=sum(values) / len(values),
+                avg=total / len(values),
                 period_seconds=period_seconds
             )
     
+    @staticmethod
+    def _empty_summary(name: str, period_seconds: int) -> MetricSummary:
+        """Summary for a metric with no points in the period."""
+        return MetricSummary(
+            name=name,
+            count=0,
+            sum=0.0,
+            min=0.0,
+            max=0.0,
+            avg=0.0,
+            period_seconds=period_seconds
+        )
+    
     def get_all_metrics(self) -> Dict[str, List[MetricPoint]]:
         """Get all collected metrics."""
+        self._sync()
         with self._lock:
-            return dict(self._metrics)
+            return {name: list(points) for name, points in self._metrics.items()}
     
     def get_dashboard_data(self) -> Dict:
         """Get metrics formatted for dashboard display.
@@ -159,27 +301,30 @@ class MetricsCollector:
             - error_rate
             - uptime_seconds
         """
+        self._sync()
         with self._lock:
             uptime = time.time() - self._start_time
             
-            # Get totals
-            drafts_created = len(self._metrics.get(MetricName.DRAFTS_CREATED, []))
-            drafts_sent = len(self._metrics.get(MetricName.DRAFTS_SENT, []))
-            drafts_edited = len(self._metrics.get(MetricName.DRAFTS_EDITED, []))
-            drafts_rejected = len(self._metrics.get(MetricName.DRAFTS_REJECTED, []))
-            emails_processed = len(self._metrics.get(MetricName.EMAILS_PROCESSED, []))
-            total_errors = len(self._metrics.get(MetricName.ERRORS, []))
+            # Totals and averages come from the running stats, so this is
+            # a handful of dict reads however many points are stored
+            running = self._running
+            empty = RunningStats()
+            drafts_created = running.get(MetricName.DRAFTS_CREATED, empty).count
+            drafts_sent = running.get(MetricName.DRAFTS_SENT, empty).count
+            drafts_edited = running.get(MetricName.DRAFTS_EDITED, empty).count
+            drafts_rejected = running.get(MetricName.DRAFTS_REJECTED, empty).count
+            emails_processed = running.get(MetricName.EMAILS_PROCESSED, empty).count
+            total_errors = running.get(MetricName.ERRORS, empty).count
             
-            # Calculate averages
-            processing_times = self._metrics.get(MetricName.PROCESSING_TIME_MS, [])
-            if processing_times:
-                avg_processing_time = sum(p.value for p in processing_times) / len(processing_times)
+            processing_times = running.get(MetricName.PROCESSING_TIME_MS, empty)
+            if processing_times.count:
+                avg_processing_time = processing_times.sum / processing_times.count
             else:
                 avg_processing_time = 0.0
             
-            confidence_scores = self._metrics.get(MetricName.CONFIDENCE_SCORE, [])
-            if confidence_scores:
-                avg_confidence = sum(p.value for p in confidence_scores) / len(confidence_scores)
+            confidence_scores = running.get(MetricName.CONFIDENCE_SCORE, empty)
+            if confidence_scores.count:
+                avg_confidence = confidence_scores.sum / confidence_scores.count
             else:
                 avg_confidence = 0.0
             
@@ -203,24 +348,94 @@ class MetricsCollector:
     
     def reset(self):
         """Reset all metrics."""
+        self._sync()
         with self._lock:
             self._metrics.clear()
+            self._running.clear()
             self._start_time = time.time()
     
-    def _persist_to_file(self, name: str, point: MetricPoint):
-        """Persist metric to file."""
+    def _write_lines(self, lines: List[str]):
+        """Append serialized metric lines to the metrics file."""
         try:
-            log_entry = {
-                "timestamp": point.timestamp,
-                "name": name,
-                "value": point.value,
-                "tags": point.tags
-            }
-            with open(self.METRICS_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
+            self._open_metrics_file().write(''.join(lines))
         except Exception as e:
-            import sys
             print(f"Failed to persist metric: {e}", file=sys.stderr)
+    
+    def _open_metrics_file(self):
+        """Get the persistent metrics file handle, reopening if the path changed.
+        
+        The handle is line buffered so each point is on disk as soon as it
+        is recorded, without an open/close per point.
+        """
+        if self._file is None or self._file_path != self.METRICS_FILE:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.METRICS_FILE, 'a', encoding='utf-8', buffering=1)
+            self._file_path = self.METRICS_FILE
+        return self._file
+    
+    def close(self):
+        """Store pending points, stop the drain thread and close the metrics file."""
+        lock = getattr(self, '_lock', None)
+        if lock is None:
+            return
+        if self._drainer.is_alive():
+            self._queue.put(_STOP)
+            self._drainer.join()
+        self._apply(_take_batch(self._queue, None))
+        with lock:
+            if getattr(self, '_file', None) is not None:
+                self._file.close()
+                self._file = None
+        _open_collectors.discard(self)
+    
+    def __del__(self):
+        """Cleanup on deletion."""
+        # Runs once the drain thread has let go of us, so it must not join it
+        queue_ = getattr(self, '_queue', None)
+        if queue_ is not None:
+            queue_.put(_STOP)
+        if getattr(self, '_file', None) is not None:
+            self._file.close()
+    
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
+
+def _take_batch(queue_: "queue.SimpleQueue", limit: Optional[int]) -> list:
+    """Take queued items without blocking, up to limit (None for all)."""
+    batch = []
+    try:
+        while limit is None or len(batch) < limit:
+            batch.append(queue_.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
+
+def _drain_metrics(collector_ref: "weakref.ref", queue_: "queue.SimpleQueue"):
+    """Drain thread: apply queued points in batches until told to stop."""
+    while True:
+        batch = [queue_.get()]
+        batch += _take_batch(queue_, MetricsCollector.DRAIN_BATCH - 1)
+        collector = collector_ref()
+        if collector is None:
+            return
+        try:
+            stop = collector._apply(batch)
+        except Exception as e:
+            # Keep draining; one bad batch must not stop metric collection
+            print(f"Failed to apply metrics: {e}", file=sys.stderr)
+            stop = any(item is _STOP for item in batch)
+        # Drop the strong reference before blocking on the queue again
+        del collector
+        if stop:
+            return
 
 
 # Convenience metric functions
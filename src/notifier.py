@@ -1,6 +1,16 @@
 """Notification system using ntfy.sh for sending push notifications."""
+import atexit
+import logging
+import queue
+import threading
+import time
 import requests
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
 
 
 class Notifier:
@@ -16,6 +26,19 @@ class Notifier:
         "high": 4,
         "urgent": 5,
     }
+    _DEFAULT_PRIORITY = PRIORITIES["default"]
+    
+    # Connection pool and (connect, read) timeout for the ntfy session
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 8
+    TIMEOUT = (3, 10)
+    
+    # Background delivery: queued notifications waiting for the worker, and
+    # retries for server errors with exponential backoff from RETRY_DELAY
+    QUEUE_SIZE = 256
+    MAX_RETRIES = 2
+    RETRY_DELAY = 0.5
+    EXIT_FLUSH_TIMEOUT = 5.0
     
     def __init__(
         self,
@@ -27,6 +50,18 @@ class Notifier:
         self.topic = topic or self.DEFAULT_TOPIC
         self.base_url = base_url or self.DEFAULT_URL
         self.default_priority = default_priority
+        # Keep-alive session so repeated notifications reuse the TLS connection
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=0,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
     
     def send(
         self,
@@ -46,10 +81,8 @@ class Notifier:
         Returns:
             Response object from the HTTP request
         """
-        url = f"{self.base_url}/{self.topic}"
-        
         # Map priority string to integer
-        priority_value = self.PRIORITIES.get(priority, self.PRIORITIES["default"])
+        priority_value = self.PRIORITIES.get(priority, self._DEFAULT_PRIORITY)
         
         # Build tags string if provided
         tags_str = ",".join(tags) if tags else None
@@ -66,10 +99,92 @@ class Notifier:
         if tags_str:
             data["tags"] = tags_str
         
-        response = requests.post(url, data=data)
+        response = self._session.post(self._url, data=data, timeout=self.TIMEOUT)
         response.raise_for_status()
         return response
     
+    def enqueue(
+        self,
+        title: str,
+        message: str,
+        priority: str = "default",
+        tags: Optional[list] = None,
+    ) -> bool:
+        """Queue a notification for delivery by a background worker.
+        
+        Returns immediately instead of waiting for the HTTP round trip.
+        Server errors are retried; failures are logged, not raised.
+        
+        Args:
+            title: Notification title
+            message: Notification body message
+            priority: Priority level (low, default, high, urgent)
+            tags: Optional list of tags/emojis for the notification
+            
+        Returns:
+            True if queued, False if the queue was full and it was dropped
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait({"title": title, "message": message, "priority": priority, "tags": tags})
+        except queue.Full:
+            logger.warning("Notification queue full, dropping: %s", title)
+            return False
+        return True
+    
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued notification has been handled.
+        
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+            
+        Returns:
+            True if the queue drained within the timeout
+        """
+        if self._worker is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+    
+    def _ensure_worker(self):
+        """Start the delivery worker on first use."""
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._deliver_queued,
+                    name="jeeves-notifier",
+                    daemon=True,
+                )
+                self._worker.start()
+                atexit.register(self.flush, self.EXIT_FLUSH_TIMEOUT)
+    
+    def _deliver_queued(self):
+        """Worker loop: send queued notifications one at a time."""
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            for attempt in range(self.MAX_RETRIES + 1):
+                try:
+                    self.send(**item)
+                    break
+                except requests.HTTPError as e:
+                    status = e.response.status_code if e.response is not None else None
+                    if status is None or status < 500 or attempt == self.MAX_RETRIES:
+                        logger.warning("Notification failed: %s", e)
+                        break
+                    time.sleep(self.RETRY_DELAY * (2 ** attempt))
+                except Exception as e:
+                    logger.warning("Notification failed: %s", e)
+                    break
+    
     def notify_draft_ready(
         self,
         subject: str,
@@ -88,11 +203,53 @@ class Notifier:
         Returns:
             Response object from the HTTP request
         """
-        title = "📝 Draft Ready for Review"
-        message = f"Subject: {subject}\nFrom: {sender}\nPreview: {preview}\nDraft ID: {draft_id}"
-        tags = ["email", "draft", "pencil"]
+        return self.send(**self._draft_ready_fields(subject, sender, preview, draft_id))
+    
+    @staticmethod
+    def _draft_ready_fields(subject: str, sender: str, preview: str, draft_id: str) -> Dict:
+        """Build send() arguments for a draft-ready notification."""
+        return {
+            "title": "📝 Draft Ready for Review",
+            "message": f"Subject: {subject}\nFrom: {sender}\nPreview: {preview}\nDraft ID: {draft_id}",
+            "priority": "default",
+            "tags": ["email", "draft", "pencil"],
+        }
+    
+    def send_many(self, items: List[Dict]) -> List[requests.Response]:
+        """Send several notifications concurrently over the pooled session.
         
-        return self.send(title=title, message=message, priority="default", tags=tags)
+        The POSTs overlap instead of each waiting a full round trip for the
+        one before it.
+        
+        Args:
+            items: send() keyword arguments (title, message, priority, tags)
+                for each notification
+            
+        Returns:
+            Response objects in the same order as items
+            
+        Raises:
+            requests.HTTPError: If any notification fails
+        """
+        if len(items) <= 1:
+            return [self.send(**item) for item in items]
+        workers = min(self.POOL_MAXSIZE, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda item: self.send(**item), items))
+    
+    def notify_drafts_ready_batch(self, drafts: List[Dict]) -> List[requests.Response]:
+        """Notify that several drafts are ready for review.
+        
+        Args:
+            drafts: Dicts with subject, sender, preview and draft_id keys
+            
+        Returns:
+            Response objects in the same order as drafts
+        """
+        return self.send_many([
+            self._draft_ready_fields(d["subject"], d["sender"], d["preview"], d["draft_id"])
+            for d in drafts
+        ])
     
     def notify_draft_sent(
         self,
@@ -141,6 +298,7 @@ class Notifier:
     def topic(self, value: str):
         """Set the topic."""
         self._topic = value
+        self._update_url()
     
     @property
     def base_url(self) -> str:
@@ -151,28 +309,59 @@ class Notifier:
     def base_url(self, value: str):
         """Set the base URL."""
         self._base_url = value
+        self._update_url()
+    
+    def _update_url(self):
+        """Rebuild the publish URL once both parts are set."""
+        if hasattr(self, "_topic") and hasattr(self, "_base_url"):
+            self._url = f"{self._base_url}/{self._topic}"
 
 
 # Convenience functions
+
+@lru_cache(maxsize=None)
+def _get_notifier(**kwargs) -> Notifier:
+    """Get a shared Notifier per configuration so its session is reused."""
+    return Notifier(**kwargs)
+
+
 def notify_draft_ready(subject: str, sender: str, preview: str, draft_id: str, **kwargs) -> requests.Response:
     """Quick function to notify draft ready."""
-    notifier = Notifier(**kwargs)
+    notifier = _get_notifier(**kwargs)
     return notifier.notify_draft_ready(subject, sender, preview, draft_id)
 
 
+def notify_drafts_ready_batch(drafts: List[Dict], **kwargs) -> List[requests.Response]:
+    """Quick function to notify several drafts ready."""
+    notifier = _get_notifier(**kwargs)
+    return notifier.notify_drafts_ready_batch(drafts)
+
+
 def notify_draft_sent(subject: str, recipient: str, **kwargs) -> requests.Response:
     """Quick function to notify draft sent."""
-    notifier = Notifier(**kwargs)
+    notifier = _get_notifier(**kwargs)
     return notifier.notify_draft_sent(subject, recipient)
 
 
 def notify_error(error_message: str, **kwargs) -> requests.Response:
     """Quick function to notify error."""
-    notifier = Notifier(**kwargs)
+    notifier = _get_notifier(**kwargs)
     return notifier.notify_error(error_message)
 
 
 def send(title: str, message: str, priority: str = "default", **kwargs) -> requests.Response:
     """Quick function to send a notification."""
-    notifier = Notifier(**kwargs)
+    notifier = _get_notifier(**kwargs)
     return notifier.send(title, message, priority)
+
+
+def enqueue(title: str, message: str, priority: str = "default", **kwargs) -> bool:
+    """Quick function to queue a notification for background delivery."""
+    notifier = _get_notifier(**kwargs)
+    return notifier.enqueue(title, message, priority)
+
+
+def flush(timeout: float = None, **kwargs) -> bool:
+    """Quick function to wait for queued notifications to be delivered."""
+    notifier = _get_notifier(**kwargs)
+    return notifier.flush(timeout)
@@ -1,15 +1,85 @@
 """RAG pipeline for email context retrieval."""
+import hashlib
 import os
-import csv
-from typing import List, Dict, Optional
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import List, Dict, NamedTuple, Optional, Set, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from src.ingest import clean_body
+
+
+# Columns read from the training CSV, with the value used when one is missing
+INDEX_COLUMNS = {
+    'body_text': '',
+    'thread_id': '',
+    'from': '',
+    'subject': '',
+    'sent_by_you': 'False',
+    'timestamp': '',
+}
+
+# Length of the preview stored on each search hit
+PREVIEW_CHARS = 200
+
+# Start of quoted history that is not '>'-prefixed: a reply attribution
+# ("On Mon, ... wrote:", possibly wrapped onto a second line) or an
+# Outlook-style separator. Everything from the match on is dropped.
+_REPLY_HEADER_RE = re.compile(
+    r'^(?:On\b[^\n]*(?:\n[^\n]*)?\bwrote:|_{10,}|-{2,} ?Original Message ?-{2,})[ \t]*$',
+    re.MULTILINE
+)
+
+
+def _strip_quotes(text: str) -> str:
+    """Strip quoted replies and signatures from an email body before embedding."""
+    match = _REPLY_HEADER_RE.search(text)
+    if match:
+        text = text[:match.start()]
+    return clean_body(text)
+
+
+def _body_hash(text: str) -> str:
+    """Digest of an indexed body, stored to detect changed rows."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class SearchHit(NamedTuple):
+    """A single search result from the email index."""
+    id: str
+    text: str
+    metadata: Dict
+    distance: Optional[float]
+    preview: str
+    
+    def to_dict(self) -> Dict:
+        """Return the hit as a plain dict."""
+        return self._asdict()
+
 
 class RAGPipeline:
     """Retrieval-Augmented Generation pipeline using ChromaDB."""
     
     DEFAULT_EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"
     DEFAULT_COLLECTION = "jeeves-emails"
+    EMBED_BATCH_SIZE = 64
+    # Bodies shorter than this (blank rows, bounces) are not worth embedding
+    MIN_DOCUMENT_CHARS = 8
+    # Chroma's HNSW index settings, applied when the collection is created:
+    # a denser graph (M) and wider build search for better recall at scale,
+    # and a query beam wide enough for the top_k sizes used here
+    COLLECTION_METADATA = {
+        "hnsw:space": "cosine",
+        "hnsw:M": 32,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": 64,
+    }
+    EMBED_CACHE_SIZE = 512
+    # Ids fetched or deleted per Chroma call when clearing or diffing
+    ID_PAGE_SIZE = 10_000
     
     def __init__(
         self,
@@ -23,92 +93,185 @@ class RAGPipeline:
             'EMBEDDING_MODEL', self.DEFAULT_EMBEDDING_MODEL
         )
         self.collection_name = collection_name or self.DEFAULT_COLLECTION
+        # Chroma and the embedding model are heavy, so each is loaded on
+        # first use; get_stats() never loads the model, for instance
         self.client = None
-        self.collection = None
         self.embedding_function = None
-        self._initialize()
+        # Single-text embeddings are cached; the same query or incoming
+        # email body is often embedded repeatedly
+        self._embed_one = lru_cache(maxsize=self.EMBED_CACHE_SIZE)(self._encode_one)
     
-    def _initialize(self):
-        """Initialize ChromaDB and embedding function."""
-        import chromadb
-        from sentence_transformers import SentenceTransformer
-        
-        os.makedirs(self.persist_directory, exist_ok=True)
-        
-        self.client = chromadb.PersistentClient(path=self.persist_directory)
-        self.collection = self.client.get_or_create_collection(
+    def _ensure_chroma(self):
+        """Return the ChromaDB client, creating it on first use."""
+        if self.client is None:
+            import chromadb
+            
+            os.makedirs(self.persist_directory, exist_ok=True)
+            self.client = chromadb.PersistentClient(path=self.persist_directory)
+        return self.client
+    
+    def _open_collection(self):
+        """Get or create the email collection."""
+        return self._ensure_chroma().get_or_create_collection(
             name=self.collection_name,
-            metadata={"hnsw:space": "cosine"}
+            metadata=dict(self.COLLECTION_METADATA)
+        )
+    
+    @cached_property
+    def collection(self):
+        """The email collection, opened on first use."""
+        return self._open_collection()
+    
+    def _ensure_embed(self):
+        """Return the embedding model, loading it on first use."""
+        if self.embedding_function is None:
+            from sentence_transformers import SentenceTransformer
+            
+            # On a GPU run the model in fp16, which halves its memory and
+            # uses the tensor cores. CPUs keep fp32, where half precision is
+            # usually slower rather than faster.
+            device = os.environ.get('EMBEDDING_DEVICE') or self._default_device()
+            model = SentenceTransformer(self.embedding_model, device=device)
+            if device.startswith('cuda'):
+                model.half()
+            self.embedding_function = model
+        return self.embedding_function
+    
+    @staticmethod
+    def _default_device() -> str:
+        """Pick the embedding device: CUDA when available, else CPU."""
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    
+    def _encode(self, texts: List[str], batch_size: int = None):
+        """Run the embedding model over texts in batches."""
+        return self._ensure_embed().encode(
+            texts,
+            batch_size=batch_size or self.EMBED_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
         )
-        
-        # Load embedding model
-        self.embedding_function = SentenceTransformer(self.embedding_model)
     
-    def _embed(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for texts."""
-        embeddings = self.embedding_function.encode(texts, convert_to_numpy=True)
-        return embeddings.tolist()
+    def _encode_one(self, text: str) -> np.ndarray:
+        """Embed a single text (wrapped in an LRU cache per pipeline)."""
+        embedding = np.ascontiguousarray(self._encode([text])[0], dtype=np.float32)
+        # Cached and shared between callers, so guard against mutation
+        embedding.setflags(write=False)
+        return embedding
+    
+    def _embed(self, texts: List[str], batch_size: int = None) -> np.ndarray:
+        """Generate embeddings for texts.
+        
+        Returns:
+            A contiguous float32 array of shape (len(texts), dim), which
+            Chroma takes as-is, with no per-float Python objects
+        """
+        if len(texts) == 1:
+            return self._embed_one(texts[0])[np.newaxis]
+        return np.ascontiguousarray(self._encode(texts, batch_size), dtype=np.float32)
     
     def index_emails(self, csv_path: str, batch_size: int = 100) -> int:
-        """Index emails from CSV into ChromaDB."""
-        import chromadb
+        """Index emails from CSV into ChromaDB and return how many were indexed.
         
-        count = 0
-        batch_ids = []
-        batch_docs = []
-        batch_metadatas = []
+        The CSV is parsed by pandas' C reader one batch_size chunk at a time,
+        so memory stays bounded and each chunk is embedded as one batch.
+        Quoted history and signatures are stripped from each body before it
+        is embedded and stored, and rows whose remaining body is shorter than
+        MIN_DOCUMENT_CHARS are skipped.
+        Upserts run on a single background thread, so the next chunk is
+        embedded while the previous one is written to the index.
+        """
+        return self._index_csv(csv_path, batch_size)[0]
+    
+    def _index_csv(
+        self,
+        csv_path: str,
+        batch_size: int,
+        known_hashes: Dict[str, str] = None
+    ) -> Tuple[int, Set[str]]:
+        """Index a CSV, skipping rows whose id and body hash are in known_hashes.
         
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader):
-                email_id = f"email_{i}"
-                batch_ids.append(email_id)
-                batch_docs.append(row.get('body_text', ''))
-                batch_metadatas.append({
-                    'thread_id': row.get('thread_id', ''),
-                    'from': row.get('from', ''),
-                    'subject': row.get('subject', ''),
-                    'sent_by_you': row.get('sent_by_you', 'False'),
-                    'timestamp': row.get('timestamp', '')
-                })
-                
-                if len(batch_ids) >= batch_size:
-                    embeddings = self._embed(batch_docs)
-                    self.collection.upsert(
-                        ids=batch_ids,
-                        documents=batch_docs,
-                        metadatas=batch_metadatas,
-                        embeddings=embeddings
-                    )
-                    count += len(batch_ids)
-                    batch_ids = []
-                    batch_docs = []
-                    batch_metadatas = []
+        Returns:
+            The number of documents upserted, and the ids of every row kept
+        """
+        import pandas as pd
         
-        # Handle remaining
-        if batch_ids:
-            embeddings = self._embed(batch_docs)
-            self.collection.upsert(
-                ids=batch_ids,
-                documents=batch_docs,
-                metadatas=batch_metadatas,
-                embeddings=embeddings
+        rows_read = 0
+        count = 0
+        seen: Set[str] = set()
+        try:
+            chunks = pd.read_csv(
+                csv_path,
+                chunksize=batch_size,
+                dtype=str,
+                keep_default_na=False,
+                usecols=lambda column: column in INDEX_COLUMNS,
+                encoding='utf-8'
             )
-            count += len(batch_ids)
+        except pd.errors.EmptyDataError:
+            return 0, seen
+        pending = None
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            for chunk in chunks:
+                rows = len(chunk)
+                first_row = rows_read
+                rows_read += rows
+                if not rows:
+                    continue
+                columns = {
+                    name: chunk[name].tolist() if name in chunk else [default] * rows
+                    for name, default in INDEX_COLUMNS.items()
+                }
+                docs = [_strip_quotes(doc) if doc else doc for doc in columns.pop('body_text')]
+                keep = [
+                    j for j, doc in enumerate(docs)
+                    if len(doc.strip()) >= self.MIN_DOCUMENT_CHARS
+                ]
+                # Ids follow the CSV row, so skipped rows leave gaps
+                batch_ids = [f"email_{first_row + j}" for j in keep]
+                seen.update(batch_ids)
+                columns['body_hash'] = [_body_hash(doc) for doc in docs]
+                if known_hashes:
+                    keep = [
+                        j for j, email_id in zip(keep, batch_ids)
+                        if known_hashes.get(email_id) != columns['body_hash'][j]
+                    ]
+                    batch_ids = [f"email_{first_row + j}" for j in keep]
+                if not keep:
+                    continue
+                if len(keep) < rows:
+                    docs = [docs[j] for j in keep]
+                    columns = {name: [values[j] for j in keep] for name, values in columns.items()}
+                batch_metadatas = [dict(zip(columns, values)) for values in zip(*columns.values())]
+                
+                embeddings = self._embed(docs, batch_size)
+                # At most one upsert in flight; this also surfaces its errors
+                if pending is not None:
+                    pending.result()
+                pending = writer.submit(
+                    self.collection.upsert,
+                    ids=batch_ids,
+                    documents=docs,
+                    metadatas=batch_metadatas,
+                    embeddings=embeddings
+                )
+                count += len(keep)
+            if pending is not None:
+                pending.result()
         
-        return count
+        return count, seen
     
     def add_email(self, text: str, metadata: Dict, email_id: str = None) -> str:
         """Add a single email to the index."""
         if email_id is None:
             email_id = f"email_{self.collection.count()}"
         
-        embedding = self._embed([text])[0]
         self.collection.upsert(
             ids=[email_id],
             documents=[text],
             metadatas=[metadata],
-            embeddings=[embedding]
+            embeddings=self._embed([text])
         )
         return email_id
     
@@ -117,45 +280,65 @@ class RAGPipeline:
         query: str,
         top_k: int = 5,
         filter_metadata: Dict = None
-    ) -> List[Dict]:
+    ) -> List[SearchHit]:
         """Search for relevant emails."""
-        query_embedding = self._embed([query])[0]
-        
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=self._embed([query]),
             n_results=top_k,
             where=filter_metadata
         )
+        return self._format_results(results, 0)
+    
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filter_metadata: Dict = None
+    ) -> List[List[SearchHit]]:
+        """Search for several queries with one model pass and one index query.
+        
+        Returns:
+            One result list per query, in query order
+        """
+        if not queries:
+            return []
+        query_embeddings = self._embed(queries)
         
-        output = []
-        for i in range(len(results['ids'][0])):
-            output.append({
-                'id': results['ids'][0][i],
-                'text': results['documents'][0][i],
-                'metadata': results['metadatas'][0][i],
-                'distance': results['distances'][0][i] if 'distances' in results else None
-            })
-        return output
-    
-    def search_by_topic(self, topic: str, top_k: int = 5) -> List[Dict]:
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=top_k,
+            where=filter_metadata
+        )
+        return [self._format_results(results, row) for row in range(len(queries))]
+    
+    @staticmethod
+    def _format_results(results: Dict, row: int) -> List[SearchHit]:
+        """Convert one query's rows of a Chroma result into SearchHits."""
+        ids = results['ids'][row]
+        distances = results['distances'][row] if results.get('distances') else [None] * len(ids)
+        return [
+            SearchHit(hit_id, text, metadata, distance, text[:PREVIEW_CHARS])
+            for hit_id, text, metadata, distance in zip(
+                ids, results['documents'][row], results['metadatas'][row], distances
+            )
+        ]
+    
+    def search_by_topic(self, topic: str, top_k: int = 5) -> List[SearchHit]:
         """Search emails by topic/keyword."""
         return self.search(topic, top_k)
     
-    def get_similar_emails(self, email_text: str, top_k: int = 5) -> List[Dict]:
+    def get_similar_emails(self, email_text: str, top_k: int = 5) -> List[SearchHit]:
         """Find emails similar to given text."""
         return self.search(email_text, top_k)
     
-    def get_sent_emails(self, top_k: int = 10) -> List[Dict]:
+    def get_sent_emails(self, top_k: int = 10) -> List[SearchHit]:
         """Get user's sent emails for style matching."""
         return self.search("", top_k, filter_metadata={'sent_by_you': 'True'})
     
     def delete_all(self):
         """Clear all indexed emails."""
-        self.client.delete_collection(self.collection_name)
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name,
-            metadata={"hnsw:space": "cosine"}
-        )
+        self._ensure_chroma().delete_collection(self.collection_name)
+        self.collection = self._open_collection()
     
     def get_stats(self) -> Dict:
         """Get index statistics."""
@@ -166,21 +349,87 @@ class RAGPipeline:
             'persist_directory': self.persist_directory
         }
     
-    def rebuild_index(self, csv_path: str) -> int:
-        """Clear and rebuild index from CSV."""
-        self.delete_all()
-        return self.index_emails(csv_path)
+    def _index_settings_current(self) -> bool:
+        """Whether the collection was created with COLLECTION_METADATA."""
+        metadata = self.collection.metadata or {}
+        return all(metadata.get(key) == value for key, value in self.COLLECTION_METADATA.items())
+    
+    def clear_documents(self):
+        """Delete every indexed email, keeping the collection itself.
+        
+        Unlike delete_all(), existing references to self.collection stay
+        valid and the collection's index files are not recreated.
+        """
+        while True:
+            ids = self.collection.get(include=[], limit=self.ID_PAGE_SIZE)['ids']
+            if not ids:
+                break
+            self.collection.delete(ids=ids)
+    
+    def _indexed_hashes(self) -> Dict[str, str]:
+        """Map each indexed id to the body hash stored in its metadata."""
+        hashes = {}
+        offset = 0
+        while True:
+            page = self.collection.get(include=['metadatas'], limit=self.ID_PAGE_SIZE, offset=offset)
+            for email_id, metadata in zip(page['ids'], page['metadatas']):
+                hashes[email_id] = (metadata or {}).get('body_hash')
+            if len(page['ids']) < self.ID_PAGE_SIZE:
+                return hashes
+            offset += self.ID_PAGE_SIZE
+    
+    def rebuild_index(self, csv_path: str, incremental: bool = False, batch_size: int = 100) -> int:
+        """Clear and rebuild index from CSV.
+        
+        Args:
+            csv_path: Training CSV to index
+            incremental: Only embed rows that are new or whose body changed
+                since they were indexed, and delete rows that are gone,
+                instead of re-embedding everything
+            batch_size: Rows read and embedded per chunk
+        
+        A collection created with index settings other than
+        COLLECTION_METADATA (e.g. before the HNSW tuning) is dropped and
+        recreated, since those settings are fixed at creation; that is
+        always a full rebuild, even when incremental is requested.
+        
+        Returns:
+            Number of documents embedded and upserted
+        """
+        if not self._index_settings_current():
+            self.delete_all()
+            return self.index_emails(csv_path, batch_size)
+        if not incremental:
+            self.clear_documents()
+            return self.index_emails(csv_path, batch_size)
+        
+        known_hashes = self._indexed_hashes()
+        count, seen = self._index_csv(csv_path, batch_size, known_hashes)
+        stale = [email_id for email_id in known_hashes if email_id not in seen]
+        for start in range(0, len(stale), self.ID_PAGE_SIZE):
+            self.collection.delete(ids=stale[start:start + self.ID_PAGE_SIZE])
+        return count
 
 
 # Convenience functions
 
+@lru_cache(maxsize=None)
+def _get_pipeline(**kwargs) -> RAGPipeline:
+    """Get a shared RAGPipeline per configuration.
+    
+    Each one loads the embedding model and opens Chroma on first use, which
+    takes seconds, so the convenience functions reuse it across calls.
+    """
+    return RAGPipeline(**kwargs)
+
+
 def index_emails(csv_path: str, **kwargs) -> int:
     """Quick function to index emails."""
-    rag = RAGPipeline(**kwargs)
+    rag = _get_pipeline(**kwargs)
     return rag.index_emails(csv_path)
 
 
-def search(query: str, top_k: int = 5, **kwargs) -> List[Dict]:
+def search(query: str, top_k: int = 5, **kwargs) -> List[SearchHit]:
     """Quick search function."""
-    rag = RAGPipeline(**kwargs)
+    rag = _get_pipeline(**kwargs)
     return rag.search(query, top_k)
@@ -1,4 +1,6 @@
 """Response generator using LLM + RAG for email drafting."""
+import hashlib
+from collections import OrderedDict
 from typing import List, Dict, Optional
 
 
@@ -24,6 +26,15 @@ class ResponseGenerator:
             "max_length": 250,
         },
     }
+    # System prompt per tone, resolved once instead of on every prompt build
+    _SYSTEM_PROMPTS = {name: config["system_prompt"] for name, config in TONES.items()}
+    CONTEXT_CACHE_SIZE = 128
+    # Past emails passed to the LLM are capped at roughly 1500 tokens
+    # (about 4 characters each); the hit crossing the budget is clipped and
+    # lower-ranked ones are dropped
+    CONTEXT_CHAR_BUDGET = 6000
+    # Same length as the previews on RAG search hits (src.rag.PREVIEW_CHARS)
+    PREVIEW_CHARS = 200
     
     def __init__(
         self,
@@ -56,6 +67,9 @@ class ResponseGenerator:
         self.default_tone = default_tone if default_tone in self.TONES else "match_style"
         self.include_context = include_context
         self.context_top_k = context_top_k
+        # RAG context per email body digest; threads repeat quoted history,
+        # so the same body is often looked up again
+        self._context_cache: Dict[tuple, list] = OrderedDict()
     
     def generate_reply(
         self,
@@ -65,23 +79,19 @@ class ResponseGenerator:
     ) -> str:
         """Generate a reply to an incoming email."""
         tone = tone or self.default_tone
-        tone_config = self.TONES.get(tone, self.TONES["match_style"])
         
         # Get context from RAG if enabled
-        context = []
+        hits = []
         if self.include_context and self.rag and self.llm:
             try:
-                context_results = self.rag.search(
-                    incoming_email.get('body_text', ''),
-                    top_k=self.context_top_k
-                )
-                context = [r.get('text', '') for r in context_results]
+                hits = self._get_context(incoming_email.get('body_text', ''))
             except:
                 pass
+        context = [hit.text for hit in hits]
         
         # Build prompt
         system_prompt, user_prompt = self._build_prompt(
-            incoming_email, context, tone, custom_prompt
+            incoming_email, [hit.preview for hit in hits], tone, custom_prompt
         )
         
         # Generate using LLM
@@ -91,6 +101,36 @@ class ResponseGenerator:
         # Fallback: return prompt for debugging
         return f"[Generated response would go here based on: {tone} tone]"
     
+    def _get_context(self, body: str) -> list:
+        """Get RAG hits for an email body within the context budget, using the LRU cache."""
+        key = (hashlib.blake2b(body.encode('utf-8'), digest_size=16).digest(), self.context_top_k)
+        cached = self._context_cache.get(key)
+        if cached is not None:
+            self._context_cache.move_to_end(key)
+            return cached
+        
+        hits = []
+        remaining = self.CONTEXT_CHAR_BUDGET
+        for hit in self.rag.search(body, top_k=self.context_top_k):
+            if len(hit.text) > remaining:
+                # Clip the hit that crosses the budget rather than dropping
+                # it, so an overlong top hit still provides context
+                if remaining > 0:
+                    hits.append(hit._replace(
+                        text=hit.text[:remaining], preview=hit.preview[:remaining]
+                    ))
+                break
+            hits.append(hit)
+            remaining -= len(hit.text)
+        self._context_cache[key] = hits
+        if len(self._context_cache) > self.CONTEXT_CACHE_SIZE:
+            self._context_cache.popitem(last=False)
+        return hits
+    
+    def clear_cache(self):
+        """Clear cached RAG context, e.g. after the index changes."""
+        self._context_cache.clear()
+    
     def generate_with_context(
         self,
         incoming_email: Dict,
@@ -100,7 +140,8 @@ class ResponseGenerator:
         context = [e.get('body_text', '') for e in context_emails]
         
         tone = self.default_tone
-        system_prompt, user_prompt = self._build_prompt(incoming_email, context, tone, None)
+        previews = [ctx[:self.PREVIEW_CHARS] for ctx in context]
+        system_prompt, user_prompt = self._build_prompt(incoming_email, previews, tone, None)
         
         if self.llm:
             return self.llm.generate_with_context(user_prompt, context)
@@ -123,26 +164,27 @@ class ResponseGenerator:
         tone: str = None,
         custom: str = None
     ) -> tuple:
-        """Build prompt for LLM."""
-        tone = tone or self.default_tone
-        tone_config = self.TONES.get(tone, self.TONES["match_style"])
+        """Build prompt for LLM.
         
-        system_prompt = custom or tone_config["system_prompt"]
+        context holds previews of past emails (see PREVIEW_CHARS), used as-is.
+        """
+        tone = tone or self.default_tone
+        system_prompt = custom or self._SYSTEM_PROMPTS.get(tone) or self._SYSTEM_PROMPTS["match_style"]
         
         # Build user prompt with email content
         subject = incoming_email.get('subject', '(No Subject)')
         from_addr = incoming_email.get('from', 'Unknown')
         body = incoming_email.get('body_text', incoming_email.get('snippet', ''))
         
-        user_prompt = f"The following email was received:\n\nFrom: {from_addr}\nSubject: {subject}\n\n{body}\n\n"
+        parts = [f"The following email was received:\n\nFrom: {from_addr}\nSubject: {subject}\n\n{body}\n\n"]
         
         if context:
-            user_prompt += "Relevant context from past emails:\n"
-            for i, ctx in enumerate(context[:3], 1):
-                user_prompt += f"\n{i}. {ctx[:200]}...\n"
-            user_prompt += "\n\n"
+            parts.append("Relevant context from past emails:\n")
+            parts.extend(f"\n{i}. {ctx}...\n" for i, ctx in enumerate(context[:3], 1))
+            parts.append("\n\n")
         
-        user_prompt += "Write a reply to this email."
+        parts.append("Write a reply to this email.")
+        user_prompt = "".join(parts)
         
         return system_prompt, user_prompt
     
@@ -158,7 +200,7 @@ class ResponseGenerator:
                 return "Your typical writing style"
             
             # Extract characteristics (simple heuristic)
-            avg_length = sum(len(e.get('text', '')) for e in sent_emails) / len(sent_emails)
+            avg_length = sum(len(e.text) for e in sent_emails) / len(sent_emails)
             
             if avg_length < 100:
                 return "Your writing style tends to be brief and direct"
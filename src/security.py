@@ -5,6 +5,7 @@ import html
 import time
 import hashlib
 import secrets
+from collections import OrderedDict
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
@@ -28,6 +29,11 @@ class SecurityCheck:
     details: Dict = field(default_factory=dict)
 
 
+# Characters that IGNORECASE matches to an ASCII letter but str.lower()
+# does not turn into it, folded before the substring prefilters below
+_PREFILTER_FOLDS = str.maketrans({'\u017f': 's', '\u0130': 'i', '\u0131': 'i'})
+
+
 class InputValidator:
     """Validate and sanitize user inputs."""
     
@@ -41,6 +47,18 @@ class InputValidator:
     JAVASCRIPT_PATTERN = re.compile(r'javascript:', re.IGNORECASE)
     PATH_TRAVERSAL_PATTERN = re.compile(r'\.\.[/\\]')
     
+    @staticmethod
+    def _lowered(content: str) -> str:
+        """Lowercase content for substring prefilters ahead of the patterns.
+        
+        Each pattern only matches where its literal prefix ('<script',
+        '<iframe', 'javascript:') appears in this text, so a cheap `in`
+        test can skip the regex scan for the common clean email.
+        """
+        if not content.isascii():
+            content = content.translate(_PREFILTER_FOLDS)
+        return content.lower()
+    
     @classmethod
     def validate_email_content(cls, content: str) -> SecurityCheck:
         """Validate email content for security issues."""
@@ -60,8 +78,10 @@ class InputValidator:
                 details={"length": len(content), "max": cls.MAX_EMAIL_LENGTH}
             )
         
+        lowered = cls._lowered(content)
+        
         # Check for dangerous HTML
-        if cls.HTML_SCRIPT_PATTERN.search(content):
+        if "<script" in lowered and cls.HTML_SCRIPT_PATTERN.search(content):
             return SecurityCheck(
                 passed=False,
                 level=SecurityLevel.CRITICAL,
@@ -69,7 +89,7 @@ class InputValidator:
                 details={"pattern": "script"}
             )
         
-        if cls.HTML_IFRAME_PATTERN.search(content):
+        if "<iframe" in lowered and cls.HTML_IFRAME_PATTERN.search(content):
             return SecurityCheck(
                 passed=False,
                 level=SecurityLevel.HIGH,
@@ -77,7 +97,7 @@ class InputValidator:
                 details={"pattern": "iframe"}
             )
         
-        if cls.JAVASCRIPT_PATTERN.search(content):
+        if "javascript:" in lowered:
             return SecurityCheck(
                 passed=False,
                 level=SecurityLevel.HIGH,
@@ -111,7 +131,7 @@ class InputValidator:
             )
         
         # Drafts should not contain dangerous HTML
-        if cls.HTML_SCRIPT_PATTERN.search(content):
+        if "<script" in cls._lowered(content) and cls.HTML_SCRIPT_PATTERN.search(content):
             return SecurityCheck(
                 passed=False,
                 level=SecurityLevel.HIGH,
@@ -131,14 +151,24 @@ class InputValidator:
         if not html_content:
             return ""
         
+        # Each removal can join surrounding text into a new match for the
+        # next pattern, so the prefilter text is refreshed after a change
+        result = html_content
+        lowered = cls._lowered(result)
+        
         # Remove script tags
-        result = cls.HTML_SCRIPT_PATTERN.sub('', html_content)
+        if "<script" in lowered:
+            result = cls.HTML_SCRIPT_PATTERN.sub('', result)
+            lowered = cls._lowered(result)
         
         # Remove iframe tags
-        result = cls.HTML_IFRAME_PATTERN.sub('', result)
+        if "<iframe" in lowered:
+            result = cls.HTML_IFRAME_PATTERN.sub('', result)
+            lowered = cls._lowered(result)
         
         # Remove javascript: protocol
-        result = cls.JAVASCRIPT_PATTERN.sub('', result)
+        if "javascript:" in lowered:
+            result = cls.JAVASCRIPT_PATTERN.sub('', result)
         
         # Escape HTML entities to prevent XSS
         result = html.escape(result)
@@ -157,7 +187,15 @@ class InputValidator:
 
 
 class RateLimiter:
-    """Rate limiting for API calls."""
+    """Rate limiting for API calls.
+    
+    Token bucket per key: a key holds up to max_requests tokens, refilled
+    continuously at max_requests per window_seconds, and each allowed
+    request spends one. Checks are O(1) and each key stores two floats.
+    """
+    
+    # Keys tracked at most; the least recently seen key is evicted beyond it
+    MAX_KEYS = 10_000
     
     def __init__(
         self,
@@ -168,11 +206,18 @@ class RateLimiter:
         
         Args:
             max_requests: Maximum requests per window
-            window_seconds: Time window in seconds
+            window_seconds: Time window in seconds; must be positive
+        
+        Raises:
+            ValueError: If window_seconds is not positive
         """
+        if window_seconds <= 0:
+            raise ValueError(f"window_seconds must be positive, got {window_seconds}")
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self._requests: Dict[str, List[float]] = {}
+        self._refill_rate = max_requests / window_seconds
+        # key -> (tokens, last refill time), least recently seen first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
     
     def check(self, key: str) -> Tuple[bool, int]:
         """Check if request is allowed.
@@ -185,45 +230,66 @@ class RateLimiter:
         """
         current_time = time.time()
         
-        # Initialize key if not exists
-        if key not in self._requests:
-            self._requests[key] = []
-        
-        # Clean old requests outside the window
+        # Drop keys idle long enough to be full again; a missing key is
+        # treated as a full bucket. They sit at the front, oldest first.
         cutoff = current_time - self.window_seconds
-        self._requests[key] = [
-            ts for ts in self._requests[key] if ts > cutoff
-        ]
-        
-        # Check if under limit
-        if len(self._requests[key]) < self.max_requests:
-            self._requests[key].append(current_time)
-            remaining = self.max_requests - len(self._requests[key])
-            return True, remaining
-        
+        while self._buckets:
+            oldest = next(iter(self._buckets.values()))
+            if oldest[1] > cutoff:
+                break
+            self._buckets.popitem(last=False)
+        
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(self.max_requests)
+        else:
+            tokens, last = bucket
+            tokens = min(self.max_requests, tokens + (current_time - last) * self._refill_rate)
+            self._buckets.move_to_end(key)
+        
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, current_time)
+        if len(self._buckets) > self.MAX_KEYS:
+            self._buckets.popitem(last=False)
+        
+        if allowed:
+            return True, int(tokens)
         # Over limit
         return False, 0
     
     def reset(self, key: str):
         """Reset rate limit for key."""
-        if key in self._requests:
-            self._requests[key] = []
+        self._buckets.pop(key, None)
 
 
 class PromptInjectionDetector:
     """Detect potential prompt injection attacks."""
     
+    # Patterns are written so each match has one parse, keeping scans
+    # linear on crafted input: no quantifiers that can trade characters
+    # with each other (\s+ then .*) and no .* bounded by a repeatable token
     INJECTION_PATTERNS = [
         re.compile(r'ignore\s+(all\s+)?previous\s+instructions', re.IGNORECASE),
         re.compile(r'ignore\s+(all\s+)?prior\s+instructions', re.IGNORECASE),
-        re.compile(r'disregard\s+.*instructions', re.IGNORECASE),
+        re.compile(r'disregard\s+(?:\S.*)?instructions', re.IGNORECASE),
         re.compile(r'you\s+are\s+now\s+', re.IGNORECASE),
         re.compile(r'new\s+instructions?:', re.IGNORECASE),
         re.compile(r'system:', re.IGNORECASE),
         re.compile(r'assistant:', re.IGNORECASE),
         re.compile(r'###\s*instruction', re.IGNORECASE),
-        re.compile(r'<\|.*\|>'),  # Special tokens
+        # Special tokens, including ones with inner pipes (<|a|b|>); a token
+        # never spans a '<', which keeps scans of "<|<|<|..." linear
+        re.compile(r'<\|(?:[^|\n<]|\|(?!>))*\|>'),
     ]
+    # All patterns as one alternation, so text with no injection (the common
+    # case) is scanned once instead of once per pattern. The special-token
+    # pattern has no letters, so IGNORECASE does not change what it matches.
+    _COMBINED_PATTERN = re.compile(
+        "|".join(f"(?:{pattern.pattern})" for pattern in INJECTION_PATTERNS),
+        re.IGNORECASE
+    )
     
     # Replacement markers for sanitization
     REPLACEMENT_MARKER = "[FILTERED]"
@@ -245,6 +311,14 @@ class PromptInjectionDetector:
                 message="Empty text is safe"
             )
         
+        if not cls._COMBINED_PATTERN.search(text):
+            return SecurityCheck(
+                passed=True,
+                level=SecurityLevel.SAFE,
+                message="No prompt injection detected"
+            )
+        
+        # Something matched: report the first match of each pattern
         detected_patterns = []
         
         for i, pattern in enumerate(cls.INJECTION_PATTERNS):
@@ -283,6 +357,9 @@ class PromptInjectionDetector:
         if not text:
             return ""
         
+        if not cls._COMBINED_PATTERN.search(text):
+            return text
+        
         result = text
         
         for pattern in cls.INJECTION_PATTERNS:
@@ -328,6 +405,11 @@ class CredentialManager:
 class SecurityAuditor:
     """Audit security configuration."""
     
+    # full_audit() results are reused for this many seconds, so a polled
+    # audit endpoint does not stat the filesystem on every request
+    AUDIT_TTL = 60.0
+    _audit_cache: Optional[Tuple[float, Dict[str, List[SecurityCheck]]]] = None
+    
     @classmethod
     def audit_credentials(cls) -> List[SecurityCheck]:
         """Audit credential storage."""
@@ -438,13 +520,24 @@ class SecurityAuditor:
         return checks
     
     @classmethod
-    def full_audit(cls) -> Dict[str, List[SecurityCheck]]:
-        """Run full security audit."""
-        return {
-            "credentials": cls.audit_credentials(),
-            "network": cls.audit_network(),
-            "data_storage": cls.audit_data_storage(),
-        }
+    def full_audit(cls, force: bool = False) -> Dict[str, List[SecurityCheck]]:
+        """Run full security audit.
+        
+        Args:
+            force: Re-run every check instead of reusing a result from the
+                last AUDIT_TTL seconds
+        """
+        now = time.monotonic()
+        cached = cls._audit_cache
+        if force or cached is None or now >= cached[0]:
+            results = {
+                "credentials": cls.audit_credentials(),
+                "network": cls.audit_network(),
+                "data_storage": cls.audit_data_storage(),
+            }
+            cls._audit_cache = cached = (now + cls.AUDIT_TTL, results)
+        # Fresh lists so callers cannot alter the cached result
+        return {name: list(checks) for name, checks in cached[1].items()}
 
 
 def generate_secure_token(length: int = 32) -> str:
@@ -453,5 +546,9 @@ def generate_secure_token(length: int = 32) -> str:
 
 
 def hash_sensitive(data: str) -> str:
-    """Hash sensitive data for logging."""
-    return hashlib.sha256(data.encode()).hexdigest()[:16]
+    """Hash sensitive data for logging.
+    
+    Returns 16 hex characters: a 64-bit BLAKE2s digest, which is cheaper
+    than SHA-256 truncated to the same length.
+    """
+    return hashlib.blake2s(data.encode(), digest_size=8).hexdigest()
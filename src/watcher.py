@@ -1,7 +1,7 @@
 """Email watcher service for Jeeves."""
 import os
 import signal
-import time
+import threading
 import logging
 import re
 from typing import Optional, Callable, List, Dict, Any
@@ -9,6 +9,18 @@ from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# Local parts of automated sender addresses, matched at the start of the
+# lowercased From header
+_AUTOMATED_SENDER_RE = re.compile(
+    r'(?:no-?reply|donotreply|do-not-reply|notifications?|alerts?'
+    r'|automated|automation|bot|system)@'
+)
+_SENDER_DOMAIN_RE = re.compile(r'@([a-zA-Z0-9.-]+)')
+
+# Gmail labels of mail that is never answered: spam, trash and our own
+_BLOCK_LABELS = frozenset({'SPAM', 'TRASH', 'SENT', 'OUTBOX'})
+_PROMO_LABEL = 'CATEGORY_PROMOTIONS'
+
 
 class EmailWatcher:
     """Background service that polls Gmail for new emails."""
@@ -45,6 +57,8 @@ class EmailWatcher:
         self.batch_size = batch_size or int(os.environ.get('BATCH_SIZE', self.DEFAULT_BATCH_SIZE))
         self.on_new_email = on_new_email
         self._running = False
+        # Set by stop() to end the wait between polls immediately
+        self._stop_event = threading.Event()
         self._last_check = None
         self._processed_count = 0
         self._draft_created_count = 0
@@ -55,6 +69,7 @@ class EmailWatcher:
     
     def start(self):
         """Start the watcher loop."""
+        self._stop_event.clear()
         self._running = True
         self._setup_signal_handlers()
         logger.info(f"Starting email watcher with poll interval: {self.poll_interval}s")
@@ -66,11 +81,8 @@ class EmailWatcher:
                 logger.error(f"Error during poll: {e}")
                 self._error_count += 1
             
-            # Sleep in small increments to allow quick shutdown
-            for _ in range(self.poll_interval):
-                if not self._running:
-                    break
-                time.sleep(1)
+            # Sleep until the next poll; stop() wakes this up at once
+            self._stop_event.wait(self.poll_interval)
         
         logger.info("Email watcher stopped")
     
@@ -78,6 +90,7 @@ class EmailWatcher:
         """Stop the watcher loop."""
         self._running = False
         self._signal_received = None
+        self._stop_event.set()
         logger.info("Stopping email watcher...")
     
     def poll(self) -> list:
@@ -167,17 +180,13 @@ class EmailWatcher:
             if self.db.is_processed(email_id):
                 return False
         
-        # Filter out spam
-        labels = email.get('labelIds', [])
-        if 'SPAM' in labels or 'TRASH' in labels:
-            return False
-        
-        # Filter out sent emails
-        if 'SENT' in labels or 'OUTBOX' in labels:
+        # Filter out spam, trash and sent emails
+        labels = frozenset(email.get('labelIds') or ())
+        if not labels.isdisjoint(_BLOCK_LABELS):
             return False
         
         # Filter out promotional emails
-        if is_promotional_email(email):
+        if is_promotional_email(email, labels=labels):
             return False
         
         # Filter out automated emails
@@ -229,65 +238,55 @@ def is_automated_email(email: dict) -> bool:
     sender = email.get('from', '') or email.get('sender', '')
     sender_lower = sender.lower()
     
-    # Check sender domain
-    domain = extract_sender_domain(email)
-    domain_lower = domain.lower() if domain else ''
+    # Check sender domain, taken from the already lowercased sender
+    match = _SENDER_DOMAIN_RE.search(sender_lower)
+    domain_lower = match.group(1) if match else ''
     
-    # Check against skip domains
-    for skip_domain in SKIP_DOMAINS:
+    # Check against skip domains. Any label may carry the marker
+    # (e.g. "mail.notifications.example.com"), so this is a substring test
+    # rather than a prefix test.
+    for skip_domain in _SKIP_DOMAIN_NEEDLES:
         if skip_domain in domain_lower:
             return True
     
     # Check for common automated patterns in sender
-    automated_patterns = [
-        r'^noreply@',
-        r'^no-reply@',
-        r'^donotreply@',
-        r'^do-not-reply@',
-        r'^notifications?@',
-        r'^alerts?@',
-        r'^automated@',
-        r'^automation@',
-        r'^bot@',
-        r'^system@',
-    ]
-    
-    for pattern in automated_patterns:
-        if re.search(pattern, sender_lower):
-            return True
+    if _AUTOMATED_SENDER_RE.match(sender_lower):
+        return True
     
     # Check subject for automated patterns
     subject = email.get('subject', '') or ''
     subject_lower = subject.lower()
     
-    for pattern in SKIP_PATTERNS:
+    for pattern in _SKIP_PATTERN_NEEDLES:
         if pattern in subject_lower:
             return True
     
     return False
 
 
-def is_promotional_email(email: dict) -> bool:
+def is_promotional_email(email: dict, labels: frozenset = None) -> bool:
     """Check if email is promotional/marketing.
     
     Args:
         email: Email dict
+        labels: The email's labelIds as a set, if the caller already has them
         
     Returns:
         True if email appears to be promotional
     """
-    # Check subject and snippet for promotional keywords
+    # Check subject and snippet for promotional keywords, each on its own
+    # rather than copying both into one joined string
     subject = (email.get('subject', '') or '').lower()
     snippet = (email.get('snippet', '') or '').lower()
-    text = subject + ' ' + snippet
     
-    for pattern in SKIP_PATTERNS:
-        if pattern in text:
+    for pattern in _SKIP_PATTERN_NEEDLES:
+        if pattern in subject or pattern in snippet:
             return True
     
     # Check label IDs for category
-    label_ids = email.get('labelIds', [])
-    if 'CATEGORY_PROMOTIONS' in label_ids:
+    if labels is None:
+        labels = email.get('labelIds') or ()
+    if _PROMO_LABEL in labels:
         return True
     
     return False
@@ -305,7 +304,7 @@ def extract_sender_domain(email: dict) -> str:
     sender = email.get('from', '') or email.get('sender', '')
     
     # Extract email address using regex
-    match = re.search(r'@([a-zA-Z0-9.-]+)', sender)
+    match = _SENDER_DOMAIN_RE.search(sender)
     if match:
         return match.group(1)
     
@@ -326,6 +325,23 @@ SKIP_PATTERNS = [
 ]
 
 
+def _minimal_needles(needles: List[str]) -> tuple:
+    """Drop needles that contain another needle.
+    
+    A text containing 'notifications' also contains 'notification', so
+    only the shorter one needs testing; the substring checks above loop
+    over the result instead of the full list.
+    """
+    return tuple(
+        needle for needle in needles
+        if not any(other != needle and other in needle for other in needles)
+    )
+
+
+_SKIP_DOMAIN_NEEDLES = _minimal_needles(SKIP_DOMAINS)
+_SKIP_PATTERN_NEEDLES = _minimal_needles(SKIP_PATTERNS)
+
+
 def run_watcher():
     """CLI entry point to run the watcher."""
     # Set up logging
@@ -4,6 +4,7 @@ from src.confidence import (
     ConfidenceScorer,
     ScoreResult,
     RiskLevel,
+    RISK_RANKS,
     FINANCIAL_PATTERNS,
     LEGAL_PATTERNS,
     SENSITIVE_PATTERNS,
@@ -175,6 +176,14 @@ class TestConfidenceScorer:
             risk = scorer.get_risk_level(text)
             assert risk in (RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL), f"Failed to detect urgent risk in: {text}"
     
+    def test_highest_risk_wins(self):
+        """Test the most severe category determines the risk level."""
+        scorer = ConfidenceScorer()
+        
+        assert scorer.get_risk_level("Urgent: sign the contract") == RiskLevel.HIGH
+        assert scorer.get_risk_level("Urgent contract, wire money") == RiskLevel.CRITICAL
+        assert scorer.get_risk_level("See you at lunch") == RiskLevel.LOW
+    
     def test_score_result_has_reasoning(self):
         """Test ScoreResult includes reasoning list."""
         scorer = ConfidenceScorer()
@@ -201,6 +210,11 @@ class TestRiskLevel:
         assert RiskLevel.MEDIUM.value == "medium"
         assert RiskLevel.HIGH.value == "high"
         assert RiskLevel.CRITICAL.value == "critical"
+    
+    def test_risk_ranks_order_severity(self):
+        """Test RISK_RANKS ranks levels from LOW to CRITICAL."""
+        assert [RISK_RANKS[level] for level in RiskLevel] == [0, 1, 2, 3]
+        assert RISK_RANKS[RiskLevel.CRITICAL] > RISK_RANKS[RiskLevel.HIGH] > RISK_RANKS[RiskLevel.MEDIUM]
 
 
 class TestSafetyPatterns:
@@ -250,6 +264,14 @@ class TestAnalyzeContentRisk:
         assert result['legal'] == []
         assert result['sensitive'] == []
         assert result['urgent'] == []
+    
+    def test_matches_full_phrase(self):
+        """Test matches report the matched phrase for each category."""
+        result = analyze_content_risk("Wire Transfer the contract ASAP")
+        assert result['financial'] == ['wire transfer']
+        assert result['legal'] == ['contract']
+        assert result['sensitive'] == []
+        assert result['urgent'] == ['asap']
 
 
 class TestGetAutoSendEligibility:
@@ -314,6 +336,308 @@ class TestScorerEdgeCases:
         assert result == True
 
 
+class TestScoreCache:
+    """Test caching of score results."""
+    
+    def test_repeat_score_is_cached(self):
+        """Test scoring the same draft twice reuses the result."""
+        scorer = ConfidenceScorer()
+        incoming = {'from': 'test@gmail.com', 'text': 'Lunch?'}
+        draft = {'text': 'Sure, noon works for me.'}
+        
+        first = scorer.score(incoming, draft)
+        calls = []
+        scorer._compute_score = lambda *args, **kwargs: calls.append(args)
+        assert scorer.score(dict(incoming), dict(draft)) == first
+        assert calls == []
+    
+    def test_cached_result_is_a_copy(self):
+        """Test callers never share the cached ScoreResult."""
+        scorer = ConfidenceScorer()
+        incoming = {'from': 'test@gmail.com', 'text': 'Lunch?'}
+        draft = {'text': 'Sure, noon works for me.'}
+        
+        first = scorer.score(incoming, draft)
+        first.factors['tone_match'] = 0.0
+        first.reasoning.clear()
+        second = scorer.score(incoming, draft)
+        assert second is not first
+        assert second.factors['tone_match'] != 0.0
+        assert second.reasoning
+    
+    def test_rag_context_bypasses_cache(self):
+        """Test emails with prefetched context are always scored fresh."""
+        scorer = ConfidenceScorer()
+        draft = {'text': 'Sure, noon works for me.'}
+        
+        first = scorer.score({'text': 'Lunch?', '_rag_context': []}, draft)
+        second = scorer.score(
+            {'text': 'Lunch?', '_rag_context': [{'text': 'Sure, noon works for me.'}]}, draft
+        )
+        assert second.factors['context_relevance'] != first.factors['context_relevance']
+        assert scorer._score_cache == {}
+    
+    def test_sender_history_change_is_rescored(self):
+        """Test new sender history in the db invalidates the cached score."""
+        db = TestSenderFamiliarity.FakeDB([])
+        scorer = ConfidenceScorer(db=db)
+        incoming = {'from': 'boss@corp.com', 'text': 'Lunch?'}
+        draft = {'text': 'Sure, noon works for me.'}
+        
+        first = scorer.score(incoming, draft)
+        db.history = [{}] * 6
+        second = scorer.score(incoming, draft)
+        assert first.factors['sender_familiarity'] == 0.4
+        assert second.factors['sender_familiarity'] == 1.0
+    
+    def test_edited_draft_is_rescored(self):
+        """Test a changed draft is not served from the cache."""
+        scorer = ConfidenceScorer()
+        incoming = {'from': 'test@gmail.com', 'text': 'Lunch?'}
+        
+        first = scorer.score(incoming, {'text': 'Sure, noon works for me.'})
+        second = scorer.score(incoming, {'text': 'Please wire money first.'})
+        assert second is not first
+        assert second.risk_level == RiskLevel.CRITICAL
+    
+    def test_clear_cache(self):
+        """Test clear_cache forces a fresh score."""
+        scorer = ConfidenceScorer()
+        incoming = {'from': 'test@gmail.com', 'text': 'Lunch?'}
+        draft = {'text': 'Sure, noon works for me.'}
+        
+        scorer.score(incoming, draft)
+        scorer.clear_cache()
+        assert scorer._score_cache == {}
+
+
+class TestToneMatch:
+    """Test tone matching heuristics."""
+    
+    def test_formal_tone(self):
+        """Test formal markers are detected."""
+        scorer = ConfidenceScorer()
+        score, reason = scorer._score_tone_match(
+            {'text': 'Please review the attached. Kind regards, Ann'},
+            {'text': 'Will do.'}
+        )
+        assert reason == "Formal tone matched"
+    
+    def test_informal_tone(self):
+        """Test informal markers are detected."""
+        scorer = ConfidenceScorer()
+        score, reason = scorer._score_tone_match(
+            {'text': 'Hey, that demo was awesome'},
+            {'text': 'Glad you liked it!'}
+        )
+        assert reason == "Informal tone matched"
+    
+    def test_markers_match_whole_words(self):
+        """Test markers inside other words are ignored."""
+        scorer = ConfidenceScorer()
+        score, reason = scorer._score_tone_match(
+            {'text': 'They bestowed the prize'},
+            {'text': 'Nice.'}
+        )
+        assert reason == "Neutral tone - default match"
+
+
+class TestRiskGating:
+    """Test risky drafts skip the expensive factors."""
+    
+    def test_risky_draft_skips_rag(self):
+        """Test RAG is not queried for drafts that cannot auto-send."""
+        class CountingRAG:
+            calls = 0
+            
+            def query(self, text, top_k=3):
+                CountingRAG.calls += 1
+                return []
+        
+        scorer = ConfidenceScorer(rag_pipeline=CountingRAG())
+        result = scorer.score(
+            {'from': 'boss@company.com', 'text': 'Can you pay the vendor?'},
+            {'text': 'I will send the credit card details now.'}
+        )
+        
+        assert CountingRAG.calls == 0
+        assert result.risk_level == RiskLevel.CRITICAL
+        assert result.auto_send == False
+        assert result.factors['context_relevance'] == ConfidenceScorer.GATED_FACTOR_SCORE
+        assert result.factors['tone_match'] == ConfidenceScorer.GATED_FACTOR_SCORE
+        assert len(result.reasoning) == 5
+
+
+class TestContextRelevance:
+    """Test RAG context relevance scoring."""
+    
+    class FakeRAG:
+        def __init__(self, context):
+            self.context = context
+        
+        def query(self, text, top_k=3):
+            return self.context
+    
+    def test_high_overlap(self):
+        """Test drafts sharing many words with context score highest."""
+        rag = self.FakeRAG(["the quarterly budget review", "meeting moved to friday afternoon"])
+        scorer = ConfidenceScorer(rag_pipeline=rag)
+        score, _ = scorer._score_context_relevance(
+            {'text': 'When is the review?'},
+            {'text': 'The quarterly budget review meeting moved to Friday afternoon.'}
+        )
+        assert score == 0.9
+    
+    def test_some_overlap(self):
+        """Test a few shared words give partial relevance."""
+        rag = self.FakeRAG(["budget review"])
+        scorer = ConfidenceScorer(rag_pipeline=rag)
+        score, _ = scorer._score_context_relevance(
+            {'text': 'Any news?'},
+            {'text': 'I sent the budget yesterday'}
+        )
+        assert score == 0.7
+
+
+class TestSenderFamiliarity:
+    """Test sender history lookup."""
+    
+    class FakeDB:
+        def __init__(self, history):
+            self.history = history
+        
+        def get_sender_history(self, sender):
+            return self.history
+    
+    def test_extensive_history(self):
+        """Test senders with long history score highest."""
+        scorer = ConfidenceScorer(db=self.FakeDB([{}] * 6))
+        score, _ = scorer._score_sender_familiarity({'from': 'boss@corp.com'})
+        assert score == 1.0
+    
+    def test_db_without_history_falls_back(self):
+        """Test a db lacking get_sender_history uses the domain default."""
+        scorer = ConfidenceScorer(db=object())
+        assert scorer._get_sender_history is None
+        score, _ = scorer._score_sender_familiarity({'from': 'friend@gmail.com'})
+        assert score == 0.6
+    
+    def test_common_domain_matched_exactly(self):
+        """Test only exact provider domains count as common."""
+        scorer = ConfidenceScorer()
+        assert scorer._score_sender_familiarity({'from': 'Ann <ann@gmail.com>'})[0] == 0.6
+        assert scorer._score_sender_familiarity({'from': 'x@notgmail.com.evil'})[0] == 0.4
+
+
+class TestReasoning:
+    """Test every scoring helper explains itself."""
+    
+    @pytest.mark.parametrize("incoming,draft", [
+        ({'from': 'a@gmail.com', 'text': 'Hey!'}, {'text': 'Cool, thanks'}),
+        ({'from': 'a@corp.com', 'text': 'Dear team, please review.'}, {'text': ''}),
+        ({}, {'text': 'Wire transfer the payment now ' * 50}),
+        ({'from': 'a@corp.com', 'text': 'Hi'}, {'text': 'Sure, see you there.'}),
+    ])
+    def test_helpers_return_reasons(self, incoming, draft):
+        """Test all helpers return non-empty reasons so score() need not filter."""
+        scorer = ConfidenceScorer()
+        assert scorer._score_sender_familiarity(incoming)[1]
+        assert scorer._score_response_length(draft)[1]
+        assert scorer._score_tone_match(incoming, draft)[1]
+        assert scorer._score_context_relevance(incoming, draft)[1]
+        assert scorer._score_content_safety(draft)[2]
+        assert all(scorer.score(incoming, draft).reasoning)
+
+
+class TestPrefetchContext:
+    """Test concurrent RAG context prefetching."""
+    
+    class RecordingRAG:
+        def __init__(self):
+            self.queries = []
+        
+        def query(self, text, top_k=3):
+            self.queries.append(text)
+            return [f"context for {text}"]
+    
+    def test_prefetch_attaches_context(self):
+        """Test prefetch_context stores results on each email."""
+        rag = self.RecordingRAG()
+        scorer = ConfidenceScorer(rag_pipeline=rag)
+        emails = [{'text': 'first'}, {'text': 'second'}]
+        
+        scorer.prefetch_context(emails)
+        
+        assert emails[0]['_rag_context'] == ["context for first"]
+        assert emails[1]['_rag_context'] == ["context for second"]
+        assert sorted(rag.queries) == ['first', 'second']
+    
+    def test_score_uses_prefetched_context(self):
+        """Test score() does not query RAG again for prefetched emails."""
+        rag = self.RecordingRAG()
+        scorer = ConfidenceScorer(rag_pipeline=rag)
+        email = {'from': 'a@gmail.com', 'text': 'When do we ship?'}
+        
+        scorer.prefetch_context([email])
+        scorer.score(email, {'text': 'We ship next week.'})
+        
+        assert rag.queries == ['When do we ship?']
+    
+    def test_precomputed_context_without_pipeline(self):
+        """Test precomputed context is scored even without a pipeline."""
+        scorer = ConfidenceScorer()
+        score, _ = scorer._score_context_relevance(
+            {'text': 'Status?'},
+            {'text': 'The budget review is done'},
+            precomputed_context=["budget review notes"]
+        )
+        assert score == 0.7
+
+
+class TestScoreBatch:
+    """Test batch scoring."""
+    
+    def test_matches_individual_scores(self):
+        """Test score_batch returns the same results as score(), in order."""
+        pairs = [
+            ({'from': 'a@gmail.com', 'text': 'Lunch?'}, {'text': 'Sure, noon works for me.'}),
+            ({'from': 'b@corp.com', 'text': 'Invoice'}, {'text': 'I will wire transfer the payment.'}),
+            ({'from': 'c@corp.com', 'text': 'Hi'}, {'text': ''}),
+        ]
+        batch = ConfidenceScorer().score_batch(pairs)
+        single = [ConfidenceScorer().score(incoming, draft) for incoming, draft in pairs]
+        
+        assert [r.score for r in batch] == [r.score for r in single]
+        assert [r.risk_level for r in batch] == [r.risk_level for r in single]
+    
+    def test_queries_rag_only_for_low_risk_drafts(self):
+        """Test risky drafts in a batch skip the RAG query."""
+        rag = TestPrefetchContext.RecordingRAG()
+        scorer = ConfidenceScorer(rag_pipeline=rag)
+        scorer.score_batch([
+            ({'text': 'safe question'}, {'text': 'Happy to help.'}),
+            ({'text': 'risky question'}, {'text': 'Send me your password.'}),
+        ])
+        
+        assert rag.queries == ['safe question']
+    
+    def test_reuses_cached_results(self):
+        """Test previously scored pairs come from the cache."""
+        scorer = ConfidenceScorer()
+        incoming = {'from': 'test@gmail.com', 'text': 'Lunch?'}
+        draft = {'text': 'Sure, noon works for me.'}
+        first = scorer.score(incoming, draft)
+        calls = []
+        scorer._compute_score = lambda *args, **kwargs: calls.append(args)
+        
+        assert scorer.score_batch([(incoming, draft)])[0] == first
+        assert calls == []
+    
+    def test_empty_batch(self):
+        """Test an empty batch returns an empty list."""
+        assert ConfidenceScorer().score_batch([]) == []
+
+
 class TestFactorWeights:
     """Test factor weights are properly configured."""
     
@@ -90,6 +90,17 @@ class TestGradioIntegration:
         interface = dashboard.build_interface()
         
         assert isinstance(interface, gr.Blocks), "build_interface must return gr.Blocks"
+    
+    def test_build_interface_defers_draft_fetch(self):
+        """build_interface does not fetch drafts until the page loads."""
+        from dashboard import Dashboard
+        
+        dashboard = Dashboard()
+        calls = []
+        dashboard.get_pending_drafts = lambda: calls.append(1) or []
+        dashboard.build_interface()
+        
+        assert calls == []
 
 
 class TestToneOptions:
@@ -140,24 +151,36 @@ class TestConfiguration:
 class TestDashboardFunctionality:
     """Test dashboard functionality."""
     
-    def test_get_pending_drafts_returns_list(self):
-        """get_pending_drafts returns a list."""
+    def test_get_pending_drafts_returns_sequence(self):
+        """get_pending_drafts returns a sequence."""
+        from collections.abc import Sequence
         from dashboard import Dashboard
         
         dashboard = Dashboard()
         drafts = dashboard.get_pending_drafts()
         
-        assert isinstance(drafts, list), "get_pending_drafts must return a list"
+        assert isinstance(drafts, Sequence), "get_pending_drafts must return a sequence"
     
-    def test_get_demo_drafts_returns_list(self):
-        """get_demo_drafts returns list of dicts."""
+    def test_get_demo_drafts_returns_mappings(self):
+        """get_demo_drafts returns a sequence of mappings."""
+        from collections.abc import Mapping, Sequence
         from dashboard import get_demo_drafts
         
         drafts = get_demo_drafts()
         
-        assert isinstance(drafts, list)
+        assert isinstance(drafts, Sequence)
         assert len(drafts) > 0
-        assert isinstance(drafts[0], dict)
+        assert isinstance(drafts[0], Mapping)
+    
+    def test_demo_drafts_are_shared_and_read_only(self):
+        """get_demo_drafts returns the same read-only views every call."""
+        from dashboard import get_demo_drafts
+        
+        drafts = get_demo_drafts()
+        
+        assert drafts is get_demo_drafts()
+        with pytest.raises(TypeError):
+            drafts[0]["subject"] = "changed"
     
     def test_format_drafts_for_table(self):
         """format_drafts_for_table formats correctly."""
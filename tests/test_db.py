@@ -1,4 +1,5 @@
 """Tests for database layer (Feature 3.2)."""
+import json
 import os
 import sqlite3
 import tempfile
@@ -74,6 +75,115 @@ class TestDefaultDbPath:
             os.remove("/tmp/test_jeeves.db")
 
 
+class TestConnectionSettings:
+    """Test SQLite connection tuning."""
+    
+    def test_file_db_uses_wal(self, tmp_path):
+        """Test file-backed databases are switched to WAL mode."""
+        db = Database(str(tmp_path / "jeeves.db"))
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()["journal_mode"] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()["synchronous"] == 1  # NORMAL
+            assert conn.execute("PRAGMA busy_timeout").fetchone()["timeout"] == 30000
+    
+    def test_read_connections_are_query_only(self, tmp_path):
+        """Test pooled read connections use mmap and refuse writes."""
+        db = Database(str(tmp_path / "jeeves.db"))
+        with db.get_connection(read_only=True) as conn:
+            assert conn.execute("PRAGMA query_only").fetchone()["query_only"] == 1
+            assert conn.execute("PRAGMA mmap_size").fetchone()["mmap_size"] == 268435456
+    
+    def test_memory_db_keeps_default_journal(self):
+        """Test in-memory databases are not switched to WAL."""
+        db = Database(":memory:")
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()["journal_mode"] == "memory"
+    
+    def test_checkpoint(self, tmp_path):
+        """Test checkpoint runs on file and in-memory databases."""
+        db = Database(str(tmp_path / "jeeves.db"))
+        db.create_email(sender="a@example.com")
+        db.checkpoint()
+        Database(":memory:").checkpoint()
+
+
+class TestConnectionPool:
+    """Test pooled connections for file-backed databases."""
+    
+    @pytest.fixture
+    def db(self, tmp_path):
+        """Create file-backed database for testing."""
+        db = Database(str(tmp_path / "jeeves.db"))
+        yield db
+        db.close()
+    
+    def test_connection_reused(self, db):
+        """Test consecutive operations share one connection."""
+        with db.get_connection() as first:
+            pass
+        with db.get_connection() as second:
+            pass
+        assert first is second
+    
+    def test_read_only_connection_rejects_writes(self, db):
+        """Test read-only connections cannot modify the database."""
+        with pytest.raises(sqlite3.OperationalError):
+            with db.get_connection(read_only=True) as conn:
+                conn.execute("INSERT INTO emails (sender) VALUES ('a@example.com')")
+    
+    def test_reads_see_committed_writes(self, db):
+        """Test read-only connections see rows written through the pool."""
+        email_id = db.create_email(sender="a@example.com", subject="Hi")
+        assert db.get_email(email_id)["subject"] == "Hi"
+    
+    def test_failed_transaction_rolled_back(self, db):
+        """Test an exception rolls back before the connection is reused."""
+        with pytest.raises(RuntimeError):
+            with db.transaction() as conn:
+                conn.execute("INSERT INTO emails (sender) VALUES ('a@example.com')")
+                raise RuntimeError("boom")
+        assert db.get_stats()["emails"] == 0
+    
+    def test_transaction_commits(self, db):
+        """Test a successful transaction block is committed."""
+        with db.transaction() as conn:
+            conn.execute("INSERT INTO emails (sender) VALUES ('a@example.com')")
+            conn.execute("INSERT INTO emails (sender) VALUES ('b@example.com')")
+        assert db.get_stats()["emails"] == 2
+    
+    def test_reads_stay_out_of_transactions(self, db):
+        """Test read methods leave the connection in autocommit."""
+        db.create_email(sender="a@example.com")
+        db.list_emails()
+        with db.get_connection(read_only=True) as conn:
+            assert not conn.in_transaction
+        with db.get_connection() as conn:
+            assert not conn.in_transaction
+    
+    def test_maintenance(self, db):
+        """Test maintenance runs on a populated database."""
+        db.create_email(sender="a@example.com")
+        db.maintenance()
+        assert db.get_stats()["emails"] == 1
+    
+    def test_background_maintenance_runs(self, db, monkeypatch):
+        """Test start_maintenance calls maintenance() periodically until stopped."""
+        import threading
+        ran = threading.Event()
+        monkeypatch.setattr(db, "maintenance", ran.set)
+        
+        db.start_maintenance(interval=0.01)
+        assert ran.wait(2)
+        db.stop_maintenance()
+        assert db._maintenance_stop is None
+    
+    def test_close_and_reopen(self, db):
+        """Test the database reconnects after close()."""
+        db.create_email(sender="a@example.com")
+        db.close()
+        assert db.get_stats()["emails"] == 1
+
+
 class TestDraftStatusValues:
     """Test draft status constants."""
     
@@ -111,6 +221,16 @@ class TestEmailCRUD:
         assert email_id is not None
         assert email_id > 0
     
+    def test_create_email_without_returning(self, db, monkeypatch):
+        """Test inserts fall back to lastrowid on SQLite without RETURNING."""
+        import src.db
+        monkeypatch.setattr(src.db, "SQLITE_HAS_RETURNING", False)
+        first = db.create_email(sender="a@example.com")
+        second = db.create_email(sender="b@example.com")
+        
+        assert second == first + 1
+        assert db.get_email(second)["sender"] == "b@example.com"
+    
     def test_get_email(self, db):
         """Test getting an email by ID."""
         email_id = db.create_email(
@@ -227,6 +347,38 @@ class TestDraftCRUD:
         assert draft['generated_text'] == "Updated text"
         assert draft['confidence'] == 0.95
     
+    def test_update_draft_text(self, db, email_id):
+        """Test replacing a draft's text."""
+        draft_id = db.create_draft(email_id=email_id, generated_text="Original")
+        
+        assert db.update_draft_text(draft_id, "Edited") is True
+        assert db.get_draft(draft_id)["generated_text"] == "Edited"
+        assert db.update_draft_text(9999, "Edited") is False
+    
+    def test_update_stamps_updated_at(self, db, email_id):
+        """Test updates set updated_at in SQLite's timestamp format."""
+        draft_id = db.create_draft(email_id=email_id, generated_text="Original")
+        with db.get_connection() as conn:
+            conn.execute("UPDATE drafts SET updated_at = '2000-01-01 00:00:00' WHERE id = ?", (draft_id,))
+            conn.commit()
+        
+        db.update_draft(draft_id, tone="formal")
+        updated_at = db.get_draft(draft_id)["updated_at"]
+        
+        assert updated_at > "2000-01-01 00:00:00"
+        assert "T" not in updated_at
+    
+    def test_update_draft_kwargs_order_shares_sql(self, db, email_id):
+        """Test keyword order does not change the generated UPDATE."""
+        from src.db import _update_sql
+        draft_id = db.create_draft(email_id=email_id, generated_text="Original")
+        db.update_draft(draft_id, tone="formal", confidence=0.5)
+        before = _update_sql.cache_info().misses
+        db.update_draft(draft_id, confidence=0.7, tone="casual")
+        
+        assert _update_sql.cache_info().misses == before
+        assert db.get_draft(draft_id)["tone"] == "casual"
+    
     def test_update_draft_status(self, db, email_id):
         """Test updating draft status."""
         draft_id = db.create_draft(
@@ -297,6 +449,193 @@ class TestDraftCRUD:
         assert pending[0]['sender'] == "test@example.com"
 
 
+class TestRowFactory:
+    """Test rows are returned as dicts."""
+    
+    def test_rows_are_dicts(self):
+        """Test connections return plain dicts keyed by column name."""
+        db = Database(":memory:")
+        email_id = db.create_email(sender="a@example.com", subject="Hi")
+        email = db.get_email(email_id)
+        
+        assert type(email) is dict
+        assert email["subject"] == "Hi"
+    
+    def test_column_names_follow_each_query(self):
+        """Test the cached column names are refreshed between queries."""
+        db = Database(":memory:")
+        with db.get_connection() as conn:
+            assert conn.execute("SELECT 1 AS a").fetchone() == {"a": 1}
+            assert conn.execute("SELECT 2 AS b, 3 AS c").fetchone() == {"b": 2, "c": 3}
+
+
+class TestBulkInsert:
+    """Test bulk email and draft creation."""
+    
+    @pytest.fixture
+    def db(self):
+        """Create in-memory database for testing."""
+        return Database(":memory:")
+    
+    def test_create_emails_bulk(self, db):
+        """Test bulk email insert returns IDs in row order."""
+        ids = db.create_emails_bulk([
+            ("a@example.com", "First", "Body 1", "thread-1", None),
+            ("b@example.com", "Second", "Body 2", "thread-2", None),
+        ])
+        
+        assert len(ids) == 2
+        assert db.get_email(ids[0])["subject"] == "First"
+        assert db.get_email(ids[1])["sender"] == "b@example.com"
+    
+    def test_create_drafts_bulk(self, db):
+        """Test bulk draft insert returns IDs in row order."""
+        email_id = db.create_email(sender="a@example.com")
+        ids = db.create_drafts_bulk([
+            (email_id, "Draft one", "formal", "pending", 0.9),
+            (email_id, "Draft two", "casual", "approved", 0.5),
+        ])
+        
+        assert db.get_draft(ids[0])["generated_text"] == "Draft one"
+        assert db.get_draft(ids[1])["status"] == "approved"
+    
+    def test_bulk_empty(self, db):
+        """Test bulk insert of no rows is a no-op."""
+        assert db.create_emails_bulk([]) == []
+        assert db.get_stats()["emails"] == 0
+
+
+class TestTupleRows:
+    """Test namedtuple results for list methods."""
+    
+    @pytest.fixture
+    def db(self):
+        """Create in-memory database for testing."""
+        return Database(":memory:")
+    
+    def test_list_emails_as_tuples(self, db):
+        """Test rows come back as namedtuples with column attributes."""
+        db.create_email(sender="a@example.com", subject="Hello")
+        rows = db.list_emails(as_tuples=True)
+        
+        assert rows[0].sender == "a@example.com"
+        assert rows[0]._asdict() == db.list_emails()[0]
+    
+    def test_pending_drafts_share_row_class(self, db):
+        """Test rows of one query share a namedtuple class."""
+        email_id = db.create_email(sender="a@example.com", subject="Hello")
+        db.create_draft(email_id=email_id, generated_text="One")
+        db.create_draft(email_id=email_id, generated_text="Two")
+        rows = db.get_pending_drafts(as_tuples=True)
+        
+        assert type(rows[0]) is type(rows[1])
+        assert {row.generated_text for row in rows} == {"One", "Two"}
+        assert rows[0].subject == "Hello"
+
+
+class TestKeysetIteration:
+    """Test keyset-paginated iteration."""
+    
+    @pytest.fixture
+    def db(self):
+        """Create in-memory database for testing."""
+        return Database(":memory:")
+    
+    def test_iter_emails_pages_in_order(self, db):
+        """Test iter_emails yields every email newest first across pages."""
+        for day in range(1, 8):
+            db.create_email(sender=f"{day}@example.com", received_at=f"2024-01-0{day}")
+        
+        emails = list(db.iter_emails(batch_size=3))
+        
+        assert [e["received_at"] for e in emails] == [f"2024-01-0{d}" for d in range(7, 0, -1)]
+    
+    def test_iter_emails_includes_null_timestamps_last(self, db):
+        """Test emails without received_at come after dated ones."""
+        undated = [db.create_email(sender="x@example.com") for _ in range(3)]
+        db.create_email(sender="a@example.com", received_at="2024-01-01")
+        db.create_email(sender="b@example.com", received_at="2024-01-01")
+        
+        emails = list(db.iter_emails(batch_size=2))
+        
+        assert len(emails) == 5
+        assert [e["id"] for e in emails[2:]] == sorted(undated, reverse=True)
+    
+    def test_iter_drafts_filters_status(self, db):
+        """Test iter_drafts honours the status filter."""
+        email_id = db.create_email(sender="a@example.com")
+        for i in range(5):
+            db.create_draft(email_id=email_id, generated_text=f"Draft {i}",
+                            status="pending" if i % 2 else "sent")
+        
+        drafts = list(db.iter_drafts(status="pending", batch_size=1))
+        
+        assert sorted(d["generated_text"] for d in drafts) == ["Draft 1", "Draft 3"]
+
+
+class TestJsonListing:
+    """Test JSON list endpoints."""
+    
+    @pytest.fixture
+    def db(self):
+        """Create in-memory database for testing."""
+        return Database(":memory:")
+    
+    def test_list_emails_json_matches_list_emails(self, db):
+        """Test list_emails_json returns the same records as list_emails."""
+        db.create_email(sender="a@example.com", subject="One", received_at="2024-01-01")
+        db.create_email(sender="b@example.com", subject="Two", received_at="2024-01-02")
+        
+        assert json.loads(db.list_emails_json()) == db.list_emails()
+    
+    def test_pending_drafts_json_matches_pending_drafts(self, db):
+        """Test get_pending_drafts_json returns the same records."""
+        email_id = db.create_email(sender="a@example.com", subject="Hi")
+        db.create_draft(email_id=email_id, generated_text="Reply", confidence=0.8)
+        
+        assert json.loads(db.get_pending_drafts_json()) == db.get_pending_drafts()
+    
+    def test_empty_json(self, db):
+        """Test empty tables give an empty JSON array."""
+        assert db.list_emails_json() == "[]"
+        assert db.get_pending_drafts_json() == "[]"
+
+
+class TestIndexes:
+    """Test list queries are served by indexes."""
+    
+    @pytest.fixture
+    def db(self):
+        """Create in-memory database for testing."""
+        return Database(":memory:")
+    
+    def query_plan(self, db, sql, params=()):
+        with db.get_connection() as conn:
+            return " ".join(row["detail"] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+    
+    def test_drafts_by_status_avoid_sort(self, db):
+        """Test status listing walks the composite index in order."""
+        plan = self.query_plan(
+            db,
+            "SELECT * FROM drafts WHERE status = ? ORDER BY created_at DESC LIMIT 10",
+            ("pending",)
+        )
+        assert "idx_drafts_status_created" in plan
+        assert "TEMP B-TREE" not in plan
+    
+    def test_list_emails_avoids_sort(self, db):
+        """Test email listing walks the received_at index."""
+        plan = self.query_plan(db, "SELECT * FROM emails ORDER BY received_at DESC LIMIT 10")
+        assert "idx_emails_received" in plan
+        assert "TEMP B-TREE" not in plan
+    
+    def test_old_status_index_dropped(self, db):
+        """Test the redundant single-column status index is removed."""
+        with db.get_connection() as conn:
+            names = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert "idx_drafts_status" not in names
+
+
 class TestDatabaseStats:
     """Test database statistics."""
     
@@ -60,5 +60,233 @@ class TestGmailClient:
         assert 'google-api-python-client' in content, "google-api-python-client missing"
 
 
+class TestFindBodyData:
+    """Test MIME body extraction."""
+    
+    def test_finds_nested_parts(self):
+        """Test text and html are found inside nested multiparts."""
+        from src.gmail_client import _find_body_data
+        parts = [
+            {'mimeType': 'multipart/alternative', 'parts': [
+                {'mimeType': 'text/plain', 'body': {'data': 'dGV4dA=='}},
+                {'mimeType': 'text/html', 'body': {'data': 'aHRtbA=='}},
+            ]},
+            {'mimeType': 'application/pdf', 'body': {'attachmentId': 'x'}},
+        ]
+        assert _find_body_data(parts) == ['dGV4dA==', 'aHRtbA==']
+    
+    def test_first_part_in_document_order_wins(self):
+        """Test the earliest text/plain part is used."""
+        from src.gmail_client import _find_body_data
+        parts = [
+            {'mimeType': 'multipart/mixed', 'parts': [
+                {'mimeType': 'text/plain', 'body': {'data': 'first'}},
+            ]},
+            {'mimeType': 'text/plain', 'body': {'data': 'second'}},
+        ]
+        assert _find_body_data(parts) == ['first', '']
+    
+    def test_deep_nesting(self):
+        """Test deeply nested parts do not hit the recursion limit."""
+        from src.gmail_client import _find_body_data
+        part = {'mimeType': 'text/plain', 'body': {'data': 'deep'}}
+        for _ in range(5000):
+            part = {'mimeType': 'multipart/mixed', 'parts': [part]}
+        assert _find_body_data([part]) == ['deep', '']
+
+
+class TestDecodeBody:
+    """Test Gmail body decoding."""
+    
+    def test_decodes_urlsafe_alphabet(self):
+        """Test '-' and '_' characters decode like urlsafe_b64decode."""
+        import base64
+        from src.gmail_client import _decode_body
+        text = '<p>?>>ü</p>'
+        data = base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+        assert '-' in data or '_' in data
+        assert _decode_body(data) == text
+    
+    def test_restores_missing_padding(self):
+        """Test unpadded data decodes."""
+        from src.gmail_client import _decode_body
+        assert _decode_body('aGk') == 'hi'
+    
+    def test_invalid_utf8_replaced(self):
+        """Test invalid UTF-8 does not raise."""
+        from src.gmail_client import _decode_body
+        assert _decode_body('_w') == '\ufffd'
+
+
+class TestListEmailsBatching:
+    """Test list_emails fetches messages in batches."""
+    
+    class FakeBatch:
+        def __init__(self, callback, log):
+            self.callback = callback
+            self.requests = []
+            log.append(self)
+        
+        def add(self, request, request_id=None):
+            self.requests.append((request_id, request))
+        
+        def execute(self):
+            # Respond out of order to check results keep list order
+            for request_id, request in reversed(self.requests):
+                self.callback(request_id, request, None)
+    
+    def make_client(self, message_ids):
+        from src.gmail_client import GmailClient
+        client = GmailClient.__new__(GmailClient)
+        batches = []
+        service = MagicMock()
+        service.users().messages().list().execute.return_value = {
+            'messages': [{'id': mid} for mid in message_ids]
+        }
+        service.users().messages().get.side_effect = lambda userId, id, **kwargs: {
+            'id': id, 'threadId': 't' + id, 'payload': {'headers': [], 'parts': []}
+        }
+        service.new_batch_http_request.side_effect = (
+            lambda callback: self.FakeBatch(callback, batches)
+        )
+        client.service = service
+        return client, batches
+    
+    def test_results_in_listing_order(self):
+        """Test batched results are returned in the original order."""
+        client, batches = self.make_client(['a', 'b', 'c'])
+        emails = client.list_emails(limit=3)
+        
+        assert [e['id'] for e in emails] == ['a', 'b', 'c']
+        assert len(batches) == 1
+    
+    def test_splits_into_batches(self):
+        """Test more messages than BATCH_SIZE use several batches."""
+        from src.gmail_client import GmailClient
+        ids = [str(i) for i in range(GmailClient.BATCH_SIZE + 1)]
+        client, batches = self.make_client(ids)
+        emails = client.list_emails(limit=len(ids))
+        
+        assert len(emails) == len(ids)
+        assert [len(b.requests) for b in batches] == [GmailClient.BATCH_SIZE, 1]
+    
+    def test_full_fetch_requests_partial_fields(self):
+        """Test full messages are fetched with the fields mask."""
+        from src.gmail_client import GmailClient
+        client, _ = self.make_client(['a'])
+        client.list_emails(limit=1)
+        
+        client.service.users().messages().get.assert_called_with(
+            userId='me', id='a', format='full', fields=GmailClient.MESSAGE_FIELDS
+        )
+    
+    def test_headers_only_uses_metadata_format(self):
+        """Test headers_only fetches metadata without bodies."""
+        client, _ = self.make_client(['a'])
+        emails = client.list_emails(limit=1, headers_only=True)
+        
+        _, kwargs = client.service.users().messages().get.call_args
+        assert kwargs['format'] == 'metadata'
+        assert emails[0]['body_text'] == ''
+
+
+class TestParseMessage:
+    """Test Gmail message parsing."""
+    
+    def test_headers_case_insensitive(self):
+        """Test header lookup ignores case and keeps the first occurrence."""
+        from src.gmail_client import GmailClient
+        msg = {
+            'id': '1',
+            'threadId': 't1',
+            'payload': {'headers': [
+                {'name': 'SUBJECT', 'value': 'Hello'},
+                {'name': 'from', 'value': 'a@example.com'},
+                {'name': 'Subject', 'value': 'Duplicate'},
+            ]},
+        }
+        email = GmailClient._parse_message(msg)
+        
+        assert email['subject'] == 'Hello'
+        assert email['from'] == 'a@example.com'
+        assert email['to'] == ''
+    
+    def message_with_bodies(self, with_text=True):
+        parts = [{'mimeType': 'text/html', 'body': {'data': 'PHA-aGk8L3A-'}}]  # <p>hi</p>
+        if with_text:
+            parts.insert(0, {'mimeType': 'text/plain', 'body': {'data': 'aGk='}})  # hi
+        return {'id': '1', 'threadId': 't1', 'payload': {'headers': [], 'parts': parts}}
+    
+    def test_decodes_both_bodies_by_default(self):
+        """Test text and HTML bodies are decoded."""
+        from src.gmail_client import GmailClient
+        email = GmailClient._parse_message(self.message_with_bodies())
+        
+        assert email['body_text'] == 'hi'
+        assert email['body_html'] == '<p>hi</p>'
+    
+    def test_skip_html_when_text_present(self):
+        """Test include_html=False leaves body_html empty when text exists."""
+        from src.gmail_client import GmailClient
+        email = GmailClient._parse_message(self.message_with_bodies(), include_html=False)
+        
+        assert email['body_text'] == 'hi'
+        assert email['body_html'] == ''
+    
+    def test_html_kept_for_html_only_messages(self):
+        """Test include_html=False still decodes HTML-only messages."""
+        from src.gmail_client import GmailClient
+        email = GmailClient._parse_message(self.message_with_bodies(with_text=False), include_html=False)
+        
+        assert email['body_html'] == '<p>hi</p>'
+
+
+class TestServiceCache:
+    """Test Gmail service reuse across clients."""
+    
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        from src import gmail_client
+        gmail_client._thread_services().clear()
+        yield
+        gmail_client._thread_services().clear()
+    
+    def test_service_shared_between_clients(self):
+        """Test clients with the same paths build the service once."""
+        from src.gmail_client import GmailClient
+        service = object()
+        with patch.object(GmailClient, '_build_service', return_value=(service, object())) as build:
+            first = GmailClient(creds_path='c.json', token_path='t.json')
+            second = GmailClient(creds_path='c.json', token_path='t.json')
+        
+        assert first.service is second.service is service
+        assert build.call_count == 1
+    
+    def test_service_not_shared_across_threads(self):
+        """Test each thread builds its own service."""
+        import threading
+        from src.gmail_client import GmailClient
+        clients = []
+        with patch.object(GmailClient, '_build_service', side_effect=lambda: (object(), object())) as build:
+            clients.append(GmailClient(creds_path='c.json', token_path='t.json'))
+            worker = threading.Thread(
+                target=lambda: clients.append(GmailClient(creds_path='c.json', token_path='t.json'))
+            )
+            worker.start()
+            worker.join()
+        
+        assert clients[0].service is not clients[1].service
+        assert build.call_count == 2
+    
+    def test_unauthorized_service_not_cached(self):
+        """Test a service built without credentials is not shared."""
+        from src.gmail_client import GmailClient
+        with patch.object(GmailClient, '_build_service', return_value=(object(), None)) as build:
+            GmailClient(creds_path='c.json', token_path='t.json')
+            GmailClient(creds_path='c.json', token_path='t.json')
+        
+        assert build.call_count == 2
+
+
 if __name__ == '__main__':
-    pytest.main([__file__, '-v'])
\ No newline at end of file
+    pytest.main([__file__, '-v'])
@@ -6,7 +6,8 @@ sys.path.insert(0, '/home/ubuntu/.openclaw/workspace/jeeves')
 from src.ingest import (
     extract_email_address, clean_body, is_sent_email,
     get_timestamp, extract_thread_id, extract_subject,
-    extract_body, filter_useful_email
+    extract_body, filter_useful_email, iter_mbox, MAX_BODY_CHARS,
+    parse_mbox, html_to_text
 )
 from email.message import Message
 
@@ -19,6 +20,13 @@ class TestEmailIngest:
         result = extract_email_address("John Doe <john@example.com>")
         assert result == "john@example.com"
     
+    def test_extract_email_quoted_name(self):
+        result = extract_email_address('"Doe <admin>, John" <john@example.com>')
+        assert result == "john@example.com"
+    
+    def test_extract_email_with_comment(self):
+        assert extract_email_address("john@example.com (John Doe)") == "john@example.com"
+    
     def test_clean_body_removes_quoted(self):
         body = "Hello\n> quoted\nGoodbye"
         cleaned = clean_body(body)
@@ -35,6 +43,15 @@ class TestEmailIngest:
     def test_filter_too_short(self):
         assert filter_useful_email("Hi", "Hello") == False
     
+    def test_filter_hyphen_variants(self):
+        padding = " This message carries enough text to pass the length check."
+        assert filter_useful_email("Sent by MAILERDAEMON." + padding, "Hi") == False
+        assert filter_useful_email("Sent by Mailer-Daemon." + padding, "Hi") == False
+    
+    def test_filter_marker_in_subject(self):
+        body = "This is a meaningful email with enough content to be useful."
+        assert filter_useful_email(body, "Out of Office: back Monday") == False
+    
     def test_filter_good_email(self):
         body = "This is a meaningful email with enough content to be useful."
         assert filter_useful_email(body, "Meeting") == True
@@ -49,6 +66,44 @@ class TestEmailIngest:
         msg['From'] = 'John <john@example.com>'
         assert is_sent_email(msg, 'john@example.com') == True
     
+    def test_html_to_text_skips_script_and_style(self):
+        html = '<p title="a>b">Hi &amp; bye</p><script>x = 1 > 0;</script><style>p {}</style>'
+        assert html_to_text(html) == "Hi & bye"
+    
+    def test_extract_body_caps_length(self):
+        msg = Message()
+        msg['Content-Type'] = 'text/plain; charset=utf-8'
+        msg.set_payload("x" * (MAX_BODY_CHARS * 2))
+        assert len(extract_body(msg)) == MAX_BODY_CHARS
+    
+    def test_iter_mbox_splits_messages(self, tmp_path):
+        path = tmp_path / "test.mbox"
+        path.write_bytes(
+            b"From a@example.com Mon Jan  1 00:00:00 2024\n"
+            b"Subject: First\n\nHello\n\n"
+            b"From b@example.com Mon Jan  1 00:00:00 2024\n"
+            b"Subject: Second\n\nBye\n"
+        )
+        messages = list(iter_mbox(str(path)))
+        assert [m['Subject'] for m in messages] == ['First', 'Second']
+        assert messages[0].get_payload() == "Hello\n"
+    
+    def test_parse_mbox_filters_before_body(self, tmp_path):
+        path = tmp_path / "test.mbox"
+        body = b"A meaningful message with more than enough text to be kept.\n"
+        path.write_bytes(
+            b"From a Mon Jan  1 00:00:00 2024\n"
+            b"From: a@example.com\nSubject: Out of office\n\n" + body + b"\n"
+            b"From b Mon Jan  1 00:00:00 2024\n"
+            b"From: me@example.com\nSubject: Plans\n\n" + body + b"\n"
+            b"From c Mon Jan  1 00:00:00 2024\n"
+            b"From: c@example.com\nSubject: Lunch\n\n" + body
+        )
+        output = tmp_path / "out.csv"
+        assert parse_mbox(str(path), str(output), 'me@example.com') == 2
+        assert parse_mbox(str(path), str(output), 'me@example.com', sent_only=True) == 1
+        assert "Plans" in output.read_text()
+    
     def test_file_exists(self):
         import os
         assert os.path.exists('/home/ubuntu/.openclaw/workspace/jeeves/src/ingest.py')
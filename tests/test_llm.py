@@ -1,7 +1,9 @@
 """Tests for LLM wrapper."""
 import pytest
+import json
 import os
 import sys
+from unittest.mock import MagicMock
 sys.path.insert(0, '/home/ubuntu/.openclaw/workspace/jeeves')
 
 from src.llm import LLM, generate, generate_with_context
@@ -65,5 +67,70 @@ class TestLLM:
         assert 'requests' in content
 
 
+
+def _stream_response(fragments):
+    """Build a mock streaming Ollama response from text fragments."""
+    lines = [json.dumps({'response': text, 'done': False}).encode() for text in fragments]
+    lines.append(json.dumps({'response': '', 'done': True}).encode())
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+
+class TestSession:
+    """Test HTTP connection reuse."""
+    
+    def test_requests_share_session(self):
+        """Test repeated calls go through one keep-alive session."""
+        llm = LLM()
+        llm._session.post = MagicMock(side_effect=lambda *a, **kw: _stream_response([' hello ']))
+        
+        assert llm.generate("a") == "hello"
+        assert llm.generate("b") == "hello"
+        assert llm._session.post.call_count == 2
+    
+    def test_adapter_pool_size(self):
+        """Test HTTP adapter is sized to the pool setting."""
+        llm = LLM()
+        adapter = llm._session.get_adapter("http://localhost:11434")
+        assert adapter._pool_maxsize == LLM.POOL_SIZE
+
+
+class TestStreaming:
+    """Test streamed generation."""
+    
+    def test_generate_iter_yields_fragments(self):
+        """Test fragments are yielded in order as they arrive."""
+        llm = LLM()
+        llm._session.post = MagicMock(return_value=_stream_response(['Hel', 'lo', '!']))
+        assert list(llm.generate_iter("hi")) == ['Hel', 'lo', '!']
+        assert llm._session.post.call_args.kwargs['json']['stream'] is True
+    
+    def test_generate_joins_stream(self):
+        """Test generate collects and strips the streamed text."""
+        llm = LLM()
+        llm._session.post = MagicMock(return_value=_stream_response([' Hel', 'lo ']))
+        assert llm.generate("hi") == "Hello"
+    
+    def test_stream_error_raises(self):
+        """Test an error chunk surfaces as RuntimeError."""
+        llm = LLM()
+        response = _stream_response([])
+        response.iter_lines.return_value = iter([b'{"error": "model not found"}'])
+        llm._session.post = MagicMock(return_value=response)
+        with pytest.raises(RuntimeError, match="model not found"):
+            llm.generate("hi")
+    
+    def test_generate_batch_keeps_order(self):
+        """Test batch results line up with their prompts."""
+        llm = LLM()
+        llm._session.post = MagicMock(
+            side_effect=lambda url, json, **kw: _stream_response([json['prompt'].upper()])
+        )
+        assert llm.generate_batch(["a", "b", "c"]) == ["A", "B", "C"]
+        assert llm.generate_batch([]) == []
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
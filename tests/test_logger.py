@@ -7,12 +7,14 @@ import pytest
 from datetime import datetime
 from pathlib import Path
 
+from src import logger as logger_module
 from src.logger import (
     LogLevel,
     LogEntry,
     JeevesLogger,
     get_logger,
-    configure_logging
+    configure_logging,
+    utc_timestamp
 )
 
 
@@ -276,6 +278,86 @@ class TestJeevesLogger:
             assert 'ValueError' in entry['error']
             assert entry['data']['email_id'] == 123
     
+    def test_info_is_buffered_until_flush(self, temp_log_dir, monkeypatch):
+        """Test info lines are buffered and written on flush."""
+        # Keep the background flusher from writing the line mid-test
+        monkeypatch.setattr(logger_module, '_flush_open_loggers', lambda: None)
+        logger = JeevesLogger(log_dir=temp_log_dir, log_file="test.log", component="test")
+        log_path = os.path.join(temp_log_dir, "test.log")
+        
+        logger.info("Buffered", action="test")
+        assert os.path.getsize(log_path) == 0
+        logger.flush()
+        assert os.path.getsize(log_path) > 0
+        logger.close()
+    
+    def test_failing_flush_does_not_stop_others(self, temp_log_dir, capsys):
+        """Test one logger's flush error is reported and the rest still flush."""
+        good = JeevesLogger(log_dir=temp_log_dir, log_file="good.log", component="test")
+        bad = JeevesLogger(log_dir=temp_log_dir, log_file="bad.log", component="test")
+        
+        def failing_flush():
+            raise OSError("disk full")
+        
+        bad.flush = failing_flush
+        good.info("Buffered", action="test")
+        logger_module._flush_open_loggers()
+        
+        assert os.path.getsize(os.path.join(temp_log_dir, "good.log")) > 0
+        assert "disk full" in capsys.readouterr().err
+        good.close()
+        bad.close()
+    
+    def test_dataclass_in_data_is_serialized(self, temp_log_dir):
+        """Test dataclasses nested in data are written as dicts."""
+        from dataclasses import dataclass
+        
+        @dataclass
+        class Point:
+            x: int
+            y: int
+        
+        logger = JeevesLogger(log_dir=temp_log_dir, log_file="test.log", component="test")
+        logger.error("Failure", action="test", data={"point": Point(1, 2)})
+        logger.close()
+        
+        with open(os.path.join(temp_log_dir, "test.log")) as f:
+            entry = json.loads(f.readline())
+        assert entry['data']['point'] == {'x': 1, 'y': 2}
+    
+    def test_error_is_written_immediately(self, temp_log_dir):
+        """Test error lines bypass the write buffer."""
+        logger = JeevesLogger(log_dir=temp_log_dir, log_file="test.log", component="test")
+        log_path = os.path.join(temp_log_dir, "test.log")
+        
+        logger.error("Failure", action="test")
+        assert os.path.getsize(log_path) > 0
+        logger.close()
+    
+    def test_level_filtering(self, temp_log_dir):
+        """Test entries below the level are dropped, including after a level change."""
+        logger = JeevesLogger(log_dir=temp_log_dir, log_file="test.log", component="test", level=LogLevel.WARNING)
+        logger.info("Dropped", action="test")
+        logger.warning("Kept", action="test")
+        logger.level = LogLevel.ERROR
+        logger.warning("Dropped too", action="test")
+        logger.close()
+        
+        with open(os.path.join(temp_log_dir, "test.log")) as f:
+            messages = [json.loads(line)['message'] for line in f]
+        assert messages == ["Kept"]
+    
+    def test_enabled_for(self, temp_log_dir):
+        """Test enabled_for reports the effective level."""
+        logger = JeevesLogger(log_dir=temp_log_dir, log_file="test.log", component="test", level=LogLevel.WARNING)
+        assert not logger.enabled_for(LogLevel.INFO)
+        assert logger.enabled_for(LogLevel.WARNING)
+        assert logger.enabled_for(LogLevel.ERROR)
+        
+        logger.log_draft_created(draft_id=1, email_id=2, tone="casual", confidence=0.9)
+        logger.close()
+        assert os.path.getsize(os.path.join(temp_log_dir, "test.log")) == 0
+    
     def test_get_logger_function(self):
         """Test get_logger global function."""
         logger = get_logger(component="test")
@@ -287,3 +369,20 @@ class TestJeevesLogger:
         logger = configure_logging(level=LogLevel.DEBUG)
         assert logger is not None
         assert logger.level == LogLevel.DEBUG
+
+
+class TestUtcTimestamp:
+    """Test cases for the cached timestamp formatter."""
+    
+    def test_matches_datetime_format(self):
+        """Test output matches datetime.isoformat with milliseconds."""
+        before = datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+        stamp = utc_timestamp()
+        after = datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+        assert len(stamp) == len(before)
+        assert before <= stamp <= after
+    
+    def test_repeated_calls_are_ordered(self):
+        """Test cached prefix never produces a timestamp going backwards."""
+        stamps = [utc_timestamp() for _ in range(1000)]
+        assert stamps == sorted(stamps)
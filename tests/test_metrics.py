@@ -229,3 +229,169 @@ class TestMetricsCollector:
         assert summary.max == 20.0
         assert summary.avg == 10.0
         assert summary.period_seconds == 3600
+
+
+class TestBoundedStorage:
+    """Test per-metric point limits and running stats."""
+    
+    def test_points_are_capped(self, monkeypatch):
+        """Test only the newest MAX_POINTS points are kept."""
+        monkeypatch.setattr(MetricsCollector, "MAX_POINTS", 3)
+        collector = MetricsCollector(persist=False)
+        for value in range(5):
+            collector.gauge("test.metric", float(value))
+        
+        points = collector.get_all_metrics()["test.metric"]
+        assert [p.value for p in points] == [2.0, 3.0, 4.0]
+    
+    def test_summary_after_eviction_uses_retained_points(self, monkeypatch):
+        """Test windowed summary only covers points still held."""
+        monkeypatch.setattr(MetricsCollector, "MAX_POINTS", 2)
+        collector = MetricsCollector(persist=False)
+        for value in (10.0, 1.0, 3.0):
+            collector.timing("test.metric", value)
+        
+        summary = collector.get_summary("test.metric")
+        assert summary.count == 2
+        assert summary.min == 1.0
+        assert summary.max == 3.0
+    
+    def test_dashboard_counts_evicted_points(self, monkeypatch):
+        """Test dashboard totals include points no longer stored."""
+        monkeypatch.setattr(MetricsCollector, "MAX_POINTS", 2)
+        collector = MetricsCollector(persist=False)
+        for value in (100.0, 200.0, 300.0):
+            collector.increment(MetricName.DRAFTS_CREATED)
+            collector.timing(MetricName.PROCESSING_TIME_MS, value)
+        
+        dashboard = collector.get_dashboard_data()
+        assert dashboard['drafts_created_total'] == 3
+        assert dashboard['avg_processing_time_ms'] == 200.0
+    
+    def test_summary_excludes_old_points(self):
+        """Test points older than the period are left out."""
+        collector = MetricsCollector(persist=False)
+        collector.timing("test.metric", 5.0)
+        collector._sync()
+        collector._metrics["test.metric"][0].timestamp = "2000-01-01T00:00:00.000Z"
+        collector.timing("test.metric", 7.0)
+        
+        summary = collector.get_summary("test.metric", period_seconds=60)
+        assert summary.count == 1
+        assert summary.sum == 7.0
+
+
+class TestMetricsFile:
+    """Test the persistent metrics file handle."""
+    
+    def test_handle_reused_across_points(self, tmp_path):
+        """Test points share one open handle and are readable straight away."""
+        collector = MetricsCollector(persist=True)
+        collector.METRICS_FILE = str(tmp_path / "metrics.jsonl")
+        
+        collector.increment(MetricName.DRAFTS_CREATED)
+        collector._sync()
+        handle = collector._file
+        collector.increment(MetricName.DRAFTS_SENT)
+        collector._sync()
+        assert collector._file is handle
+        
+        with open(collector.METRICS_FILE) as f:
+            names = [json.loads(line)['name'] for line in f]
+        assert names == [MetricName.DRAFTS_CREATED, MetricName.DRAFTS_SENT]
+        
+        collector.close()
+        assert handle.closed
+    
+    def test_unserializable_point_is_skipped(self, tmp_path, capsys):
+        """Test a point that cannot be written does not stop later points."""
+        collector = MetricsCollector(persist=True)
+        collector.METRICS_FILE = str(tmp_path / "metrics.jsonl")
+        
+        collector.increment("bad", tags={"x": object()})
+        collector.increment(MetricName.DRAFTS_SENT)
+        collector._sync()
+        
+        assert collector._drainer.is_alive()
+        assert len(collector.get_all_metrics()["bad"]) == 1
+        with open(collector.METRICS_FILE) as f:
+            names = [json.loads(line)['name'] for line in f]
+        assert names == [MetricName.DRAFTS_SENT]
+        assert "Failed to persist metric" in capsys.readouterr().err
+        collector.close()
+    
+    def test_non_numeric_value_is_rejected(self, tmp_path):
+        """Test a non-numeric value raises and does not drop other points."""
+        collector = MetricsCollector(persist=True)
+        collector.METRICS_FILE = str(tmp_path / "metrics.jsonl")
+        
+        collector.increment(MetricName.DRAFTS_CREATED)
+        with pytest.raises(TypeError, match="must be a number"):
+            collector.gauge("bad", "high")
+        collector.increment(MetricName.DRAFTS_SENT)
+        collector._sync()
+        
+        assert "bad" not in collector.get_all_metrics()
+        with open(collector.METRICS_FILE) as f:
+            names = [json.loads(line)['name'] for line in f]
+        assert names == [MetricName.DRAFTS_CREATED, MetricName.DRAFTS_SENT]
+        collector.close()
+
+
+class TestMetricsQueue:
+    """Test queued recording and the drain thread."""
+    
+    def test_concurrent_producers(self):
+        """Test points from many threads are all stored."""
+        import threading
+        collector = MetricsCollector(persist=False)
+        
+        def produce():
+            for _ in range(500):
+                collector.increment(MetricName.EMAILS_PROCESSED)
+        
+        threads = [threading.Thread(target=produce) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert collector.get_summary(MetricName.EMAILS_PROCESSED).count == 2000
+    
+    def test_records_after_close_are_kept(self):
+        """Test reads still see points recorded after the drain thread stops."""
+        collector = MetricsCollector(persist=False)
+        collector.close()
+        collector.increment(MetricName.DRAFTS_CREATED)
+        assert len(collector.get_all_metrics()[MetricName.DRAFTS_CREATED]) == 1
+    
+    def test_queued_points_are_stored_at_exit(self, tmp_path):
+        """Test points still queued when the interpreter exits are persisted."""
+        import subprocess
+        import sys
+        script = (
+            "from src.metrics import MetricsCollector\n"
+            "collector = MetricsCollector()\n"
+            "for _ in range(20000):\n"
+            "    collector.increment('x')\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env, check=True)
+        
+        with open(tmp_path / "logs" / "metrics.jsonl") as f:
+            assert sum(1 for _ in f) == 20000
+    
+    def test_collector_is_collected(self):
+        """Test the drain thread does not keep a dropped collector alive."""
+        import gc
+        import weakref
+        collector = MetricsCollector(persist=False)
+        collector.increment(MetricName.DRAFTS_CREATED)
+        collector.get_all_metrics()
+        drainer = collector._drainer
+        ref = weakref.ref(collector)
+        del collector
+        gc.collect()
+        assert ref() is None
+        drainer.join(timeout=1)
+        assert not drainer.is_alive()
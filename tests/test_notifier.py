@@ -72,7 +72,7 @@ class TestNotifierDefaults(unittest.TestCase):
 class TestNotifierSend(unittest.TestCase):
     """Test send method."""
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_send_basic(self, mock_post):
         """Test basic send functionality."""
         mock_response = MagicMock()
@@ -87,7 +87,7 @@ class TestNotifierSend(unittest.TestCase):
         self.assertIn("Test Title", str(call_args))
         self.assertIn("Test Message", str(call_args))
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_send_with_priority(self, mock_post):
         """Test send with custom priority."""
         mock_response = MagicMock()
@@ -104,7 +104,7 @@ class TestNotifierSend(unittest.TestCase):
 class TestNotifierDraftReady(unittest.TestCase):
     """Test notify_draft_ready method."""
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_draft_ready(self, mock_post):
         """Test draft ready notification."""
         mock_response = MagicMock()
@@ -124,7 +124,7 @@ class TestNotifierDraftReady(unittest.TestCase):
         # Verify the URL contains the topic
         self.assertIn("jeeves-drafts", str(call_args))
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_draft_ready_returns_response(self, mock_post):
         """Test draft ready returns response object."""
         mock_response = MagicMock()
@@ -145,7 +145,7 @@ class TestNotifierDraftReady(unittest.TestCase):
 class TestNotifierDraftSent(unittest.TestCase):
     """Test notify_draft_sent method."""
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_draft_sent(self, mock_post):
         """Test draft sent notification."""
         mock_response = MagicMock()
@@ -160,7 +160,7 @@ class TestNotifierDraftSent(unittest.TestCase):
         
         mock_post.assert_called_once()
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_draft_sent_returns_response(self, mock_post):
         """Test draft sent returns response object."""
         mock_response = MagicMock()
@@ -179,7 +179,7 @@ class TestNotifierDraftSent(unittest.TestCase):
 class TestNotifierError(unittest.TestCase):
     """Test notify_error method."""
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_error(self, mock_post):
         """Test error notification."""
         mock_response = MagicMock()
@@ -191,7 +191,7 @@ class TestNotifierError(unittest.TestCase):
         
         mock_post.assert_called_once()
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_error_returns_response(self, mock_post):
         """Test error returns response object."""
         mock_response = MagicMock()
@@ -216,7 +216,7 @@ class TestNotifierNotificationStructure(unittest.TestCase):
         self.assertIn("high", notifier.PRIORITIES)
         self.assertIn("urgent", notifier.PRIORITIES)
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notification_contains_subject(self, mock_post):
         """Test notification contains subject field."""
         mock_response = MagicMock()
@@ -239,7 +239,7 @@ class TestNotifierNotificationStructure(unittest.TestCase):
 class TestConvenienceFunctions(unittest.TestCase):
     """Test convenience functions."""
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_draft_ready_function(self, mock_post):
         """Test notify_draft_ready convenience function."""
         mock_response = MagicMock()
@@ -255,7 +255,7 @@ class TestConvenienceFunctions(unittest.TestCase):
         
         self.assertEqual(response, mock_response)
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_draft_sent_function(self, mock_post):
         """Test notify_draft_sent convenience function."""
         mock_response = MagicMock()
@@ -269,7 +269,7 @@ class TestConvenienceFunctions(unittest.TestCase):
         
         self.assertEqual(response, mock_response)
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_notify_error_function(self, mock_post):
         """Test notify_error convenience function."""
         mock_response = MagicMock()
@@ -280,7 +280,7 @@ class TestConvenienceFunctions(unittest.TestCase):
         
         self.assertEqual(response, mock_response)
     
-    @patch('src.notifier.requests.post')
+    @patch('src.notifier.requests.Session.post')
     def test_send_function(self, mock_post):
         """Test send convenience function."""
         mock_response = MagicMock()
@@ -292,5 +292,105 @@ class TestConvenienceFunctions(unittest.TestCase):
         self.assertEqual(response, mock_response)
 
 
+class TestNotifierSession(unittest.TestCase):
+    """Test HTTP connection reuse."""
+    
+    @patch('src.notifier.requests.Session.post')
+    def test_sends_share_session(self, mock_post):
+        """Test repeated sends use one session with a timeout."""
+        notifier = Notifier()
+        session = notifier._session
+        notifier.send("One", "Message")
+        notifier.send("Two", "Message")
+        
+        self.assertIs(notifier._session, session)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], Notifier.TIMEOUT)
+    
+    @patch('src.notifier.requests.Session.post')
+    def test_url_follows_topic_and_base_url(self, mock_post):
+        """Test sends use the URL rebuilt when topic or base URL change."""
+        notifier = Notifier(topic="first", base_url="https://a.example")
+        notifier.send("T", "M")
+        self.assertEqual(mock_post.call_args.args[0], "https://a.example/first")
+        
+        notifier.topic = "second"
+        notifier.base_url = "https://b.example"
+        notifier.send("T", "M", priority="unknown")
+        self.assertEqual(mock_post.call_args.args[0], "https://b.example/second")
+        self.assertEqual(mock_post.call_args.kwargs["data"]["priority"], 3)
+    
+    def test_convenience_functions_reuse_notifier(self):
+        """Test convenience functions share a notifier per configuration."""
+        import src.notifier as notifier_module
+        first = notifier_module._get_notifier(topic="reuse-test")
+        self.assertIs(notifier_module._get_notifier(topic="reuse-test"), first)
+        self.assertIsNot(notifier_module._get_notifier(topic="other-topic"), first)
+
+
+class TestNotifierBatch(unittest.TestCase):
+    """Test concurrent batch notifications."""
+    
+    @patch('src.notifier.requests.Session.post')
+    def test_send_many_keeps_order(self, mock_post):
+        """Test responses come back in item order."""
+        mock_post.side_effect = lambda url, data, **kwargs: MagicMock(text=data["message"])
+        notifier = Notifier()
+        items = [{"title": "T", "message": str(i)} for i in range(10)]
+        
+        responses = notifier.send_many(items)
+        self.assertEqual([r.text for r in responses], [str(i) for i in range(10)])
+        self.assertEqual(notifier.send_many([]), [])
+    
+    @patch('src.notifier.requests.Session.post')
+    def test_drafts_ready_batch(self, mock_post):
+        """Test each draft becomes a draft-ready notification."""
+        notifier = Notifier()
+        drafts = [
+            {"subject": f"Subject {i}", "sender": "a@example.com", "preview": "Hi", "draft_id": str(i)}
+            for i in range(3)
+        ]
+        responses = notifier.notify_drafts_ready_batch(drafts)
+        
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(mock_post.call_count, 3)
+        messages = sorted(call.kwargs["data"]["message"] for call in mock_post.call_args_list)
+        self.assertIn("Subject: Subject 0", messages[0])
+        self.assertIn("Draft ID: 2", messages[2])
+
+
+class TestNotifierQueue(unittest.TestCase):
+    """Test background notification delivery."""
+    
+    @patch('src.notifier.requests.Session.post')
+    def test_enqueue_delivers_in_background(self, mock_post):
+        """Test queued notifications are sent by the worker."""
+        notifier = Notifier()
+        self.assertTrue(notifier.enqueue("One", "First"))
+        self.assertTrue(notifier.enqueue("Two", "Second"))
+        self.assertTrue(notifier.flush(timeout=5))
+        
+        messages = [call.kwargs["data"]["message"] for call in mock_post.call_args_list]
+        self.assertEqual(messages, ["First", "Second"])
+    
+    @patch('src.notifier.requests.Session.post')
+    def test_server_errors_are_retried(self, mock_post):
+        """Test a 5xx response is retried before giving up."""
+        import requests
+        failure = MagicMock()
+        failure.raise_for_status.side_effect = requests.HTTPError(response=MagicMock(status_code=503))
+        mock_post.side_effect = [failure, MagicMock()]
+        notifier = Notifier()
+        notifier.RETRY_DELAY = 0
+        
+        notifier.enqueue("Title", "Message")
+        self.assertTrue(notifier.flush(timeout=5))
+        self.assertEqual(mock_post.call_count, 2)
+    
+    def test_flush_without_queue(self):
+        """Test flush returns at once when nothing was queued."""
+        self.assertTrue(Notifier().flush(timeout=0))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,9 +2,67 @@
 import pytest
 import os
 import sys
+from unittest.mock import MagicMock, patch
+
+import numpy as np
 sys.path.insert(0, '/home/ubuntu/.openclaw/workspace/jeeves')
 
-from src.rag import RAGPipeline, index_emails, search
+from src.rag import PREVIEW_CHARS, RAGPipeline, SearchHit, _body_hash, index_emails, search
+
+
+class FakeEncoder:
+    """Stand-in for SentenceTransformer that records encode calls."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+def _query_results(queries, top_k):
+    """Build a Chroma-shaped query result with top_k hits per query."""
+    return {
+        'ids': [[f"id_{q}_{k}" for k in range(top_k)] for q in range(len(queries))],
+        'documents': [[f"doc_{q}_{k}" for k in range(top_k)] for q in range(len(queries))],
+        'metadatas': [[{'k': k} for k in range(top_k)] for q in range(len(queries))],
+        'distances': [[0.1 * k for k in range(top_k)] for q in range(len(queries))],
+    }
+
+
+class FakeCollection:
+    """In-memory stand-in for a Chroma collection's id/metadata API."""
+    
+    def __init__(self, metadata=None):
+        self.metadata = dict(RAGPipeline.COLLECTION_METADATA) if metadata is None else metadata
+        self.rows = {}
+        self.upserted = []
+    
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.upserted.extend(ids)
+        for email_id, document, metadata in zip(ids, documents, metadatas):
+            self.rows[email_id] = (document, metadata)
+    
+    def get(self, include, limit, offset=0):
+        ids = list(self.rows)[offset:offset + limit]
+        return {'ids': ids, 'metadatas': [self.rows[i][1] for i in ids]}
+    
+    def delete(self, ids):
+        for email_id in ids:
+            del self.rows[email_id]
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """RAGPipeline with a fake encoder and collection instead of Chroma."""
+    rag = RAGPipeline(persist_directory=str(tmp_path))
+    rag.embedding_function = FakeEncoder()
+    rag.collection = MagicMock()
+    rag.collection.query.side_effect = (
+        lambda query_embeddings, n_results, where=None: _query_results(query_embeddings, n_results)
+    )
+    return rag
 
 
 class TestRAGPipeline:
@@ -53,5 +111,267 @@ class TestRAGPipeline:
         assert 'sentence-transformers' in content
 
 
+class TestLazyLoading:
+    """Test Chroma and the embedding model load on first use."""
+    
+    def test_construction_loads_nothing(self, tmp_path):
+        """Test a new pipeline has no client or model yet."""
+        rag = RAGPipeline(persist_directory=str(tmp_path))
+        assert rag.client is None
+        assert rag.embedding_function is None
+        assert 'collection' not in vars(rag)
+    
+    def test_stats_do_not_load_model(self, tmp_path):
+        """Test get_stats opens the collection but not the model."""
+        client = MagicMock()
+        client.get_or_create_collection.return_value.count.return_value = 3
+        rag = RAGPipeline(persist_directory=str(tmp_path))
+        with patch.object(RAGPipeline, '_ensure_chroma', return_value=client), \
+                patch.object(RAGPipeline, '_ensure_embed') as ensure_embed:
+            assert rag.get_stats()['count'] == 3
+            rag.get_stats()
+        assert client.get_or_create_collection.call_count == 1
+        ensure_embed.assert_not_called()
+    
+    def test_embedding_loads_model_once(self, tmp_path):
+        """Test the model is loaded by the first embed and then reused."""
+        rag = RAGPipeline(persist_directory=str(tmp_path))
+        encoder = FakeEncoder()
+        fake_module = MagicMock()
+        fake_module.SentenceTransformer.return_value = encoder
+        
+        with patch.dict('sys.modules', {'sentence_transformers': fake_module}), \
+                patch.dict(os.environ, {'EMBEDDING_DEVICE': 'cpu'}):
+            rag._embed(["a", "b"])
+            rag._embed(["c", "d"])
+        fake_module.SentenceTransformer.assert_called_once_with(rag.embedding_model, device='cpu')
+        assert encoder.calls == [["a", "b"], ["c", "d"]]
+
+
+class TestEmbedding:
+    """Test embedding batching and caching."""
+    
+    def test_single_embeddings_are_cached(self, pipeline):
+        """Test repeated single-text embeds hit the model once."""
+        first = pipeline._embed(["hello"])
+        second = pipeline._embed(["hello"])
+        assert first.shape == (1, 2)
+        assert np.array_equal(first, second)
+        assert pipeline.embedding_function.calls == [["hello"]]
+    
+    def test_embeddings_are_float32_arrays(self, pipeline):
+        """Test embeddings reach Chroma as one contiguous float32 array."""
+        pipeline.embedding_function.encode = lambda texts, **kwargs: np.ones((len(texts), 3))
+        embeddings = pipeline._embed(["a", "b"])
+        assert embeddings.dtype == np.float32
+        assert embeddings.flags['C_CONTIGUOUS']
+        assert embeddings.shape == (2, 3)
+        
+        pipeline.add_email("some text", {})
+        upserted = pipeline.collection.upsert.call_args.kwargs['embeddings']
+        assert upserted.dtype == np.float32 and upserted.shape == (1, 3)
+    
+    def test_search_many_batches_queries(self, pipeline):
+        """Test several queries share one encode and one index query."""
+        results = pipeline.search_many(["a", "bb", "ccc"], top_k=2)
+        
+        assert pipeline.embedding_function.calls == [["a", "bb", "ccc"]]
+        assert pipeline.collection.query.call_count == 1
+        assert [[hit.id for hit in hits] for hits in results] == [
+            ["id_0_0", "id_0_1"], ["id_1_0", "id_1_1"], ["id_2_0", "id_2_1"]
+        ]
+        assert pipeline.search_many([]) == []
+    
+    def test_search_hits(self, pipeline):
+        """Test hits carry id, text, metadata and distance in rank order."""
+        hits = pipeline.search("query", top_k=2)
+        assert hits == [
+            SearchHit('id_0_0', 'doc_0_0', {'k': 0}, 0.0, 'doc_0_0'),
+            SearchHit('id_0_1', 'doc_0_1', {'k': 1}, 0.1, 'doc_0_1'),
+        ]
+        assert hits[0].to_dict() == {
+            'id': 'id_0_0', 'text': 'doc_0_0', 'metadata': {'k': 0},
+            'distance': 0.0, 'preview': 'doc_0_0'
+        }
+    
+    def test_search_hit_preview(self, pipeline):
+        """Test hits carry a preview clipped to PREVIEW_CHARS."""
+        results = _query_results(["q"], 1)
+        results['documents'] = [["z" * 500]]
+        pipeline.collection.query.side_effect = None
+        pipeline.collection.query.return_value = results
+        hit = pipeline.search("query", top_k=1)[0]
+        assert hit.text == "z" * 500
+        assert hit.preview == "z" * PREVIEW_CHARS
+    
+    def test_search_without_distances(self, pipeline):
+        """Test distance is None when Chroma omits distances."""
+        pipeline.collection.query.side_effect = None
+        results = _query_results(["q"], 1)
+        results['distances'] = None
+        pipeline.collection.query.return_value = results
+        assert pipeline.search("query", top_k=1)[0].distance is None
+
+
+class TestIndexEmails:
+    """Test chunked CSV indexing."""
+    
+    def test_chunks_and_metadata(self, pipeline, tmp_path):
+        """Test rows are upserted per chunk with ids and metadata."""
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text(
+            "thread_id,from,subject,body_text,sent_by_you,timestamp\n"
+            "t1,a@example.com,One,\"Hello, world\",True,2024-01-01\n"
+            "t2,b@example.com,Two,Second email,False,\n"
+            "t3,c@example.com,Three,\"Multi\nline\",False,\n",
+            encoding='utf-8'
+        )
+        
+        assert pipeline.index_emails(str(csv_path), batch_size=2) == 3
+        
+        calls = pipeline.collection.upsert.call_args_list
+        assert [c.kwargs['ids'] for c in calls] == [["email_0", "email_1"], ["email_2"]]
+        assert calls[0].kwargs['documents'] == ["Hello, world", "Second email"]
+        assert calls[1].kwargs['documents'] == ["Multi\nline"]
+        assert calls[0].kwargs['metadatas'][0] == {
+            'thread_id': 't1', 'from': 'a@example.com', 'subject': 'One',
+            'sent_by_you': 'True', 'timestamp': '2024-01-01',
+            'body_hash': _body_hash("Hello, world")
+        }
+    
+    def test_missing_columns_use_defaults(self, pipeline, tmp_path):
+        """Test absent columns fall back to their defaults."""
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text("body_text\nJust a body\n", encoding='utf-8')
+        
+        assert pipeline.index_emails(str(csv_path)) == 1
+        metadata = pipeline.collection.upsert.call_args.kwargs['metadatas'][0]
+        assert metadata['sent_by_you'] == 'False'
+        assert metadata['subject'] == ''
+    
+    def test_empty_file(self, pipeline, tmp_path):
+        """Test an empty CSV indexes nothing."""
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text("", encoding='utf-8')
+        assert pipeline.index_emails(str(csv_path)) == 0
+    
+    def test_short_bodies_skipped(self, pipeline, tmp_path):
+        """Test blank and trivial bodies are neither embedded nor upserted."""
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text(
+            "subject,body_text\nA,\nB,ok\nC,A real email body\nD,   \n",
+            encoding='utf-8'
+        )
+        
+        assert pipeline.index_emails(str(csv_path)) == 1
+        assert pipeline.embedding_function.calls == [["A real email body"]]
+        upsert = pipeline.collection.upsert.call_args.kwargs
+        assert upsert['ids'] == ["email_2"]
+        assert upsert['metadatas'][0]['subject'] == 'C'
+        
+        csv_path.write_text("body_text\nok\n", encoding='utf-8')
+        assert pipeline.index_emails(str(csv_path)) == 0
+        assert pipeline.collection.upsert.call_count == 1
+    
+    def test_quoted_history_stripped(self, pipeline, tmp_path):
+        """Test reply history is removed before embedding and storing."""
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text(
+            'body_text\n'
+            '"Sounds good, see you then.\n\nOn Mon, Jan 1, 2024 Bob <b@x.com>\nwrote:\n> Lunch?"\n'
+            '"Thanks for the notes.\n________________________________\nFrom: Bob\nOld text"\n'
+            '"On Mon, Bob wrote:\n> only quoted"\n',
+            encoding='utf-8'
+        )
+        
+        assert pipeline.index_emails(str(csv_path)) == 2
+        assert pipeline.collection.upsert.call_args.kwargs['documents'] == [
+            "Sounds good, see you then.", "Thanks for the notes."
+        ]
+        assert pipeline.embedding_function.calls == [
+            ["Sounds good, see you then.", "Thanks for the notes."]
+        ]
+    
+    def test_upsert_error_propagates(self, pipeline, tmp_path):
+        """Test a failed background upsert is raised to the caller."""
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text("body_text\nFirst email\nSecond email\n", encoding='utf-8')
+        pipeline.collection.upsert.side_effect = RuntimeError("disk full")
+        
+        with pytest.raises(RuntimeError, match="disk full"):
+            pipeline.index_emails(str(csv_path), batch_size=1)
+
+
+class TestRebuildIndex:
+    """Test clearing and incremental rebuilds."""
+    
+    def test_clear_documents_keeps_collection(self, pipeline):
+        """Test documents are deleted page by page from the same collection."""
+        collection = FakeCollection()
+        collection.rows = {f"email_{i}": ("text", {}) for i in range(5)}
+        pipeline.collection = collection
+        pipeline.ID_PAGE_SIZE = 2
+        
+        pipeline.clear_documents()
+        assert collection.rows == {}
+        assert pipeline.collection is collection
+    
+    def test_outdated_index_settings_recreate_collection(self, pipeline, tmp_path):
+        """Test a collection with other HNSW settings is recreated on rebuild."""
+        old = FakeCollection(metadata={"hnsw:space": "cosine"})
+        old.rows = {"email_9": ("stale", {})}
+        new = FakeCollection()
+        pipeline.collection = old
+        pipeline.client = MagicMock()
+        pipeline.client.get_or_create_collection.return_value = new
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text("body_text\nFirst email\n", encoding='utf-8')
+        
+        assert pipeline.rebuild_index(str(csv_path), incremental=True) == 1
+        pipeline.client.delete_collection.assert_called_once_with(pipeline.collection_name)
+        assert pipeline.client.get_or_create_collection.call_args.kwargs['metadata'] == (
+            RAGPipeline.COLLECTION_METADATA
+        )
+        assert pipeline.collection is new
+        assert list(new.rows) == ["email_0"]
+    
+    def test_incremental_rebuild(self, pipeline, tmp_path):
+        """Test only new or changed rows are embedded and removed rows deleted."""
+        collection = FakeCollection()
+        pipeline.collection = collection
+        pipeline.ID_PAGE_SIZE = 2
+        csv_path = tmp_path / "emails.csv"
+        csv_path.write_text(
+            "body_text\nFirst email\nSecond email\nThird email\n", encoding='utf-8'
+        )
+        assert pipeline.rebuild_index(str(csv_path)) == 3
+        
+        csv_path.write_text(
+            "body_text\nFirst email\nSecond email edited\n", encoding='utf-8'
+        )
+        collection.upserted = []
+        pipeline.embedding_function.calls = []
+        
+        assert pipeline.rebuild_index(str(csv_path), incremental=True) == 1
+        assert collection.upserted == ["email_1"]
+        assert pipeline.embedding_function.calls == [["Second email edited"]]
+        assert {i: doc for i, (doc, _) in collection.rows.items()} == {
+            "email_0": "First email", "email_1": "Second email edited"
+        }
+
+
+class TestConvenienceFunctions:
+    """Test the module-level helpers."""
+    
+    def test_pipeline_is_reused(self, tmp_path):
+        """Test repeated calls share one pipeline per configuration."""
+        import src.rag as rag_module
+        rag_module._get_pipeline.cache_clear()
+        first = rag_module._get_pipeline(persist_directory=str(tmp_path))
+        assert rag_module._get_pipeline(persist_directory=str(tmp_path)) is first
+        assert rag_module._get_pipeline(persist_directory=str(tmp_path / "other")) is not first
+        rag_module._get_pipeline.cache_clear()
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -2,8 +2,10 @@
 import pytest
 import os
 import sys
+from unittest.mock import MagicMock
 sys.path.insert(0, '/home/ubuntu/.openclaw/workspace/jeeves')
 
+from src.rag import SearchHit
 from src.response_generator import ResponseGenerator, generate_reply
 
 
@@ -76,5 +78,103 @@ class TestResponseGenerator:
         assert isinstance(result, str)
 
 
+class TestBuildPrompt:
+    """Test prompt construction."""
+    
+    def test_prompt_with_context(self):
+        """Test system prompt follows the tone and the first previews are listed."""
+        gen = ResponseGenerator(llm=MagicMock(), rag=MagicMock())
+        email = {'subject': 'Lunch', 'from': 'a@example.com', 'body_text': 'Free today?'}
+        context = ["x" * 200, "second", "third", "fourth"]
+        
+        system_prompt, user_prompt = gen._build_prompt(email, context, "formal")
+        
+        assert system_prompt == ResponseGenerator.TONES["formal"]["system_prompt"]
+        assert "Subject: Lunch" in user_prompt
+        assert f"1. {'x' * 200}...\n" in user_prompt
+        assert "3. third" in user_prompt
+        assert "fourth" not in user_prompt
+        assert user_prompt.endswith("Write a reply to this email.")
+    
+    def test_generate_with_context_previews(self):
+        """Test explicit context emails are clipped to previews in the prompt."""
+        llm = MagicMock()
+        gen = ResponseGenerator(llm=llm, rag=MagicMock())
+        gen.generate_with_context({'subject': 'Hi'}, [{'body_text': 'y' * 300}])
+        
+        prompt, context = llm.generate_with_context.call_args.args
+        assert f"1. {'y' * 200}...\n" in prompt
+        assert context == ['y' * 300]
+    
+    def test_unknown_tone_falls_back(self):
+        """Test an unknown tone uses the match_style prompt."""
+        gen = ResponseGenerator(llm=MagicMock(), rag=MagicMock())
+        system_prompt, _ = gen._build_prompt({}, None, "pirate")
+        assert system_prompt == ResponseGenerator.TONES["match_style"]["system_prompt"]
+
+
+class TestContextCache:
+    """Test RAG context caching in generate_reply."""
+    
+    def test_repeated_body_searches_once(self):
+        """Test the same body reuses cached context."""
+        rag = MagicMock()
+        rag.search.return_value = [SearchHit('id_1', 'past email', {}, 0.1, 'past email')]
+        llm = MagicMock()
+        gen = ResponseGenerator(llm=llm, rag=rag)
+        email = {'subject': 'Hi', 'body_text': 'Same body'}
+        
+        gen.generate_reply(email)
+        gen.generate_reply(email)
+        gen.generate_reply({'subject': 'Hi', 'body_text': 'Other body'})
+        
+        assert rag.search.call_count == 2
+        assert llm.generate_with_context.call_args.args[1] == ['past email']
+    
+    def test_context_budget(self):
+        """Test the hit crossing the budget is clipped and later hits dropped."""
+        rag = MagicMock()
+        rag.search.return_value = [
+            SearchHit(f'id_{i}', text, {}, 0.1, text[:200])
+            for i, text in enumerate(["a" * 400, "b" * 400, "c" * 400, "d" * 400])
+        ]
+        llm = MagicMock()
+        gen = ResponseGenerator(llm=llm, rag=rag)
+        gen.CONTEXT_CHAR_BUDGET = 1000
+        
+        gen.generate_reply({'body_text': 'Question'})
+        
+        prompt, context = llm.generate_with_context.call_args.args
+        assert context == ["a" * 400, "b" * 400, "c" * 200]
+        assert f"2. {'b' * 200}...\n" in prompt
+    
+    def test_context_budget_clips_oversized_top_hit(self):
+        """Test a top hit larger than the budget is clipped, not dropped."""
+        rag = MagicMock()
+        text = "a" * 10000
+        rag.search.return_value = [
+            SearchHit('id_0', text, {}, 0.1, text[:200]),
+            SearchHit('id_1', "second", {}, 0.2, "second"),
+        ]
+        llm = MagicMock()
+        gen = ResponseGenerator(llm=llm, rag=rag)
+        
+        gen.generate_reply({'body_text': 'Question'})
+        
+        prompt, context = llm.generate_with_context.call_args.args
+        assert context == ["a" * gen.CONTEXT_CHAR_BUDGET]
+        assert f"1. {'a' * 200}...\n" in prompt
+    
+    def test_cache_is_bounded(self):
+        """Test least recently used bodies are evicted."""
+        rag = MagicMock()
+        rag.search.return_value = []
+        gen = ResponseGenerator(llm=MagicMock(), rag=rag)
+        gen.CONTEXT_CACHE_SIZE = 2
+        for body in ("a", "b", "c", "a"):
+            gen.generate_reply({'body_text': body})
+        assert rag.search.call_count == 4
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -142,6 +142,25 @@ class TestEmailWatcher:
         
         assert watcher._running is False
     
+    def test_stop_interrupts_wait_between_polls(self):
+        """Test stop() ends the wait between polls without waiting it out."""
+        import threading
+        import time
+        watcher = EmailWatcher(poll_interval=300)
+        polled = threading.Event()
+        watcher.poll = lambda: polled.set()
+        
+        with patch.object(EmailWatcher, '_setup_signal_handlers'):
+            thread = threading.Thread(target=watcher.start)
+            thread.start()
+            assert polled.wait(5)
+            start = time.monotonic()
+            watcher.stop()
+            thread.join(5)
+        
+        assert not thread.is_alive()
+        assert time.monotonic() - start < 1
+    
     def test_environment_poll_interval(self):
         """Test POLL_INTERVAL env var is respected."""
         # Set environment variable
@@ -184,6 +203,14 @@ class TestFilteringFunctions:
         
         assert is_automated_email(email) is True
     
+    def test_is_automated_email_sender_prefixes(self):
+        """Test each automated local part is matched only at the start."""
+        for local in ('noreply', 'no-reply', 'donotreply', 'do-not-reply', 'notification',
+                      'notifications', 'alert', 'alerts', 'automated', 'automation', 'bot', 'system'):
+            assert is_automated_email({'from': f'{local}@example.com'}) is True, local
+        assert is_automated_email({'from': 'robot@example.com'}) is False
+        assert is_automated_email({'from': 'Alice <alice@example.com>'}) is False
+    
     def test_is_promotional_email_detects_newsletter(self):
         """Test promotional detection for newsletters."""
         email = {
@@ -203,6 +230,11 @@ class TestFilteringFunctions:
         
         assert is_promotional_email(email) is True
     
+    def test_is_promotional_email_checks_snippet(self):
+        """Test keywords are found in the snippet as well as the subject."""
+        assert is_promotional_email({'subject': 'Hello', 'snippet': 'Click to Unsubscribe'}) is True
+        assert is_promotional_email({'subject': 'Hello', 'snippet': None}) is False
+    
     def test_extract_sender_domain(self):
         """Test domain extraction from email address."""
         email = {
@@ -238,6 +270,19 @@ class TestFilteringFunctions:
         assert isinstance(SKIP_PATTERNS, list)
         assert len(SKIP_PATTERNS) > 0
         assert 'unsubscribe' in SKIP_PATTERNS
+    
+    def test_every_skip_domain_is_detected(self):
+        """Test each SKIP_DOMAINS entry still flags a sender domain."""
+        for skip_domain in SKIP_DOMAINS:
+            email = {'from': f'Team <team@mail.{skip_domain}.example.com>'}
+            assert is_automated_email(email), skip_domain
+    
+    def test_every_skip_pattern_is_detected(self):
+        """Test each SKIP_PATTERNS entry still flags a subject."""
+        for pattern in SKIP_PATTERNS:
+            email = {'from': 'alice@example.com', 'subject': f'About the {pattern} list'}
+            assert is_automated_email(email), pattern
+            assert is_promotional_email(email), pattern
 
 
 class TestEmailWatcherIntegration:
@@ -286,6 +331,16 @@ class TestEmailWatcherIntegration:
         assert status['draft_created_count'] == 3
         assert status['error_count'] == 1
     
+    def test_should_process_label_filters(self):
+        """Test blocking and promotion labels are applied from one label set."""
+        watcher = EmailWatcher()
+        base = {'id': '1', 'from': 'alice@example.com', 'subject': 'Lunch?'}
+        
+        assert watcher.should_process({**base, 'labelIds': ['INBOX', 'OUTBOX']}) is False
+        assert watcher.should_process({**base, 'labelIds': ['CATEGORY_PROMOTIONS']}) is False
+        assert watcher.should_process({**base, 'labelIds': None}) is True
+        assert watcher.should_process({**base, 'labelIds': ['INBOX', 'UNREAD']}) is True
+    
     def test_should_process_filters_trash(self):
         """Test trash emails are filtered out."""
         watcher = EmailWatcher()